@@ -15,6 +15,16 @@ static int tests_run = 0, tests_passed = 0, tests_failed = 0;
         else      { tests_failed++; printf("  [FAIL] %s (line %d)\n", msg, __LINE__); } \
     } while (0)
 
+/* Fill callback for test 9: counts fills and volume */
+static void count_fill(void *ctx, int aggressor_id, int resting_id,
+                       int price, int quantity)
+{
+    (void)aggressor_id; (void)resting_id; (void)price;
+    long long *acc = ctx;
+    acc[0] += 1;
+    acc[1] += quantity;
+}
+
 static void run_tests(void)
 {
     printf("\n--- 1. Basic Bid/Ask ---\n");
@@ -91,6 +101,53 @@ static void run_tests(void)
     ob_print(market, 5);
 
     ob_destroy(market);
+
+    printf("--- 7. Cancel Removes Empty Level ---\n");
+    struct order_book *ob4 = ob_create();
+    ob_add_order(ob4, 1, SIDE_BID, 100, 10);
+    ob_add_order(ob4, 2, SIDE_BID, 99,  5);
+    ob_add_order(ob4, 3, SIDE_ASK, 101, 5);
+    CHECK(ob_cancel_order(ob4, 1) == 1, "cancel the only order at the best bid");
+    CHECK(ob_best_bid(ob4) == 99, "best bid falls to 99");
+    CHECK(ob_cancel_order(ob4, 1) == 0, "second cancel of the same id returns 0");
+    CHECK(ob_add_order(ob4, 2, SIDE_BID, 98, 1) == 0, "duplicate resting id rejected");
+    CHECK(ob_add_order(ob4, 1, SIDE_BID, 98, 1) == 1, "cancelled id can be reused");
+    ob_destroy(ob4);
+
+    printf("--- 8. Bulk Add + Fill Buffer ---\n");
+    struct order_book *ob5 = ob_create();
+    int ids[]    = { 1,   2,   3,   4,  5   };
+    int sides[]  = { 0,   0,   1,   1,  0   };
+    int prices[] = { 100, 100, 101, 99, -1  };
+    int qtys[]   = { 5,   5,   4,   8,  1   };
+    int status[5];
+    int done    = ob_add_orders(ob5, 5, ids, sides, prices, qtys, status, 1);
+    int n_fills = 0;
+    const struct ob_fill *fills = ob_fills(ob5, &n_fills);
+    CHECK(done == 5 && status[3] == 1 && status[4] == 0,
+          "all 5 processed, bad price rejected");
+    CHECK(n_fills == 2, "ask 4 @ 99 fills bids 1 and 2");
+    CHECK(fills[0].resting_id == 1 && fills[0].quantity == 5
+          && fills[0].batch_index == 3, "first fill: 5 vs order 1, batch index 3");
+    CHECK(fills[1].resting_id == 2 && fills[1].quantity == 3, "second fill: 3 vs order 2");
+    int lp[2]; long long lq[2]; int lo[2];
+    CHECK(ob_levels(ob5, SIDE_BID, 2, lp, lq, lo) == 1 && lp[0] == 100 && lq[0] == 2,
+          "bid level 100 has 2 left");
+
+    printf("--- 9. Fill Callback + Reduce + Stats ---\n");
+    long long acc[2] = { 0, 0 };
+    ob_set_fill_callback(ob5, count_fill, acc);
+    CHECK(ob_reduce_order(ob5, 3, 2) == 1, "reduce ask 3 from 4 to 2");
+    CHECK(ob_reduce_order(ob5, 3, 3) == 0, "reduce cannot increase quantity");
+    ob_add_order(ob5, 6, SIDE_BID, 101, 3);
+    CHECK(acc[0] == 1 && acc[1] == 2, "callback saw one fill of 2");
+    struct ob_stats st;
+    ob_get_stats(ob5, &st);
+    CHECK(st.fills == 3 && st.volume == 10, "3 fills, volume 10");
+    CHECK(st.notional == 5 * 100 + 3 * 100 + 2 * 101, "notional in price ticks");
+    CHECK(st.bid_orders == 2 && st.bid_qty == 3 && st.ask_orders == 0,
+          "resting: bid 2 @ 100, bid 1 @ 101, no asks");
+    ob_destroy(ob5);
 }
 
 int main(void)
@@ -8,6 +8,10 @@
  *   - Matching: when a new order arrives, check if it crosses the best
  *     opposite price; if so, execute fills until the order is filled or
  *     no more crossing levels remain.
+ *   - Order id index: a chained hash table of resting orders, and queues
+ *     doubly linked, so cancel is O(1) plus the BST removal of an emptied
+ *     level.
+ *   - Fills go to a sink (callback, fill buffer or stdout), see emit_fill.
  *
  * CS 136 concepts demonstrated:
  *   S6  : Queue ADT (FIFO order queue at each price level)
@@ -31,6 +35,9 @@ struct order_node {
     int quantity;
     order_side_t side;
     struct order_node *next;   /* next in FIFO queue */
+    struct order_node *prev;   /* previous in FIFO queue */
+    struct order_node *hnext;  /* next in id hash bucket chain */
+    struct price_level *level; /* level the order rests in */
 };
 
 /* ── Price level (BST node + Queue wrapper — S6/S9) ──────────────────────── */
@@ -42,6 +49,7 @@ struct price_level {
     struct order_node *front;   /* remove from front (oldest) */
     struct order_node *back;    /* add to back (newest)       */
     int order_count;
+    long long total_qty;        /* sum of remaining quantity in the queue */
 
     /* BST links (S9) */
     struct price_level *left;
@@ -55,6 +63,30 @@ struct order_book {
     struct price_level *asks;    /* BST root — sell orders */
     int total_fills;
     int total_volume_filled;
+
+    /* Order id → resting order (chained hash table, power-of-two size) */
+    struct order_node **buckets;
+    unsigned int n_buckets;
+    int n_orders;
+
+    /* Session counters (ob_get_stats) */
+    long long volume;
+    long long notional;
+    int min_price;
+    int max_price;
+    int bid_orders;
+    int ask_orders;
+    long long bid_qty;
+    long long ask_qty;
+
+    /* Fill sinks */
+    ob_fill_fn fill_fn;
+    void *fill_ctx;
+    int recording;
+    int batch_index;
+    struct ob_fill *fills;       /* fill buffer, grown by doubling */
+    int n_fills;
+    int fills_cap;
 };
 
 /* ── Static helpers — module scope (S6) ───────────────────────────────────── */
@@ -71,6 +103,7 @@ static struct price_level *pl_create(int price)
     pl->front       = NULL;
     pl->back        = NULL;
     pl->order_count = 0;
+    pl->total_qty   = 0;
     pl->left        = NULL;
     pl->right       = NULL;
     return pl;
@@ -81,7 +114,9 @@ static struct price_level *pl_create(int price)
  */
 static void pl_enqueue(struct price_level *pl, struct order_node *order)
 {
-    order->next = NULL;
+    order->next  = NULL;
+    order->prev  = pl->back;
+    order->level = pl;
     if (!pl->back) {
         pl->front = order;
         pl->back  = order;
@@ -90,6 +125,7 @@ static void pl_enqueue(struct price_level *pl, struct order_node *order)
         pl->back       = order;
     }
     pl->order_count++;
+    pl->total_qty += order->quantity;
 }
 
 /*
@@ -102,11 +138,85 @@ static struct order_node *pl_dequeue_front(struct price_level *pl)
     struct order_node *order = pl->front;
     pl->front = order->next;
     if (!pl->front) pl->back = NULL;
+    else            pl->front->prev = NULL;
     order->next = NULL;
     pl->order_count--;
+    pl->total_qty -= order->quantity;
     return order;
 }
 
+/*
+ * pl_unlink — remove an order from anywhere in the queue. O(1) with the
+ * prev links.
+ */
+static void pl_unlink(struct price_level *pl, struct order_node *order)
+{
+    if (order->prev) order->prev->next = order->next;
+    else             pl->front         = order->next;
+    if (order->next) order->next->prev = order->prev;
+    else             pl->back          = order->prev;
+    order->next = order->prev = NULL;
+    pl->order_count--;
+    pl->total_qty -= order->quantity;
+}
+
+/* ── Order id index (chained hash table) ──────────────────────────────────── */
+
+static unsigned int id_hash(const struct order_book *ob, int order_id)
+{
+    return ((unsigned int)order_id * 2654435761u) & (ob->n_buckets - 1);
+}
+
+static struct order_node *index_find(const struct order_book *ob, int order_id)
+{
+    struct order_node *node = ob->buckets[id_hash(ob, order_id)];
+    while (node && node->order_id != order_id) node = node->hnext;
+    return node;
+}
+
+/*
+ * index_grow — double the bucket array and rehash.
+ * Returns 0 if the allocation failed (the old table is kept).
+ */
+static int index_grow(struct order_book *ob)
+{
+    unsigned int old_n = ob->n_buckets;
+    struct order_node **old = ob->buckets;
+    struct order_node **buckets = calloc(old_n * 2, sizeof(*buckets));
+    if (!buckets) return 0;
+    ob->buckets   = buckets;
+    ob->n_buckets = old_n * 2;
+    for (unsigned int b = 0; b < old_n; b++) {
+        struct order_node *node = old[b];
+        while (node) {
+            struct order_node *next = node->hnext;
+            unsigned int h = id_hash(ob, node->order_id);
+            node->hnext = buckets[h];
+            buckets[h]  = node;
+            node = next;
+        }
+    }
+    free(old);
+    return 1;
+}
+
+static void index_insert(struct order_book *ob, struct order_node *order)
+{
+    if ((unsigned int)ob->n_orders >= ob->n_buckets) index_grow(ob);
+    unsigned int h = id_hash(ob, order->order_id);
+    order->hnext   = ob->buckets[h];
+    ob->buckets[h] = order;
+    ob->n_orders++;
+}
+
+static void index_remove(struct order_book *ob, struct order_node *order)
+{
+    struct order_node **link = &ob->buckets[id_hash(ob, order->order_id)];
+    while (*link != order) link = &(*link)->hnext;
+    *link = order->hnext;
+    ob->n_orders--;
+}
+
 /*
  * bst_find — find a price level in the BST by price (S9).
  * Returns the node or NULL.
@@ -194,6 +304,31 @@ static struct price_level *bst_remove_max(struct price_level *root,
     return root;
 }
 
+/*
+ * bst_remove — unlink the node with the given price (S9 BST removal).
+ * A node with two children is replaced by its in-order successor.
+ * Returns the new root; the removed node is not freed.
+ */
+static struct price_level *bst_remove(struct price_level *root, int price)
+{
+    if (!root) return NULL;
+    if (price < root->price) {
+        root->left  = bst_remove(root->left, price);
+        return root;
+    }
+    if (price > root->price) {
+        root->right = bst_remove(root->right, price);
+        return root;
+    }
+    if (!root->left)  return root->right;
+    if (!root->right) return root->left;
+    struct price_level *succ = NULL;
+    root->right = bst_remove_min(root->right, &succ);
+    succ->left  = root->left;
+    succ->right = root->right;
+    return succ;
+}
+
 /*
  * bst_destroy — recursively free all price levels and their order queues (S8/S9).
  * One free per malloc — every order_node and every price_level.
@@ -214,15 +349,6 @@ static void bst_destroy(struct price_level *root)
     free(root);
 }
 
-/*
- * bst_depth — count total orders in the BST (tree traversal S9).
- */
-static int bst_depth(const struct price_level *root)
-{
-    if (!root) return 0;
-    return root->order_count + bst_depth(root->left) + bst_depth(root->right);
-}
-
 /*
  * ob_get_or_create_level — find or create the price level in the given BST.
  * Updates *root if a new node is inserted.
@@ -239,12 +365,50 @@ static struct price_level *ob_get_or_create_level(struct price_level **root,
     return pl;
 }
 
+/*
+ * emit_fill — report one fill to the active sink(s): the fill buffer when
+ * recording, the callback when set, stdout when neither.
+ */
+static void emit_fill(struct order_book *ob, int aggressor_id,
+                      const struct order_node *resting,
+                      int price, int fill_qty)
+{
+    if (ob->recording) {
+        if (ob->n_fills == ob->fills_cap) {
+            int cap = ob->fills_cap ? ob->fills_cap * 2 : 64;
+            struct ob_fill *grown = realloc(ob->fills, cap * sizeof(*grown));
+            if (grown) {
+                ob->fills     = grown;
+                ob->fills_cap = cap;
+            }
+        }
+        if (ob->n_fills < ob->fills_cap) {
+            struct ob_fill *f = &ob->fills[ob->n_fills++];
+            f->batch_index  = ob->batch_index;
+            f->aggressor_id = aggressor_id;
+            f->resting_id   = resting->order_id;
+            f->price        = price;
+            f->quantity     = fill_qty;
+        }
+    }
+    if (ob->fill_fn) {
+        ob->fill_fn(ob->fill_ctx, aggressor_id, resting->order_id,
+                    price, fill_qty);
+    } else if (!ob->recording) {
+        printf("  FILL: order %d (%s @ %d) fills %d units @ %d\n",
+               resting->order_id,
+               (resting->side == SIDE_BID) ? "BID" : "ASK",
+               resting->price, fill_qty, price);
+    }
+}
+
 /*
  * try_match — attempt to match the incoming order against the opposite side.
  * Executes fills until the order is exhausted or no crossing levels remain.
  * Returns the remaining unfilled quantity.
  */
 static int try_match(struct order_book *ob,
+                     int incoming_id,
                      order_side_t incoming_side,
                      int incoming_price,
                      int incoming_qty)
@@ -270,18 +434,27 @@ static int try_match(struct order_book *ob,
             int fill_qty = (resting->quantity < remaining)
                            ? resting->quantity : remaining;
 
-            printf("  FILL: order %d (%s @ %d) fills %d units @ %d\n",
-                   resting->order_id,
-                   (resting->side == SIDE_BID) ? "BID" : "ASK",
-                   resting->price, fill_qty, best_opp->price);
+            emit_fill(ob, incoming_id, resting, best_opp->price, fill_qty);
 
-            resting->quantity -= fill_qty;
-            remaining         -= fill_qty;
+            resting->quantity      -= fill_qty;
+            best_opp->total_qty    -= fill_qty;
+            remaining              -= fill_qty;
             ob->total_fills++;
             ob->total_volume_filled += fill_qty;
+            ob->volume             += fill_qty;
+            ob->notional           += (long long)best_opp->price * fill_qty;
+            if (ob->min_price < 0 || best_opp->price < ob->min_price)
+                ob->min_price = best_opp->price;
+            if (best_opp->price > ob->max_price)
+                ob->max_price = best_opp->price;
+            if (resting->side == SIDE_BID) ob->bid_qty -= fill_qty;
+            else                           ob->ask_qty -= fill_qty;
 
             if (resting->quantity == 0) {
                 struct order_node *done = pl_dequeue_front(best_opp);
+                index_remove(ob, done);
+                if (done->side == SIDE_BID) ob->bid_orders--;
+                else                        ob->ask_orders--;
                 free(done);   /* one free for one malloc — S8 */
             }
         }
@@ -310,6 +483,28 @@ struct order_book *ob_create(void)
     ob->asks               = NULL;
     ob->total_fills        = 0;
     ob->total_volume_filled = 0;
+
+    ob->n_buckets = 1024;
+    ob->n_orders  = 0;
+    ob->buckets   = calloc(ob->n_buckets, sizeof(*ob->buckets));
+    if (!ob->buckets) { free(ob); return NULL; }
+
+    ob->volume     = 0;
+    ob->notional   = 0;
+    ob->min_price  = -1;
+    ob->max_price  = -1;
+    ob->bid_orders = 0;
+    ob->ask_orders = 0;
+    ob->bid_qty    = 0;
+    ob->ask_qty    = 0;
+
+    ob->fill_fn     = NULL;
+    ob->fill_ctx    = NULL;
+    ob->recording   = 0;
+    ob->batch_index = 0;
+    ob->fills       = NULL;
+    ob->n_fills     = 0;
+    ob->fills_cap   = 0;
     return ob;
 }
 
@@ -318,19 +513,27 @@ void ob_destroy(struct order_book *ob)
     if (!ob) return;
     bst_destroy(ob->bids);
     bst_destroy(ob->asks);
+    free(ob->buckets);
+    free(ob->fills);
     free(ob);
 }
 
-int ob_add_order(struct order_book *ob,
-                 int order_id,
-                 order_side_t side,
-                 int price,
-                 int quantity)
+/*
+ * add_one — match and rest one order; shared by ob_add_order and
+ * ob_add_orders. Fills are appended to whatever the sinks hold.
+ */
+static int add_one(struct order_book *ob,
+                   int order_id,
+                   order_side_t side,
+                   int price,
+                   int quantity)
 {
-    if (!ob || quantity <= 0 || price <= 0) return 0;
+    if (quantity <= 0 || price <= 0) return 0;
+    if (side != SIDE_BID && side != SIDE_ASK) return 0;
+    if (index_find(ob, order_id)) return 0;   /* id already resting */
 
     /* Attempt matching first */
-    int remaining = try_match(ob, side, price, quantity);
+    int remaining = try_match(ob, order_id, side, price, quantity);
     if (remaining == 0) return 1;   /* fully filled — no resting order */
 
     /* Rest the unfilled portion in the book */
@@ -348,47 +551,113 @@ int ob_add_order(struct order_book *ob,
     order->next     = NULL;
 
     pl_enqueue(pl, order);   /* FIFO enqueue — S6 Queue ADT */
+    index_insert(ob, order);
+    if (side == SIDE_BID) { ob->bid_orders++; ob->bid_qty += remaining; }
+    else                  { ob->ask_orders++; ob->ask_qty += remaining; }
     return 1;
 }
 
+int ob_add_order(struct order_book *ob,
+                 int order_id,
+                 order_side_t side,
+                 int price,
+                 int quantity)
+{
+    if (!ob) return 0;
+    ob->n_fills     = 0;
+    ob->batch_index = 0;
+    return add_one(ob, order_id, side, price, quantity);
+}
+
+int ob_add_orders(struct order_book *ob, int n,
+                  const int *order_ids, const int *sides,
+                  const int *prices, const int *quantities,
+                  int *status, int skip_invalid)
+{
+    if (!ob) return 0;
+    int saved     = ob->recording;
+    int i;
+    ob->recording = 1;
+    ob->n_fills   = 0;
+    for (i = 0; i < n; i++) {
+        ob->batch_index = i;
+        int ok = add_one(ob, order_ids[i], (order_side_t)sides[i],
+                         prices[i], quantities[i]);
+        if (status) status[i] = ok;
+        if (!ok && !skip_invalid) break;
+    }
+    ob->recording   = saved;
+    ob->batch_index = 0;
+    return i;
+}
+
 int ob_cancel_order(struct order_book *ob, int order_id)
 {
     if (!ob) return 0;
 
-    /* Search both sides' BSTs — O(n) in worst case */
-    struct price_level *sides[2] = { ob->bids, ob->asks };
-
-    for (int s = 0; s < 2; s++) {
-        /* BFS/DFS traversal of the BST to find the order */
-        /* Use a simple iterative in-order with a helper stack */
-        struct price_level *stack[256];
-        int top = 0;
-        struct price_level *cur = sides[s];
-
-        while (cur || top > 0) {
-            while (cur) { stack[top++] = cur; cur = cur->left; }
-            cur = stack[--top];
-
-            /* Search the queue at this level */
-            struct order_node *prev = NULL;
-            struct order_node *node = cur->front;
-            while (node) {
-                if (node->order_id == order_id) {
-                    /* Remove from linked list */
-                    if (prev) prev->next = node->next;
-                    else      cur->front = node->next;
-                    if (cur->back == node) cur->back = prev;
-                    cur->order_count--;
-                    free(node);   /* one free for one malloc — S8 */
-                    return 1;
-                }
-                prev = node;
-                node = node->next;
-            }
-            cur = cur->right;
-        }
+    /* O(1) lookup in the id index, O(1) unlink from the level queue */
+    struct order_node *node = index_find(ob, order_id);
+    if (!node) return 0;   /* not found */
+
+    struct price_level *pl = node->level;
+    pl_unlink(pl, node);
+    index_remove(ob, node);
+    if (node->side == SIDE_BID) { ob->bid_orders--; ob->bid_qty -= node->quantity; }
+    else                        { ob->ask_orders--; ob->ask_qty -= node->quantity; }
+
+    /* An emptied level leaves the BST, so best bid / ask stay exact (S9) */
+    if (!pl->front) {
+        if (node->side == SIDE_BID) ob->bids = bst_remove(ob->bids, pl->price);
+        else                        ob->asks = bst_remove(ob->asks, pl->price);
+        free(pl);
     }
-    return 0;   /* not found */
+    free(node);   /* one free for one malloc — S8 */
+    return 1;
+}
+
+int ob_reduce_order(struct order_book *ob, int order_id, int quantity)
+{
+    if (!ob) return 0;
+    struct order_node *node = index_find(ob, order_id);
+    if (!node || quantity <= 0 || quantity > node->quantity) return 0;
+    int delta = node->quantity - quantity;
+    node->quantity        = quantity;
+    node->level->total_qty -= delta;
+    if (node->side == SIDE_BID) ob->bid_qty -= delta;
+    else                        ob->ask_qty -= delta;
+    return 1;
+}
+
+int ob_order_info(const struct order_book *ob, int order_id,
+                  order_side_t *side, int *price, int *quantity)
+{
+    if (!ob) return 0;
+    const struct order_node *node = index_find(ob, order_id);
+    if (!node) return 0;
+    if (side)     *side     = node->side;
+    if (price)    *price    = node->price;
+    if (quantity) *quantity = node->quantity;
+    return 1;
+}
+
+void ob_set_fill_callback(struct order_book *ob, ob_fill_fn fn, void *ctx)
+{
+    if (!ob) return;
+    ob->fill_fn  = fn;
+    ob->fill_ctx = ctx;
+}
+
+void ob_record_fills(struct order_book *ob, int on)
+{
+    if (!ob) return;
+    ob->recording = on ? 1 : 0;
+    ob->n_fills   = 0;
+}
+
+const struct ob_fill *ob_fills(const struct order_book *ob, int *count)
+{
+    if (count) *count = ob ? ob->n_fills : 0;
+    return ob ? ob->fills : NULL;
 }
 
 int ob_best_bid(const struct order_book *ob)
@@ -416,7 +685,7 @@ int ob_spread(const struct order_book *ob)
 int ob_depth(const struct order_book *ob, order_side_t side)
 {
     if (!ob) return 0;
-    return bst_depth(side == SIDE_BID ? ob->bids : ob->asks);
+    return side == SIDE_BID ? ob->bid_orders : ob->ask_orders;
 }
 
 int ob_total_fills(const struct order_book *ob)
@@ -424,6 +693,56 @@ int ob_total_fills(const struct order_book *ob)
     return ob ? ob->total_fills : 0;
 }
 
+/*
+ * collect_levels — in-order walk writing up to `max` levels, best first
+ * (reverse order for bids). Stops descending once `max` is reached.
+ */
+static void collect_levels(const struct price_level *root, int desc, int max,
+                           int *n, int *prices, long long *quantities,
+                           int *orders)
+{
+    if (!root || *n >= max) return;
+    collect_levels(desc ? root->right : root->left, desc, max,
+                   n, prices, quantities, orders);
+    if (*n < max) {
+        if (prices)     prices[*n]     = root->price;
+        if (quantities) quantities[*n] = root->total_qty;
+        if (orders)     orders[*n]     = root->order_count;
+        (*n)++;
+    }
+    collect_levels(desc ? root->left : root->right, desc, max,
+                   n, prices, quantities, orders);
+}
+
+int ob_levels(const struct order_book *ob, order_side_t side, int max_levels,
+              int *prices, long long *quantities, int *orders)
+{
+    if (!ob) return 0;
+    int n = 0;
+    if (side == SIDE_BID)
+        collect_levels(ob->bids, 1, max_levels, &n, prices, quantities, orders);
+    else
+        collect_levels(ob->asks, 0, max_levels, &n, prices, quantities, orders);
+    return n;
+}
+
+void ob_get_stats(const struct order_book *ob, struct ob_stats *out)
+{
+    if (!out) return;
+    memset(out, 0, sizeof(*out));
+    out->min_price = out->max_price = -1;
+    if (!ob) return;
+    out->fills      = ob->total_fills;
+    out->volume     = ob->volume;
+    out->notional   = ob->notional;
+    out->min_price  = ob->min_price;
+    out->max_price  = ob->max_price;
+    out->bid_orders = ob->bid_orders;
+    out->ask_orders = ob->ask_orders;
+    out->bid_qty    = ob->bid_qty;
+    out->ask_qty    = ob->ask_qty;
+}
+
 /*
  * print_side — print up to `levels` price levels from one side (S9 in-order).
  * Bids: descending (highest first).  Asks: ascending (lowest first).
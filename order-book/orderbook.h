@@ -4,8 +4,13 @@
  * Models a financial exchange order book with bids and asks.
  * Each price level holds a FIFO queue of orders (Queue ADT — S6).
  * Price levels are stored in a BST for O(log n) lookup (S9).
+ * Resting orders are also indexed by id in a hash table (O(1) cancel).
  * The order_book type is opaque (S6/S8).
  *
+ * Fills are reported through a sink: a callback (ob_set_fill_callback),
+ * the book's fill buffer (ob_record_fills / ob_add_orders), or — when
+ * neither is set — printed to stdout as before.
+ *
  * CS 136 concepts used:
  *   S6  — ADT design (Queue for order queue, Dictionary for price BST)
  *         opaque structs, .h/.c module split, static helpers
@@ -23,6 +28,32 @@ typedef enum { SIDE_BID = 0, SIDE_ASK = 1 } order_side_t;
 /* Opaque order book type (S6/S8) */
 struct order_book;
 
+/* One execution: the incoming order traded against a resting one. */
+struct ob_fill {
+    int batch_index;    /* position in the ob_add_orders batch (0 otherwise) */
+    int aggressor_id;
+    int resting_id;
+    int price;          /* resting level price */
+    int quantity;
+};
+
+/* Session counters, see ob_get_stats. */
+struct ob_stats {
+    long long fills;
+    long long volume;
+    long long notional;     /* sum of price * quantity over all fills */
+    int min_price;          /* -1 before the first fill */
+    int max_price;
+    int bid_orders;
+    int ask_orders;
+    long long bid_qty;      /* remaining quantity resting per side */
+    long long ask_qty;
+};
+
+/* Fill callback: called once per fill, in execution order. */
+typedef void (*ob_fill_fn)(void *ctx, int aggressor_id, int resting_id,
+                           int price, int quantity);
+
 /*
  * ob_create — create an empty order book.
  * effects: allocates heap memory [caller must call ob_destroy]
@@ -39,7 +70,8 @@ void ob_destroy(struct order_book *ob);
  *   price    : limit price in cents (integer to avoid float rounding)
  *   quantity : number of units
  *
- * Returns 1 on success, 0 on failure.
+ * Returns 1 on success, 0 on failure (non-positive price or quantity,
+ * or order_id already resting).
  * Orders at the same price are queued FIFO (Queue ADT — S6).
  * If the order crosses the spread, it is matched immediately.
  */
@@ -49,12 +81,58 @@ int ob_add_order(struct order_book *ob,
                  int price,
                  int quantity);
 
+/*
+ * ob_add_orders — submit n orders in sequence, as n ob_add_order calls.
+ *   sides are 0 (BID) / 1 (ASK); status (may be NULL) receives 1 or 0
+ *   per processed order.
+ *   skip_invalid = 1 : rejected orders are skipped, all n are processed
+ *   skip_invalid = 0 : stop at the first rejected order
+ * Returns the number of orders processed: n, or the index of the first
+ * rejected order when stopping. The fills of the batch are left in the
+ * fill buffer (ob_fills), tagged with their batch index; a callback, if
+ * set, is also called.
+ */
+int ob_add_orders(struct order_book *ob, int n,
+                  const int *order_ids, const int *sides,
+                  const int *prices, const int *quantities,
+                  int *status, int skip_invalid);
+
 /*
  * ob_cancel_order — remove an order from the book by id.
  * Returns 1 if found and cancelled, 0 if not found.
+ * An emptied price level is removed from its BST.
  */
 int ob_cancel_order(struct order_book *ob, int order_id);
 
+/*
+ * ob_reduce_order — lower a resting order's quantity in place, keeping
+ * its queue position. Returns 1 on success, 0 if not found or if
+ * quantity is not in [1, current quantity].
+ */
+int ob_reduce_order(struct order_book *ob, int order_id, int quantity);
+
+/*
+ * ob_order_info — look up a resting order. Returns 1 and fills the
+ * non-NULL outputs if found, 0 otherwise.
+ */
+int ob_order_info(const struct order_book *ob, int order_id,
+                  order_side_t *side, int *price, int *quantity);
+
+/* ── Fill sinks ── */
+
+/* Route fills to fn(ctx, ...). fn = NULL restores the default. */
+void ob_set_fill_callback(struct order_book *ob, ob_fill_fn fn, void *ctx);
+
+/*
+ * ob_record_fills — when on, each ob_add_order call clears the fill
+ * buffer and records its own fills there (instead of printing them).
+ */
+void ob_record_fills(struct order_book *ob, int on);
+
+/* Fills recorded by the last add call; *count receives their number.
+ * The pointer is valid until the next add call. */
+const struct ob_fill *ob_fills(const struct order_book *ob, int *count);
+
 /* Best bid price (-1 if no bids). */
 int ob_best_bid(const struct order_book *ob);
 
@@ -67,6 +145,18 @@ int ob_spread(const struct order_book *ob);
 /* Total number of resting orders on the given side. */
 int ob_depth(const struct order_book *ob, order_side_t side);
 
+/*
+ * ob_levels — the best max_levels price levels of one side, best first
+ * (bids descending, asks ascending). Writes price, total quantity and
+ * order count per level into the non-NULL arrays; returns the number
+ * of levels written.
+ */
+int ob_levels(const struct order_book *ob, order_side_t side, int max_levels,
+              int *prices, long long *quantities, int *orders);
+
+/* Copy the session counters into *out. */
+void ob_get_stats(const struct order_book *ob, struct ob_stats *out);
+
 /*
  * ob_print — print the order book to stdout (top N levels per side).
  */
@@ -1,9 +1,12 @@
 """
 app.py — Limit Order Book Simulator: Streamlit dashboard
 
-Two modes:
+Three modes:
   1. Manual — submit and cancel orders interactively, watch fills happen
   2. Simulation — generate a random market and replay it in real time
+  3. Live — the agent-based simulator runs in a background thread
+     (live.py); the page redraws a cached frame at a fixed rate and never
+     touches the live book, so it stays responsive with 1e6+ resting orders
 
 Displays: live order book depth chart, VWAP, spread history,
 order flow imbalance, and trade log.
@@ -21,6 +24,8 @@ import time
 import random
 
 from orderbook import LimitOrderBook, Side
+from live import LiveMarket
+from simulator import SimConfig
 
 st.set_page_config(
     page_title="Order Book Simulator",
@@ -59,7 +64,7 @@ def add_log(msg: str):
 
 with st.sidebar:
     st.header("⚙️  Controls")
-    mode = st.radio("Mode", ["Manual", "Simulation"])
+    mode = st.radio("Mode", ["Manual", "Simulation", "Live"])
 
     st.divider()
 
@@ -88,6 +93,29 @@ with st.sidebar:
             ok = ob.cancel_order(int(cancel_id))
             add_log(f"CANCEL #{cancel_id}  →  {'OK' if ok else 'NOT FOUND'}")
 
+    elif mode == "Live":
+        st.subheader("Live Market")
+        live_preload = st.select_slider("Preloaded resting orders",
+                                        [0, 10_000, 100_000, 1_000_000, 2_000_000], 0)
+        live_fps     = st.slider("Frames per second", 1, 20, 5)
+        live_rate    = st.number_input("Max events/s (0 = unthrottled)",
+                                       value=0, step=1_000, min_value=0)
+        live_seed    = st.number_input("Random seed", value=42, step=1)
+
+        c_start, c_stop = st.columns(2)
+        if c_start.button("▶  Start", use_container_width=True):
+            old = st.session_state.get("live")
+            if old is not None:
+                old.stop()
+            with st.spinner("Building book…"):
+                st.session_state.live = LiveMarket(
+                    SimConfig(), seed=int(live_seed), fps=live_fps,
+                    max_rate=live_rate or None, preload=live_preload).start()
+            st.session_state.live_figs = {}
+        if c_stop.button("⏹  Stop", use_container_width=True):
+            if st.session_state.get("live") is not None:
+                st.session_state.live.stop()
+
     else:  # Simulation mode
         st.subheader("Simulation Parameters")
         sim_n       = st.slider("Orders to generate", 10, 500, 100)
@@ -105,7 +133,7 @@ with st.sidebar:
 
             rng = random.Random(seed)
             cur_mid = mid
-            n_fills = 0
+            batch   = {"ids": [], "sides": [], "prices": [], "qtys": []}
 
             for i in range(sim_n):
                 # Random walk on mid price
@@ -128,13 +156,16 @@ with st.sidebar:
                                else cur_mid + offset)
 
                 price = max(tick, round(price / tick) * tick)
-                oid   = get_id()
-                try:
-                    trades = ob.add_order(oid, side, price, qty)
-                    n_fills += len(trades)
-                except ValueError:
-                    pass
-
+                batch["ids"].append(get_id())
+                batch["sides"].append(side)
+                batch["prices"].append(price)
+                batch["qtys"].append(qty)
+
+            # One bulk submission; same per-order semantics as add_order
+            fills   = ob.add_orders(batch["ids"], batch["sides"],
+                                    batch["prices"], batch["qtys"],
+                                    skip_invalid=True)
+            n_fills = len(fills["price"])
             add_log(f"Simulation complete: {sim_n} orders, {n_fills} fills")
 
     st.divider()
@@ -144,6 +175,103 @@ with st.sidebar:
         st.session_state.log     = []
         add_log("Book reset.")
 
+# ── Live dashboard ────────────────────────────────────────────────────────────
+
+def envelope_figure(env: tuple, title: str, x_title: str, color: str):
+    """Downsampled series: min–max band plus the last value per bucket."""
+    x, lo, hi, last = env
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=x, y=hi, mode="lines", line=dict(width=0),
+                               showlegend=False, hoverinfo="skip"))
+    fig.add_trace(go.Scattergl(x=x, y=lo, mode="lines", line=dict(width=0),
+                               fill="tonexty", fillcolor="rgba(76,114,176,0.25)",
+                               showlegend=False, hoverinfo="skip"))
+    fig.add_trace(go.Scattergl(x=x, y=last, mode="lines",
+                               line=dict(color=color, width=1.5), name=title))
+    fig.update_layout(height=260, title=title, xaxis_title=x_title,
+                      showlegend=False, margin=dict(t=30, b=20, l=20, r=20))
+    return fig
+
+
+def live_figures(frame) -> dict:
+    """Figures for one frame; rebuilt only when a new frame is published."""
+    snap = frame.snapshot
+    fig_depth = go.Figure()
+    fig_depth.add_trace(go.Bar(
+        x=[p for p, _, _ in snap.bids], y=np.cumsum([q for _, q, _ in snap.bids]),
+        name="Bids", marker_color="rgba(0,180,100,0.7)"))
+    fig_depth.add_trace(go.Bar(
+        x=[p for p, _, _ in snap.asks], y=np.cumsum([q for _, q, _ in snap.asks]),
+        name="Asks", marker_color="rgba(220,50,50,0.7)"))
+    if snap.mid:
+        fig_depth.add_vline(x=snap.mid, line_dash="dot", line_color="gold",
+                            annotation_text=f"Mid {snap.mid:.3f}")
+    fig_depth.update_layout(barmode="overlay", height=320,
+                            xaxis_title="Price", yaxis_title="Cumulative Qty",
+                            legend=dict(orientation="h", y=1.05),
+                            margin=dict(t=30, b=20, l=20, r=20))
+    return {
+        "version": frame.version,
+        "depth":   fig_depth,
+        "trades":  envelope_figure(frame.trades, "Trade price", "Trade #", "#4C72B0"),
+        "spread":  envelope_figure(frame.spread, "Spread", "Simulated seconds",
+                                   "#DD8452"),
+    }
+
+
+def live_view():
+    live  = st.session_state.live
+    frame = live.frame                 # one attribute read; never blocks the worker
+    figs  = st.session_state.get("live_figs") or {}
+    if figs.get("version") != frame.version:
+        figs = st.session_state.live_figs = live_figures(frame)
+
+    snap, summary = frame.snapshot, frame.summary
+    m1, m2, m3, m4, m5, m6 = st.columns(6)
+    m1.metric("Best Bid", f"{snap.best_bid:.2f}" if snap.best_bid else "—")
+    m2.metric("Best Ask", f"{snap.best_ask:.2f}" if snap.best_ask else "—")
+    m3.metric("Spread",   f"{snap.spread:.4f}"   if snap.spread   else "—")
+    m4.metric("VWAP",     f"{summary['vwap']:.4f}" if summary.get("vwap") else "—")
+    m5.metric("Resting orders", f"{frame.resting_orders:,}")
+    m6.metric("Events/s", f"{frame.events_per_sec:,.0f}")
+    st.caption(f"{'running' if frame.running else 'stopped'} · frame {frame.version} · "
+               f"{frame.events:,} events · {summary.get('n_trades', 0):,} trades · "
+               f"{frame.sim_seconds:,.1f} simulated s")
+    if live.error is not None:
+        st.error(f"Worker stopped: {live.error!r}")
+
+    left_col, right_col = st.columns([3, 2])
+    with left_col:
+        st.plotly_chart(figs["depth"], use_container_width=True)
+    with right_col:
+        columns = ["Price", "Qty", "Orders"]
+        st.markdown("**Bid levels**")
+        st.dataframe(pd.DataFrame(list(snap.bids), columns=columns),
+                     hide_index=True, use_container_width=True)
+        st.markdown("**Ask levels**")
+        st.dataframe(pd.DataFrame(list(snap.asks), columns=columns),
+                     hide_index=True, use_container_width=True)
+    c1, c2 = st.columns(2)
+    c1.plotly_chart(figs["trades"], use_container_width=True)
+    c2.plotly_chart(figs["spread"], use_container_width=True)
+
+
+if mode == "Live":
+    if st.session_state.get("live") is None:
+        st.info("Start the live market from the sidebar.")
+    else:
+        # Redraw on a timer: st.fragment reruns only this part of the page
+        fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+        period   = 1.0 / st.session_state.live.fps
+        if fragment is not None:
+            fragment(run_every=period)(live_view)()
+        else:
+            live_view()
+            if st.session_state.live.running:
+                time.sleep(period)
+                st.rerun()
+    st.stop()
+
 # ── Main dashboard ────────────────────────────────────────────────────────────
 
 depth = ob.depth_snapshot(levels=8)
@@ -0,0 +1,73 @@
+"""
+bench_batch.py — add_orders (columnar batch) vs. a sequential add_order loop
+
+Generates one random order stream as NumPy columns, submits it to two
+fresh books — once order by order, once as a single add_orders call — and
+checks both books end in the same state before reporting throughput.
+
+Run: python bench_batch.py
+"""
+
+import gc
+import time
+
+import numpy as np
+
+from orderbook import LimitOrderBook, Side
+
+
+def make_batch(n: int, tick: float = 0.01, aggr_ratio: float = 0.3, seed: int = 0):
+    rng   = np.random.default_rng(seed)
+    sides = rng.integers(0, 2, n)                     # 0 = BID, 1 = ASK
+    aggr  = rng.random(n) < aggr_ratio
+    off   = rng.integers(1, 50, n)
+    sign  = np.where(sides == 0, -1, 1)               # passive: behind the mid
+    ticks = 10_000 + np.where(aggr, -sign * 5, sign * off)
+    return (np.arange(n, dtype=np.int64), sides,
+            np.round(ticks * tick, 2), rng.integers(1, 100, n))
+
+
+def run_sequential(ids, sides, prices, qtys) -> tuple[LimitOrderBook, float, int]:
+    ob    = LimitOrderBook("SEQ")
+    codes = (Side.BID, Side.ASK)
+    ids_l, sides_l = ids.tolist(), sides.tolist()
+    prices_l, qtys_l = prices.tolist(), qtys.tolist()
+    n_fills = 0
+    t0 = time.perf_counter()
+    for i in range(len(ids_l)):
+        n_fills += len(ob.add_order(ids_l[i], codes[sides_l[i]],
+                                    prices_l[i], qtys_l[i]))
+    return ob, time.perf_counter() - t0, n_fills
+
+
+def run_batch(ids, sides, prices, qtys) -> tuple[LimitOrderBook, float, int]:
+    ob = LimitOrderBook("BATCH")
+    t0 = time.perf_counter()
+    fills = ob.add_orders(ids, sides, prices, qtys)
+    return ob, time.perf_counter() - t0, len(fills["price"])
+
+
+if __name__ == "__main__":
+
+    # ── Config ────────────────────────────────────────────────────────────
+    N_ORDERS = 500_000
+    REPEATS  = 3        # alternate runs, keep the best of each
+
+    cols = make_batch(N_ORDERS)
+    t_seq = t_bat = float("inf")
+    for _ in range(REPEATS):
+        for runner in (run_sequential, run_batch):
+            gc.collect()
+            ob, t, n = runner(*cols)
+            if runner is run_sequential:
+                seq, t_seq, f_seq = ob, min(t_seq, t), n
+            else:
+                bat, t_bat, f_bat = ob, min(t_bat, t), n
+
+    same = (f_seq == f_bat
+            and seq.depth_snapshot(20) == bat.depth_snapshot(20)
+            and seq.trade_summary() == bat.trade_summary())
+    print(f"{N_ORDERS:,} orders, {f_seq:,} fills, identical end state: {same}")
+    print(f"  sequential add_order  {N_ORDERS / t_seq:>12,.0f} orders/s")
+    print(f"  add_orders batch      {N_ORDERS / t_bat:>12,.0f} orders/s  "
+          f"({t_seq / t_bat:.2f}x)")
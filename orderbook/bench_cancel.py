@@ -0,0 +1,68 @@
+"""
+bench_cancel.py — Cancel latency vs. price-level depth
+
+Cancel-heavy workload against a single deep price level: each step cancels
+a random resting order and immediately replaces it at the back of the
+queue, so the level depth stays constant while the cancelled order's
+position in the queue is uniformly random.
+
+With the intrusive linked-list PriceLevel the cancel is an index lookup
+plus an O(1) unlink, so latency should stay flat from 10 to 100k orders.
+
+Run: python bench_cancel.py
+"""
+
+import random
+import statistics
+import time
+
+from orderbook import LimitOrderBook, Side
+
+
+def bench_depth(depth: int, n_cancels: int, seed: int = 0) -> dict:
+    """Time n_cancels cancel+replace cycles on a level holding `depth` orders."""
+    rng = random.Random(seed)
+    ob  = LimitOrderBook("BENCH")
+
+    for oid in range(depth):
+        ob.add_order(oid, Side.BID, 100.0, 10)
+    # Opposite side so the bid level is never crossed
+    ob.add_order(-1, Side.ASK, 101.0, 10)
+
+    live    = list(range(depth))
+    next_id = depth
+    samples = []
+
+    for _ in range(n_cancels):
+        i   = rng.randrange(depth)
+        oid = live[i]
+
+        t0 = time.perf_counter_ns()
+        ob.cancel_order(oid)
+        samples.append(time.perf_counter_ns() - t0)
+
+        ob.add_order(next_id, Side.BID, 100.0, 10)
+        live[i]  = next_id
+        next_id += 1
+
+    samples.sort()
+    return {
+        "depth":   depth,
+        "cancels": n_cancels,
+        "p50_ns":  samples[len(samples) // 2],
+        "p99_ns":  samples[int(len(samples) * 0.99)],
+        "mean_ns": round(statistics.fmean(samples)),
+    }
+
+
+if __name__ == "__main__":
+
+    # ── Config ────────────────────────────────────────────────────────────
+    DEPTHS    = [10, 100, 1_000, 10_000, 100_000]
+    N_CANCELS = 20_000
+
+    print(f"{'depth':>9}  {'p50 ns':>8}  {'p99 ns':>8}  {'mean ns':>8}")
+    for d in DEPTHS:
+        r = bench_depth(d, N_CANCELS)
+        print(f"{r['depth']:>9,}  {r['p50_ns']:>8,}  "
+              f"{r['p99_ns']:>8,}  {r['mean_ns']:>8,}")
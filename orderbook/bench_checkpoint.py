@@ -0,0 +1,81 @@
+"""
+bench_checkpoint.py — book_at(ts) latency over a day of synthetic events
+
+Generates N_EVENTS spread over a 6.5 h session, builds a checkpoint index
+at each INTERVALS spacing, and times book_at() for random timestamps
+against replaying from the open (checked to give the same book).
+
+Run: python bench_checkpoint.py [workdir]
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from checkpoint import apply_events, build_index
+from orderbook import LimitOrderBook
+from replay import EVENT_DTYPE, generate_events
+
+
+def dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+if __name__ == "__main__":
+
+    # ── Config ────────────────────────────────────────────────────────────
+    N_EVENTS  = 600_000
+    SESSION_S = 6.5 * 3600
+    INTERVALS = [1800.0, 300.0, 60.0]      # seconds of event time
+    QUERIES   = 30
+    FULL_RUNS = 3                          # replays from the open to time
+
+    work = sys.argv[1] if len(sys.argv) > 1 else tempfile.mkdtemp(prefix="lobck_")
+    os.makedirs(work, exist_ok=True)
+    events_path = os.path.join(work, "day.bin")
+    generate_events(events_path, N_EVENTS, rate=N_EVENTS / SESSION_S)
+    events = np.memmap(events_path, EVENT_DTYPE, "r")
+    t_end  = float(events["ts"][-1])
+    rng    = random.Random(0)
+    probes = [rng.uniform(0, t_end) for _ in range(QUERIES)]
+
+    full_ms = []
+    for ts in probes[:FULL_RUNS]:
+        t0 = time.perf_counter()
+        full = LimitOrderBook("FULL", tick_size=0.01, trade_capacity=10_000)
+        apply_events(full, np.asarray(events[:np.searchsorted(events["ts"], ts, "right")]))
+        full_ms.append((time.perf_counter() - t0) * 1e3)
+    print(f"{N_EVENTS:,} events over {t_end / 3600:.1f} h; replay from the open: "
+          f"{statistics.mean(full_ms):,.0f} ms mean over {FULL_RUNS} queries\n")
+
+    print(f"{'interval s':>11}{'ckpts':>7}{'index MB':>10}{'build s':>9}"
+          f"{'p50 ms':>9}{'p90 ms':>9}{'max ms':>9}  same")
+    for interval in INTERVALS:
+        idx_dir = os.path.join(work, f"idx_{int(interval)}")
+        t0  = time.perf_counter()
+        idx = build_index(events_path, idx_dir, interval, tick_size=0.01)
+        build_s = time.perf_counter() - t0
+
+        lat = []
+        for ts in probes:
+            t0 = time.perf_counter()
+            book = idx.book_at(ts)
+            lat.append((time.perf_counter() - t0) * 1e3)
+        # Same depth and stats as a replay from the open
+        ts   = probes[0]
+        full = LimitOrderBook("FULL", tick_size=0.01, trade_capacity=10_000)
+        apply_events(full, np.asarray(events[:np.searchsorted(events["ts"], ts, "right")]))
+        asof = idx.book_at(ts)
+        same = (asof.depth_snapshot(50) == full.depth_snapshot(50)
+                and asof.trade_summary() == full.trade_summary())
+
+        lat.sort()
+        print(f"{interval:>11,.0f}{len(idx.checkpoints):>7}"
+              f"{dir_size(idx_dir) / 2**20:>10.1f}{build_s:>9.1f}"
+              f"{statistics.median(lat):>9.1f}{lat[int(0.9 * len(lat))]:>9.1f}"
+              f"{lat[-1]:>9.1f}  {same}")
@@ -0,0 +1,61 @@
+"""
+bench_feed.py — Cost of the delta feed and of reading an L2 view from it
+
+  1. the same order stream submitted with no subscriber and with an
+     L2BookBuilder subscribed (publishing overhead per order)
+  2. reading the top 10 levels: book.depth_snapshot(10) vs.
+     builder.depth(10) — checks they agree
+
+Run: python bench_feed.py
+"""
+
+import time
+
+from bench_batch import make_batch
+from feed import L2BookBuilder
+from orderbook import LimitOrderBook, Side
+
+
+def submit_all(ob: LimitOrderBook, cols) -> float:
+    ids, sides, prices, qtys = (c.tolist() for c in cols)
+    codes = (Side.BID, Side.ASK)
+    add   = ob.add_order
+    t0 = time.perf_counter()
+    for i in range(len(ids)):
+        add(ids[i], codes[sides[i]], prices[i], qtys[i])
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+
+    # ── Config ────────────────────────────────────────────────────────────
+    N_ORDERS = 200_000
+    READS    = 50_000
+
+    cols = make_batch(N_ORDERS)
+
+    plain = LimitOrderBook("PLAIN", tick_size=0.01)
+    t_plain = submit_all(plain, cols)
+
+    fed  = LimitOrderBook("FED", tick_size=0.01)
+    view = L2BookBuilder()
+    fed.subscribe(view)
+    t_fed = submit_all(fed, cols)
+
+    print(f"{N_ORDERS:,} orders, {view.events:,} events "
+          f"({view.events / N_ORDERS:.1f} per order)")
+    print(f"  no subscriber       {N_ORDERS / t_plain:>12,.0f} orders/s")
+    print(f"  L2BookBuilder       {N_ORDERS / t_fed:>12,.0f} orders/s  "
+          f"(+{(t_fed - t_plain) / N_ORDERS * 1e9:,.0f} ns/order)")
+
+    t0 = time.perf_counter()
+    for _ in range(READS):
+        fed.depth_snapshot(10)
+    t_snap = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(READS):
+        view.depth(10)
+    t_view = time.perf_counter() - t0
+    print(f"\nTop-10 read, identical: {fed.depth_snapshot(10) == view.depth(10)}")
+    print(f"  book.depth_snapshot {t_snap / READS * 1e9:>10,.0f} ns/read")
+    print(f"  builder.depth       {t_view / READS * 1e9:>10,.0f} ns/read")
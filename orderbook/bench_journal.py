@@ -0,0 +1,88 @@
+"""
+bench_journal.py — Journaling overhead and recovery time
+
+  1. add_order throughput on a plain book vs. a JournaledBook, without
+     fsync and with fsync at several group-commit sizes
+  2. recovery of the same session by full journal replay vs. snapshot
+     (taken at SNAPSHOT_AT of the stream) + journal tail
+
+Run: python bench_journal.py [workdir]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from bench_batch import make_batch
+from journal import Journal, JournaledBook, recover
+from orderbook import LimitOrderBook, Side
+
+
+def submit(book, cols, n: int | None = None) -> float:
+    ids, sides, prices, qtys = (c.tolist() for c in cols)
+    n     = len(ids) if n is None else n
+    codes = (Side.BID, Side.ASK)
+    t0 = time.perf_counter()
+    for i in range(n):
+        book.add_order(ids[i], codes[sides[i]], prices[i], qtys[i])
+    return n / (time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+
+    # ── Config ────────────────────────────────────────────────────────────
+    N_ORDERS     = 200_000
+    FSYNC_ORDERS = 5_000            # per-op fsync is slow: fewer orders
+    GROUPS       = [1, 16, 256, 4096]
+    SNAPSHOT_AT  = 0.9
+
+    work = sys.argv[1] if len(sys.argv) > 1 else tempfile.mkdtemp(prefix="lobj_")
+    os.makedirs(work, exist_ok=True)
+    cols = make_batch(N_ORDERS)
+
+    def fresh(name: str) -> str:
+        path = os.path.join(work, name)
+        if os.path.exists(path):
+            os.remove(path)
+        return path
+
+    print(f"Journal overhead ({work})")
+    print(f"  {'plain book':<28}{submit(LimitOrderBook('P', tick_size=0.01), cols):>12,.0f} orders/s")
+    jb = JournaledBook(LimitOrderBook("J", tick_size=0.01),
+                       Journal(fresh("nofsync.journal"), fsync=False))
+    print(f"  {'journal, no fsync':<28}{submit(jb, cols):>12,.0f} orders/s")
+    jb.close()
+    for g in GROUPS:
+        n  = FSYNC_ORDERS if g < 256 else N_ORDERS
+        jb = JournaledBook(LimitOrderBook("J", tick_size=0.01),
+                           Journal(fresh(f"g{g}.journal"), commit_every=g,
+                                   commit_interval=float("inf")))
+        rate = submit(jb, cols, n)
+        jb.close()
+        print(f"  {f'journal, fsync every {g}':<28}{rate:>12,.0f} orders/s  "
+              f"({jb.journal.commits:,} fsyncs)")
+
+    # Recovery: journal everything, snapshot at SNAPSHOT_AT
+    j_path, s_path = fresh("session.journal"), fresh("session.snap")
+    live = JournaledBook(LimitOrderBook("LIVE", tick_size=0.01),
+                         Journal(j_path, fsync=False))
+    cut  = int(N_ORDERS * SNAPSHOT_AT)
+    ids, sides, prices, qtys = (c.tolist() for c in cols)
+    for i in range(N_ORDERS):
+        live.add_order(ids[i], (Side.BID, Side.ASK)[sides[i]], prices[i], qtys[i])
+        if i + 1 == cut:
+            live.snapshot(s_path)
+    live.close()
+
+    print(f"\nRecovery of {N_ORDERS:,} journaled orders, "
+          f"{len(live.book._order_index):,} resting")
+    for label, snap in (("full journal replay", None), ("snapshot + tail", s_path)):
+        t0 = time.perf_counter()
+        book, t = recover(j_path, snap, tick_size=0.01)
+        dt = time.perf_counter() - t0
+        same = (book.depth_snapshot(20) == live.depth_snapshot(20)
+                and book.trade_summary() == live.trade_summary())
+        print(f"  {label:<22}{dt:>8.2f} s  (snapshot {t['snapshot_s']:.2f} s, "
+              f"{t['journal_records']:,} records {t['journal_s']:.2f} s)  "
+              f"identical={same}")
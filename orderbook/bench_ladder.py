@@ -0,0 +1,99 @@
+"""
+bench_ladder.py — SortedDict vs. PriceLadder level store
+
+Runs the same workloads on a level_store="sorted" and a level_store="ladder"
+book, interleaved and best-of REPEATS (single runs are noise-dominated):
+
+  levels   new price level just inside the touch, best-price read, cancel —
+           the level insert / peek / delete pattern of quote churn
+  stream   the bench_batch order stream through add_order (mostly resting
+           adds plus crossing orders near the touch)
+  drift    the same churn on an otherwise empty bid side while the price
+           walks down ~1000 ticks, so the ladder window has to re-centre
+           (shows the far-map fallback cost)
+
+Run: python bench_ladder.py
+"""
+
+import random
+import time
+
+from bench_batch import make_batch
+from orderbook import LimitOrderBook, Side
+
+
+def book(store: str, size: int) -> LimitOrderBook:
+    return LimitOrderBook(store.upper(), tick_size=0.01, level_store=store,
+                          ladder_size=size)
+
+
+def seed(ob: LimitOrderBook, mid: float, depth: int):
+    """Background book: one order every other tick, depth levels per side."""
+    oid = 10_000_000
+    for k in range(1, depth + 1):
+        oid += 2
+        ob.add_order(oid,     Side.BID, round(mid - 0.02 * k, 2), 100)
+        ob.add_order(oid + 1, Side.ASK, round(mid + 0.02 * k, 2), 100)
+
+
+def levels(ob: LimitOrderBook, n: int, drift: float = 0.0) -> float:
+    # Prices on the empty odd ticks next to the touch → always a new level
+    rng  = random.Random(1)
+    mid  = 100.0
+    pxs  = [round(mid - 0.01 - 0.02 * rng.randrange(4), 2) for _ in range(n)]
+    add, cancel, best = ob.add_order, ob.cancel_order, ob.best_bid
+    t0 = time.perf_counter()
+    for i in range(n):
+        add(i, Side.BID, round(pxs[i] + drift * i, 2), 10)
+        best()
+        cancel(i)
+    return n / (time.perf_counter() - t0)
+
+
+def stream(ob: LimitOrderBook, cols) -> float:
+    ids, sides, prices, qtys = (c.tolist() for c in cols)
+    codes, add = (Side.BID, Side.ASK), ob.add_order
+    t0 = time.perf_counter()
+    for i in range(len(ids)):
+        add(ids[i], codes[sides[i]], prices[i], qtys[i])
+    return len(ids) / (time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+
+    # ── Config ────────────────────────────────────────────────────────────
+    N_OPS    = 100_000
+    N_ORDERS = 100_000
+    DEPTH    = 500                   # resting levels per side for `levels`
+    SIZES    = [1024, 4096]          # ladder window widths
+    REPEATS  = 5
+
+    cols  = make_batch(N_ORDERS)
+    cases = [("sorted", 0)] + [("ladder", s) for s in SIZES]
+
+    def run(workload):
+        best = {c: 0.0 for c in cases}
+        for _ in range(REPEATS):
+            for store, size in cases:
+                best[(store, size)] = max(best[(store, size)], workload(store, size))
+        return best
+
+    def churn(drift, depth):
+        def w(store, size):
+            ob = book(store, size or 4096)
+            seed(ob, 100.0, depth)
+            return levels(ob, N_OPS, drift)
+        return w
+
+    results = {
+        "levels": run(churn(0.0, DEPTH)),
+        "stream": run(lambda store, size: stream(book(store, size or 4096), cols)),
+        "drift":  run(churn(-0.0001, 0)),
+    }
+
+    print(f"best of {REPEATS}, ops/s")
+    print(f"{'store':<14}" + "".join(f"{w:>12}" for w in results))
+    for store, size in cases:
+        label = store if store == "sorted" else f"ladder {size}"
+        print(f"{label:<14}" + "".join(f"{r[(store, size)]:>12,.0f}"
+                                        for r in results.values()))
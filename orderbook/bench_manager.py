@@ -0,0 +1,69 @@
+"""
+bench_manager.py — BookManager aggregate throughput vs. shard count
+
+One random order stream over N_SYMBOLS symbols is routed through a
+BookManager in-process and with 1, 2, 4 and 8 worker processes. Time runs
+from the first submit to the counts() barrier, so it includes routing,
+batching, pickling and matching. Fill counts must match across runs.
+
+Scaling is bounded by the cores available (printed) and by the single
+routing process, which costs ~1 µs per order.
+
+Run: python bench_manager.py
+"""
+
+import os
+import time
+
+import numpy as np
+
+from manager import BookManager
+
+
+def make_stream(n: int, n_symbols: int, seed: int = 0):
+    rng   = np.random.default_rng(seed)
+    syms  = rng.integers(0, n_symbols, n)
+    sides = rng.integers(0, 2, n)
+    aggr  = rng.random(n) < 0.3
+    off   = rng.integers(1, 50, n)
+    sign  = np.where(sides == 0, -1, 1)
+    ticks = 10_000 + np.where(aggr, -sign * 5, sign * off)
+    return (syms.tolist(), sides.tolist(), np.round(ticks * 0.01, 2).tolist(),
+            rng.integers(1, 100, n).tolist())
+
+
+def run(symbols: list[str], stream, shards: int, batch_size: int) -> tuple[float, int]:
+    sym_idx, sides, prices, qtys = stream
+    with BookManager(symbols, shards=shards, batch_size=batch_size,
+                     tick_size=0.01, clock="seq") as mgr:
+        submit = mgr.submit
+        t0 = time.perf_counter()
+        for i in range(len(sym_idx)):
+            submit(symbols[sym_idx[i]], i, sides[i], prices[i], qtys[i])
+        counts = mgr.counts()
+        dt = time.perf_counter() - t0
+    return dt, sum(c["fills"] for c in counts.values())
+
+
+if __name__ == "__main__":
+
+    # ── Config ────────────────────────────────────────────────────────────
+    N_SYMBOLS  = 200
+    N_ORDERS   = 400_000
+    BATCH_SIZE = 4096
+    SHARDS     = [0, 1, 2, 4, 8]          # 0 = in-process, no workers
+
+    symbols = [f"SYM{i:03d}" for i in range(N_SYMBOLS)]
+    stream  = make_stream(N_ORDERS, N_SYMBOLS)
+    print(f"{N_ORDERS:,} orders over {N_SYMBOLS} symbols, "
+          f"batch {BATCH_SIZE}, {os.cpu_count()} CPU(s)")
+    print(f"{'shards':>8}{'orders/s':>14}{'vs 1 shard':>12}{'fills':>10}")
+    base = None
+    for shards in SHARDS:
+        dt, fills = run(symbols, stream, shards, BATCH_SIZE)
+        rate = N_ORDERS / dt
+        if shards == 1:
+            base = rate
+        rel = f"{rate / base:.2f}x" if base else "—"
+        label = "in-proc" if shards == 0 else str(shards)
+        print(f"{label:>8}{rate:>14,.0f}{rel:>12}{fills:>10,}")
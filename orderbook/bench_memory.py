@@ -0,0 +1,117 @@
+"""
+bench_memory.py — Memory per resting order and full-GC pause
+
+Measures the bare Order record (bytes per instance), then builds a book
+with N_ORDERS passive orders (no fills) and reports
+  - bytes per resting order (tracemalloc, whole book incl. index and levels)
+  - build throughput
+  - gc.collect() pause with the book alive (best of GC_REPEATS)
+
+"before" swaps in the previous Order layout — a plain @dataclass with a
+per-instance __dict__ and an eager time.time() default — to show what the
+__slots__ record and the cheaper clocks save.
+
+Run: python bench_memory.py
+"""
+
+from __future__ import annotations
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+
+import numpy as np
+
+import orderbook
+from orderbook import LimitOrderBook, Side
+
+SlotsOrder = orderbook.Order
+
+
+@dataclass
+class LegacyOrder:
+    order_id:  int
+    side:      Side
+    price:     float
+    quantity:  int
+    timestamp: float = field(default_factory=time.time)
+    prev: LegacyOrder | None = field(default=None, repr=False, compare=False)
+    next: LegacyOrder | None = field(default=None, repr=False, compare=False)
+
+
+def make_orders(n: int, levels: int = 1_000, seed: int = 0):
+    rng   = np.random.default_rng(seed)
+    sides = np.repeat([0, 1], [n // 2, n - n // 2])
+    off   = rng.integers(1, levels + 1, n)
+    ticks = np.where(sides == 0, 10_000 - off, 10_000 + off)
+    return (list(range(n)), sides.tolist(), np.round(ticks * 0.01, 2).tolist(),
+            rng.integers(1, 100, n).tolist())
+
+
+def object_bytes(cls, n: int = 100_000) -> float:
+    """Bytes per bare instance, excluding the list slot that holds it."""
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    keep = [cls(i, Side.BID, 10_000, 5, 0.0) for i in range(n)]
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del keep
+    return used / n - 8
+
+
+def measure(cols, clock: str, legacy: bool = False, gc_repeats: int = 3) -> dict:
+    ids, sides, prices, qtys = cols
+    codes = (Side.BID, Side.ASK)
+    if legacy:
+        orderbook.Order = LegacyOrder
+    try:
+        gc.collect()
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        ob   = LimitOrderBook("MEM", tick_size=0.01, clock=clock)
+        add  = ob.add_order
+        t0   = time.perf_counter()
+        for i in range(len(ids)):
+            add(ids[i], codes[sides[i]], prices[i], qtys[i])
+        build = time.perf_counter() - t0
+        used  = tracemalloc.get_traced_memory()[0] - base
+        tracemalloc.stop()
+    finally:
+        orderbook.Order = SlotsOrder
+
+    pause = float("inf")
+    for _ in range(gc_repeats):
+        t0 = time.perf_counter()
+        gc.collect()
+        pause = min(pause, time.perf_counter() - t0)
+    result = {"bytes_per_order": used / len(ids),
+              "orders_per_s":    len(ids) / build,
+              "gc_pause_ms":     pause * 1e3,
+              "gc_objects":      len(gc.get_objects())}
+    del ob
+    gc.collect()
+    return result
+
+
+if __name__ == "__main__":
+
+    # ── Config ────────────────────────────────────────────────────────────
+    N_ORDERS   = 500_000
+    GC_REPEATS = 5
+
+    print(f"Order record: {object_bytes(LegacyOrder):.0f} B with __dict__ → "
+          f"{object_bytes(SlotsOrder):.0f} B with __slots__\n")
+
+    cols = make_orders(N_ORDERS)
+    runs = [("before: dict Order, wall", "wall", True),
+            ("slots Order, wall",        "wall", False),
+            ("slots Order, ns",          "ns",   False),
+            ("slots Order, seq",         "seq",  False)]
+
+    print(f"{N_ORDERS:,} resting orders (tracemalloc slows the build ~2x; "
+          f"compare rows, not absolutes)")
+    print(f"{'':<26}{'B/order':>9}{'orders/s':>12}{'full GC ms':>12}{'GC objects':>13}")
+    for label, clock, legacy in runs:
+        r = measure(cols, clock, legacy, GC_REPEATS)
+        print(f"{label:<26}{r['bytes_per_order']:>9,.0f}{r['orders_per_s']:>12,.0f}"
+              f"{r['gc_pause_ms']:>12,.1f}{r['gc_objects']:>13,}")
@@ -0,0 +1,64 @@
+"""
+bench_modify.py — Cancel/replace-heavy workload: modify_order vs. cancel + add
+
+A deep bid level holds DEPTH orders. Each step picks a random resting
+order and reduces its size by one lot, either
+  - modify_order(id, quantity=q-1)          in place, keeps queue position
+  - cancel_order(id) + add_order(id, ..)    the pre-amend way: requeues at
+                                            the back of the level
+and, for reference, moves it one tick away and back with modify_order
+(price change → requeue).
+
+Run: python bench_modify.py
+"""
+
+import random
+import time
+
+from orderbook import LimitOrderBook, Side
+
+START_QTY = 1_000_000_000     # large enough to shrink by one lot per step
+
+
+def build(depth: int) -> LimitOrderBook:
+    ob = LimitOrderBook("BENCH", tick_size=0.01)
+    ob.add_orders(range(depth), [0] * depth, [100.0] * depth, [START_QTY] * depth)
+    ob.add_order(-1, Side.ASK, 101.0, 10)       # keep the bid level uncrossed
+    return ob
+
+
+def run(depth: int, steps: int, mode: str, seed: int = 0) -> float:
+    """Mean ns per amend."""
+    rng = random.Random(seed)
+    ob  = build(depth)
+    ids = [rng.randrange(depth) for _ in range(steps)]
+    clock = time.perf_counter_ns
+    index = ob._order_index
+
+    t = clock()
+    if mode == "modify":
+        for oid in ids:
+            ob.modify_order(oid, quantity=index[oid].quantity - 1)
+    elif mode == "cancel+add":
+        for oid in ids:
+            q = index[oid].quantity
+            ob.cancel_order(oid)
+            ob.add_order(oid, Side.BID, 100.0, q - 1)
+    else:                                       # price change and back
+        for oid in ids:
+            ob.modify_order(oid, price=99.99)
+            ob.modify_order(oid, price=100.0)
+    dt = clock() - t
+    return dt / steps / (2 if mode == "reprice" else 1)
+
+
+if __name__ == "__main__":
+
+    # ── Config ────────────────────────────────────────────────────────────
+    DEPTHS = [10, 1_000, 100_000]
+    STEPS  = 50_000
+
+    print(f"{'depth':>9}  {'modify qty↓':>12}  {'cancel+add':>12}  {'modify price':>12}   ns/op")
+    for d in DEPTHS:
+        row = [run(d, STEPS, m) for m in ("modify", "cancel+add", "reprice")]
+        print(f"{d:>9,}  {row[0]:>12,.0f}  {row[1]:>12,.0f}  {row[2]:>12,.0f}")
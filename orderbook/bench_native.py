@@ -0,0 +1,132 @@
+"""
+bench_native.py — NativeOrderBook (C via ctypes) vs. LimitOrderBook
+
+  1. parity: random add / cancel / modify streams (including invalid
+     requests) run through both engines; every call's result, the depth,
+     the quantity totals and the trade summary must match
+  2. throughput: the bench_batch order stream through add_order and
+     add_orders on each engine, plus the C book with a Python on_fill
+     callback
+
+Run: python bench_native.py
+"""
+
+import random
+import time
+
+from bench_batch import make_batch
+from native import NativeOrderBook
+from orderbook import LimitOrderBook, Side
+
+
+def parity(seed: int, n_ops: int = 20_000) -> int:
+    """Run one random session through both books; returns ops compared."""
+    rng  = random.Random(seed)
+    py   = LimitOrderBook("PY", tick_size=0.01)
+    c    = NativeOrderBook("C", tick_size=0.01)
+    live = []
+
+    def both(method, *args):
+        results = []
+        for book in (py, c):
+            try:
+                out = getattr(book, method)(*args)
+            except ValueError as e:
+                out = ("ValueError", str(e))
+            results.append(out)
+        a, b = results
+        if isinstance(a, list):      # Trade lists: compare all but timestamps
+            a = [(t.aggressor_id, t.resting_id, t.price, t.quantity) for t in a]
+            b = [(t.aggressor_id, t.resting_id, t.price, t.quantity) for t in b]
+        assert a == b, (seed, method, args, a, b)
+
+    next_id = 1
+    for _ in range(n_ops):
+        r = rng.random()
+        if r < 0.6 or not live:
+            side  = rng.choice((Side.BID, Side.ASK))
+            px    = round(100 + rng.randint(-30, 30) * 0.01, 2)
+            qty   = rng.randint(1, 100)
+            if rng.random() < 0.01:
+                px = round(px + 0.005, 3)            # off tick
+            oid = next_id if rng.random() > 0.01 else rng.choice(live or [1])
+            both("add_order", oid, side, px, qty)
+            live.append(oid)
+            next_id += 1
+        elif r < 0.85:
+            oid = live.pop(rng.randrange(len(live)))
+            both("cancel_order", oid)
+        else:
+            oid = rng.choice(live)
+            px  = None if rng.random() < 0.5 else round(100 + rng.randint(-30, 30) * 0.01, 2)
+            qty = None if rng.random() < 0.3 else rng.randint(1, 120)
+            both("modify_order", oid, px, qty)
+        if rng.random() < 0.05:
+            both("depth_snapshot", 10)
+            both("spread")
+            both("mid_price")
+
+    assert py.depth_snapshot(1000) == c.depth_snapshot(1000), seed
+    assert py.total_bid_qty() == c.total_bid_qty(), seed
+    assert py.total_ask_qty() == c.total_ask_qty(), seed
+    assert py.trade_summary() == c.trade_summary(), seed
+    return n_ops
+
+
+def batch_parity(n: int = 50_000) -> bool:
+    ids, sides, prices, qtys = make_batch(n)
+    ids[n // 2] = ids[n // 3]                        # one duplicate
+    prices[n // 4] = -1.0                            # one bad price
+    py, c = LimitOrderBook("PY", tick_size=0.01), NativeOrderBook("C", tick_size=0.01)
+    a = py.add_orders(ids, sides, prices, qtys, skip_invalid=True)
+    b = c.add_orders(ids, sides, prices, qtys, skip_invalid=True)
+    return (all((a[k] == b[k]).all() for k in a)
+            and py.depth_snapshot(1000) == c.depth_snapshot(1000)
+            and py.trade_summary() == c.trade_summary())
+
+
+def loop_rate(book, cols) -> float:
+    ids, sides, prices, qtys = (x.tolist() for x in cols)
+    codes, add = (Side.BID, Side.ASK), book.add_order
+    t0 = time.perf_counter()
+    for i in range(len(ids)):
+        add(ids[i], codes[sides[i]], prices[i], qtys[i])
+    return len(ids) / (time.perf_counter() - t0)
+
+
+def batch_rate(book, cols) -> float:
+    t0 = time.perf_counter()
+    book.add_orders(*cols)
+    return len(cols[0]) / (time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+
+    # ── Config ────────────────────────────────────────────────────────────
+    SEEDS    = range(10)
+    N_ORDERS = 300_000
+    REPEATS  = 3
+
+    ops = sum(parity(s) for s in SEEDS)
+    print(f"parity: {ops:,} random ops over {len(SEEDS)} sessions identical; "
+          f"add_orders batch identical={batch_parity()}\n")
+
+    cols   = make_batch(N_ORDERS)
+    n_cb   = [0]
+    on_cb  = lambda agg, rest, px, qty: n_cb.__setitem__(0, n_cb[0] + 1)
+    cases  = [
+        ("python add_order",          lambda: loop_rate(LimitOrderBook("P", tick_size=0.01), cols)),
+        ("C add_order",               lambda: loop_rate(NativeOrderBook("C"), cols)),
+        ("python add_orders",         lambda: batch_rate(LimitOrderBook("P", tick_size=0.01), cols)),
+        ("C add_orders",              lambda: batch_rate(NativeOrderBook("C"), cols)),
+        ("C add_orders + on_fill",    lambda: batch_rate(NativeOrderBook("C", on_fill=on_cb), cols)),
+    ]
+    best = {label: 0.0 for label, _ in cases}
+    for _ in range(REPEATS):                         # interleaved, best of
+        for label, run in cases:
+            best[label] = max(best[label], run())
+
+    base = best["python add_order"]
+    print(f"{N_ORDERS:,} orders, best of {REPEATS}")
+    for label, rate in best.items():
+        print(f"  {label:<26}{rate:>14,.0f} orders/s  {rate / base:>6.1f}x")
@@ -0,0 +1,98 @@
+"""
+bench_snapshots.py — Writer throughput with concurrent readers:
+copy-on-write snapshots vs. a global lock
+
+The writer thread submits the bench_batch order stream with add_order
+while 0, 1, 4 or 16 reader threads read the top 10 levels:
+
+  lock   readers and writer share one threading.Lock; a reader holds it
+         for book.depth_snapshot(10), the writer for each add_order
+  cow    the writer publishes a BookSnapshot after each order
+         (book.publish_snapshots); readers read publisher.latest with no
+         lock. Also reported: how many mutations behind the snapshot a
+         reader saw (staleness).
+  cow1   as cow with min_interval=1 ms: at most one rebuild per ms
+
+Readers poll every READ_PERIOD seconds (a dashboard / analytics cadence).
+Spinning readers (no sleep, SPIN_READERS of them) are run too; on CPython
+that mostly measures GIL sharing.
+
+Run: python bench_snapshots.py
+"""
+
+import threading
+import time
+
+from bench_batch import make_batch
+from orderbook import LimitOrderBook, Side
+
+
+def run(cols, mode: str, n_readers: int, period: float) -> dict:
+    ob   = LimitOrderBook("W", tick_size=0.01)
+    lock = threading.Lock()
+    pub  = (ob.publish_snapshots(10, min_interval=0.001 if mode == "cow1" else 0.0)
+            if mode.startswith("cow") else None)
+    stop = threading.Event()
+    reads, lag = [0] * n_readers, [0] * n_readers
+
+    def reader(k: int):
+        while not stop.is_set():
+            if pub is not None:
+                snap = pub.latest
+                sum(q for _, q, _ in snap.bids)
+                lag[k] = max(lag[k], pub.version - snap.version)
+            else:
+                with lock:
+                    d = ob.depth_snapshot(10)
+                sum(lv["qty"] for lv in d["bids"])
+            reads[k] += 1
+            if period:
+                time.sleep(period)
+
+    threads = [threading.Thread(target=reader, args=(k,)) for k in range(n_readers)]
+    for t in threads:
+        t.start()
+
+    ids, sides, prices, qtys = (c.tolist() for c in cols)
+    codes, add = (Side.BID, Side.ASK), ob.add_order
+    t0 = time.perf_counter()
+    if mode == "lock":
+        for i in range(len(ids)):
+            with lock:
+                add(ids[i], codes[sides[i]], prices[i], qtys[i])
+    else:
+        for i in range(len(ids)):
+            add(ids[i], codes[sides[i]], prices[i], qtys[i])
+    dt = time.perf_counter() - t0
+
+    stop.set()
+    for t in threads:
+        t.join()
+    return {"rate": len(ids) / dt, "reads": sum(reads) / dt, "lag": max(lag, default=0)}
+
+
+if __name__ == "__main__":
+
+    # ── Config ────────────────────────────────────────────────────────────
+    N_ORDERS     = 50_000
+    READERS      = [1, 4, 16]
+    READ_PERIOD  = 0.001             # seconds between reads
+    SPIN_READERS = [1, 4]
+
+    cols = make_batch(N_ORDERS)
+    base = run(cols, "none", 0, 0.0)["rate"]
+    cow0 = run(cols, "cow", 0, 0.0)["rate"]
+    cow1 = run(cols, "cow1", 0, 0.0)["rate"]
+    print(f"{N_ORDERS:,} orders; no readers: plain {base:,.0f} orders/s, "
+          f"publishing {cow0:,.0f} ({cow0 / base:.2f}x), "
+          f"publishing ≤1/ms {cow1:,.0f} ({cow1 / base:.2f}x)\n")
+
+    print(f"{'period':>8}{'readers':>9}{'mode':>6}{'orders/s':>12}{'vs plain':>10}"
+          f"{'reads/s':>11}{'max lag':>9}")
+    for period, counts in ((READ_PERIOD, READERS), (0.0, SPIN_READERS)):
+        for n in counts:
+            for mode in ("lock", "cow", "cow1"):
+                r = run(cols, mode, n, period)
+                lag = f"{r['lag']:>9,}" if mode != "lock" else f"{'-':>9}"
+                print(f"{period * 1e3:>6.1f}ms{n:>9}{mode:>6}{r['rate']:>12,.0f}"
+                      f"{r['rate'] / base:>9.2f}x{r['reads']:>11,.0f}{lag}")
@@ -0,0 +1,341 @@
+"""
+bench_suite.py — Matching-engine micro-benchmarks with regression tracking
+
+Cases (each run against books of every size in --sizes resting orders):
+  passive_add         add a non-crossing order to an existing level
+  sweep_<L>           aggressive order that consumes the best L ask levels
+  cancel_head/middle/tail
+                      cancel the order at that position of the best level
+  depth_snapshot      depth_snapshot(10)
+  ofi                 order_flow_imbalance()
+  trades_df           trades_df() over the session's trade tape
+
+Each case runs `--repeats` rounds and records the median and the minimum
+ns/op over rounds. State changed by a round (added orders, swept levels,
+cancelled orders) is restored outside the timed region, so book size
+stays fixed. With --runs N the whole suite runs N times and the results
+are merged (merge_runs): the minimum of the minima, the median of the
+medians, and as each case's noise the larger of its spread within a run,
+(median - min) / min, and across runs, (max - min) / min of the minima.
+
+Results are written as JSON and compared with --baseline (by default the
+committed bench_baseline.json next to this script; --baseline "" skips
+it) on the minimum over rounds, the figure least disturbed by other
+load. A case regresses when it is slower by more than its threshold:
+--threshold if given, else NOISE_K × the larger noise of the two files,
+and at least MIN_THRESHOLD. The noise is measured because it is large:
+on a shared single-CPU machine unchanged runs of the cheap cases (ofi,
+cancels at 10k orders) differ by up to 2x, so a fixed 10% only flags
+noise. The exit status is 1 if there are regressions.
+
+The baseline is machine-specific; record it with several runs so the
+spread across runs is in it:
+
+  python bench_suite.py --runs 4 --save-baseline bench_baseline.json
+  python bench_suite.py                                  # vs. bench_baseline.json
+  python bench_suite.py --sizes 100 10000 --out results.json --baseline ""
+  python bench_suite.py --tick 0.01 --level-store ladder --baseline sorted.json
+"""
+
+from __future__ import annotations
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from orderbook import LimitOrderBook, Side
+
+MID   = 10_000              # mid price in ticks
+TICK  = 0.01
+clock = time.perf_counter_ns
+
+BASELINE      = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "bench_baseline.json")
+NOISE_K       = 3.0         # auto threshold: this many times the measured noise
+MIN_THRESHOLD = 0.25        # ... but never below this fraction
+
+
+# ── Book construction ─────────────────────────────────────────────────────────
+
+def build_book(n_resting: int, seed: int = 0, **book_kwargs) -> LimitOrderBook:
+    """
+    n_resting orders split evenly between the sides, spread over
+    n_levels = clamp(n_resting / 100, 10, 1000) levels per side, plus a
+    short trade history so trades_df/VWAP have data.
+    """
+    rng      = np.random.default_rng(seed)
+    n_levels = int(min(1000, max(10, n_resting // 100)))
+    half     = n_resting // 2
+    ob       = LimitOrderBook("BENCH", **book_kwargs)
+
+    sides  = np.repeat([0, 1], [half, n_resting - half])
+    off    = rng.integers(1, n_levels + 1, n_resting)
+    ticks  = np.where(sides == 0, MID - off, MID + off)
+    ob.add_orders(np.arange(n_resting), sides, np.round(ticks * TICK, 2),
+                  rng.integers(1, 100, n_resting))
+
+    # Trade history: cross the touch a few hundred times, then top it up
+    next_id = n_resting
+    for _ in range(min(500, n_resting)):
+        side  = Side.BID if rng.random() < 0.5 else Side.ASK
+        best  = ob.best_ask() if side == Side.BID else ob.best_bid()
+        if best is None:
+            break
+        ob.add_order(next_id, side, best, 1)
+        next_id += 1
+    ob._bench_next_id = next_id
+    return ob
+
+
+def _next_id(ob: LimitOrderBook) -> int:
+    ob._bench_next_id += 1
+    return ob._bench_next_id
+
+
+def _best_level(ob: LimitOrderBook, side: Side):
+    book = ob._asks if side == Side.ASK else ob._bids
+    return book.peekitem(0 if side == Side.ASK else -1)[1]
+
+
+def _api_price(ob: LimitOrderBook, key) -> float:
+    return ob._to_price(key)
+
+
+# ── Cases ─────────────────────────────────────────────────────────────────────
+# Each case takes (book, ops) and returns elapsed ns for `ops` operations.
+
+def case_passive_add(ob: LimitOrderBook, ops: int) -> int:
+    ids    = [_next_id(ob) for _ in range(ops)]
+    prices = [round((MID - 5 - i % 5) * TICK, 2) for i in range(ops)]
+    t = clock()
+    for oid, px in zip(ids, prices):
+        ob.add_order(oid, Side.BID, px, 10)
+    dt = clock() - t
+    for oid in ids:
+        ob.cancel_order(oid)
+    return dt
+
+
+def make_sweep(n_levels: int):
+    def case_sweep(ob: LimitOrderBook, ops: int) -> int:
+        total = 0
+        for _ in range(ops):
+            depth = ob.depth_snapshot(n_levels)["asks"]
+            qty   = sum(lvl["qty"] for lvl in depth)
+            limit = depth[-1]["price"]
+            oid   = _next_id(ob)
+            t = clock()
+            trades = ob.add_order(oid, Side.BID, limit, qty)
+            total += clock() - t
+            for tr in trades:                   # restore the swept levels
+                ob.add_order(tr.resting_id, Side.ASK, tr.price, tr.quantity)
+        return total
+    case_sweep.__name__ = f"case_sweep_{n_levels}"
+    return case_sweep
+
+
+def make_cancel(position: str):
+    def case_cancel(ob: LimitOrderBook, ops: int) -> int:
+        total = 0
+        for _ in range(ops):
+            level = _best_level(ob, Side.BID)
+            if position == "head":
+                order = level.head
+            elif position == "tail":
+                order = level.tail
+            else:
+                order = level.head
+                for _ in range(len(level) // 2):
+                    order = order.next
+            oid, key, qty = order.order_id, order.price, order.quantity
+            t = clock()
+            ob.cancel_order(oid)
+            total += clock() - t
+            ob.add_order(oid, Side.BID, _api_price(ob, key), qty)
+        return total
+    case_cancel.__name__ = f"case_cancel_{position}"
+    return case_cancel
+
+
+def case_depth_snapshot(ob: LimitOrderBook, ops: int) -> int:
+    t = clock()
+    for _ in range(ops):
+        ob.depth_snapshot(10)
+    return clock() - t
+
+
+def case_ofi(ob: LimitOrderBook, ops: int) -> int:
+    t = clock()
+    for _ in range(ops):
+        ob.order_flow_imbalance()
+    return clock() - t
+
+
+def case_trades_df(ob: LimitOrderBook, ops: int) -> int:
+    t = clock()
+    for _ in range(ops):
+        ob.trades_df()
+    return clock() - t
+
+
+CASES = {
+    "passive_add":    (case_passive_add,    1_000),
+    "sweep_1":        (make_sweep(1),         200),
+    "sweep_10":       (make_sweep(10),        100),
+    "sweep_100":      (make_sweep(100),        10),
+    "cancel_head":    (make_cancel("head"),   500),
+    "cancel_middle":  (make_cancel("middle"), 500),
+    "cancel_tail":    (make_cancel("tail"),   500),
+    "depth_snapshot": (case_depth_snapshot, 1_000),
+    "ofi":            (case_ofi,           10_000),
+    "trades_df":      (case_trades_df,        200),
+}
+
+
+# ── Runner ────────────────────────────────────────────────────────────────────
+
+def run_suite(sizes: list[int], cases: list[str], repeats: int = 5,
+              book_kwargs: dict | None = None, verbose: bool = True) -> dict:
+    results = {}
+    for n in sizes:
+        t0 = time.perf_counter()
+        ob = build_book(n, **(book_kwargs or {}))
+        if verbose:
+            print(f"[size {n:,}] book built in {time.perf_counter() - t0:.1f}s",
+                  file=sys.stderr)
+        for name in cases:
+            fn, ops = CASES[name]
+            if name.startswith("sweep_") and int(name[6:]) > len(ob._asks):
+                continue
+            gc.collect()
+            fn(ob, max(1, ops // 10))                        # warm-up
+            rounds = [fn(ob, ops) / ops for _ in range(repeats)]
+            key    = f"{name}@{n}"
+            med, best = statistics.median(rounds), min(rounds)
+            results[key] = {
+                "ns_per_op": round(med, 1),
+                "min_ns":    round(best, 1),
+                "noise":     round((med - best) / best, 3) if best else 0.0,
+                "ops":       ops,
+                "rounds":    repeats,
+            }
+            if verbose:
+                print(f"  {key:<28}{results[key]['ns_per_op']:>14,.1f} ns/op",
+                      file=sys.stderr)
+    return {
+        "meta": {
+            "python":    platform.python_version(),
+            "platform":  platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "book":      {k: str(v) for k, v in (book_kwargs or {}).items()},
+        },
+        "results": results,
+    }
+
+
+def merge_runs(runs: list[dict]) -> dict:
+    """Merge run_suite() outputs of the same cases (see module docstring)."""
+    merged = {}
+    for key in runs[0]["results"]:
+        rs     = [run["results"][key] for run in runs if key in run["results"]]
+        mins   = [r["min_ns"] for r in rs]
+        best   = min(mins)
+        across = (max(mins) - best) / best if best else 0.0
+        merged[key] = {
+            "ns_per_op": round(statistics.median(r["ns_per_op"] for r in rs), 1),
+            "min_ns":    best,
+            "noise":     round(max(across, *(r["noise"] for r in rs)), 3),
+            "ops":       rs[0]["ops"],
+            "rounds":    sum(r["rounds"] for r in rs),
+        }
+    return {"meta": {**runs[0]["meta"], "runs": len(runs)}, "results": merged}
+
+
+def compare(current: dict, baseline: dict, threshold: float | None = None,
+            metric: str = "min_ns") -> list[dict]:
+    """
+    Cases whose `metric` (min_ns or ns_per_op) grew by more than their
+    threshold vs. baseline: `threshold` (fraction) if given, else
+    max(MIN_THRESHOLD, NOISE_K × the larger noise of the two runs).
+    """
+    regressions = []
+    for key, cur in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None or metric not in base:
+            continue
+        ratio   = cur[metric] / base[metric] if base[metric] else 1.0
+        allowed = threshold
+        if allowed is None:
+            noise   = max(cur.get("noise", 0.0), base.get("noise", 0.0))
+            allowed = max(MIN_THRESHOLD, NOISE_K * noise)
+        if ratio > 1.0 + allowed:
+            regressions.append({"case": key, "baseline_ns": base[metric],
+                                "current_ns": cur[metric],
+                                "change": round(ratio - 1.0, 3),
+                                "allowed": round(allowed, 3)})
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="LimitOrderBook micro-benchmarks")
+    ap.add_argument("--sizes", type=int, nargs="+",
+                    default=[100, 1_000, 10_000, 100_000, 1_000_000])
+    ap.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    ap.add_argument("--repeats", type=int, default=7)
+    ap.add_argument("--runs", type=int, default=1,
+                    help="run the suite this many times and merge the results")
+    ap.add_argument("--tick", type=float, default=None,
+                    help="run the book in integer tick mode")
+    ap.add_argument("--level-store", choices=["sorted", "ladder"], default="sorted",
+                    help="price-level backend (ladder needs --tick)")
+    ap.add_argument("--out", default="bench_results.json")
+    ap.add_argument("--baseline", default=BASELINE,
+                    help="baseline JSON to compare with (\"\" to skip)")
+    ap.add_argument("--threshold", type=float, default=None,
+                    help="allowed slowdown as a fraction (0.25 = 25%%); "
+                         "default: from each case's measured noise")
+    ap.add_argument("--metric", choices=["min_ns", "ns_per_op"], default="min_ns",
+                    help="figure compared: minimum or median over rounds")
+    ap.add_argument("--save-baseline", default=None,
+                    help="also write the results to this baseline path")
+    args = ap.parse_args()
+
+    book_kwargs = {"tick_size": args.tick} if args.tick else {}
+    if args.level_store != "sorted":
+        if not args.tick:
+            ap.error("--level-store ladder needs --tick")
+        book_kwargs["level_store"] = args.level_store
+    current = merge_runs([run_suite(args.sizes, args.cases, args.repeats, book_kwargs)
+                          for _ in range(args.runs)])
+    with open(args.out, "w") as f:
+        json.dump(current, f, indent=2)
+    print(f"Results → {args.out}")
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"Baseline → {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold, args.metric)
+        limit = (f"{args.threshold:.0%}" if args.threshold is not None
+                 else "the noise threshold")
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {limit} ({args.metric}):")
+            for r in regressions:
+                print(f"  {r['case']:<28}{r['baseline_ns']:>12,.1f} → "
+                      f"{r['current_ns']:>12,.1f} ns/op  (+{r['change']:.0%}, "
+                      f"allowed {r['allowed']:.0%})")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {limit} vs. {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+bench_sweep.py — Cost of aggressive orders that sweep the book
+
+A book with LEVELS ask levels of ORDERS_PER_LEVEL orders each is swept by
+buy orders sized to consume exactly `depth` levels, for each order type:
+
+  limit@max   the old workaround for a market order: a limit buy at a far
+              price (it only stays non-resting because the size fits)
+  market      OrderType.MARKET
+  ioc         OrderType.IOC at the depth-th level's price
+  fok         OrderType.FOK at the same price (pre-check passes, then fills)
+  fok kill    FOK for one more unit than rests up to the limit: killed by
+              the O(levels) pre-check without touching a queue
+  ioc partial the same order as IOC: fills all it can, drops the rest
+
+After every sweep the consumed levels are put back (untimed), so each
+sweep sees the same book. Times are per order, best of REPEATS.
+
+Run: python bench_sweep.py
+"""
+
+import time
+
+from orderbook import LimitOrderBook, OrderType, Side
+
+TICK = 0.01
+
+
+def make_book(levels: int, per_level: int, qty: int) -> LimitOrderBook:
+    ob = LimitOrderBook("S", tick_size=TICK)
+    oid = 1
+    for lv in range(levels):
+        for _ in range(per_level):
+            ob.add_order(oid, Side.ASK, round(100 + lv * TICK, 2), qty)
+            oid += 1
+        ob.add_order(oid, Side.BID, round(99.99 - lv * TICK, 2), qty)
+        oid += 1
+    return ob
+
+
+def sweep_ns(ob, kind: str, depth: int, per_level: int, qty: int, n: int) -> float:
+    limit  = round(100 + (depth - 1) * TICK, 2)
+    size   = depth * per_level * qty
+    killed = kind in ("fok kill", "ioc partial")
+    if killed:
+        size += 1
+    order_type, price = {
+        "limit@max":   (OrderType.LIMIT,  1e6),
+        "market":      (OrderType.MARKET, None),
+        "ioc":         (OrderType.IOC,    limit),
+        "fok":         (OrderType.FOK,    limit),
+        "fok kill":    (OrderType.FOK,    limit),
+        "ioc partial": (OrderType.IOC,    limit),
+    }[kind]
+    add, clock = ob.add_order, time.perf_counter_ns
+    oid, total = 10_000_000, 0
+    for _ in range(n):
+        t0 = clock()
+        trades = add(oid, Side.BID, price, size, order_type)
+        total += clock() - t0
+        oid += 1
+        if trades:                                   # put the levels back
+            cols = ([], [], [], [])
+            for lv in range(depth):
+                for _ in range(per_level):
+                    cols[0].append(oid)
+                    cols[1].append(1)
+                    cols[2].append(round(100 + lv * TICK, 2))
+                    cols[3].append(qty)
+                    oid += 1
+            ob.add_orders(*cols)
+    return total / n
+
+
+if __name__ == "__main__":
+
+    # ── Config ────────────────────────────────────────────────────────────
+    LEVELS           = 200
+    ORDERS_PER_LEVEL = 5
+    QTY              = 10
+    DEPTHS           = [1, 5, 20, 100]
+    SWEEPS           = 300
+    REPEATS          = 3
+    KINDS            = ["limit@max", "market", "ioc", "fok", "fok kill", "ioc partial"]
+
+    print(f"{LEVELS} ask levels × {ORDERS_PER_LEVEL} orders; µs per sweep, best of {REPEATS}\n")
+    print(f"{'depth':>6}" + "".join(f"{k:>13}" for k in KINDS))
+    for depth in DEPTHS:
+        best = {k: float("inf") for k in KINDS}
+        for _ in range(REPEATS):                     # interleaved, best of
+            for kind in KINDS:
+                ob = make_book(LEVELS, ORDERS_PER_LEVEL, QTY)
+                best[kind] = min(best[kind], sweep_ns(ob, kind, depth,
+                                                      ORDERS_PER_LEVEL, QTY, SWEEPS))
+        print(f"{depth:>6}" + "".join(f"{best[k] / 1e3:>13.1f}" for k in KINDS))
@@ -0,0 +1,87 @@
+"""
+bench_tape.py — Trade storage: list[Trade] vs. columnar TradeTape
+
+Measures, for N_TRADES fills:
+  - memory held by the trade history (tracemalloc, bytes per trade)
+  - trades_df() latency: DataFrame built from a list of Trade objects
+    (the old path) vs. zero-copy views of the tape columns
+  - memory of a bounded tape (ring capacity) that keeps only recent fills
+
+Run: python bench_tape.py
+"""
+
+import gc
+import time
+import tracemalloc
+
+import pandas as pd
+
+from orderbook import Trade
+from tape import TradeTape
+
+
+def measure(build):
+    """Return (object, bytes allocated while building it)."""
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size
+
+
+def build_list(n: int) -> list[Trade]:
+    ts = time.time()
+    return [Trade(i, i + 1, 100.0 + (i % 50) * 0.01, 1 + i % 20, ts)
+            for i in range(n)]
+
+
+def build_tape(n: int, capacity: int | None = None) -> TradeTape:
+    ts   = time.time()
+    tape = TradeTape(capacity)
+    for i in range(n):
+        tape.record(i, i + 1, 100.0 + (i % 50) * 0.01, 1 + i % 20, ts)
+    return tape
+
+
+def list_df(trades: list[Trade]) -> pd.DataFrame:
+    return pd.DataFrame([{
+        "aggressor_id": t.aggressor_id,
+        "resting_id":   t.resting_id,
+        "price":        t.price,
+        "quantity":     t.quantity,
+    } for t in trades])
+
+
+def best_of(fn, repeats: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+if __name__ == "__main__":
+
+    # ── Config ────────────────────────────────────────────────────────────
+    N_TRADES = 1_000_000
+    RING     = 100_000
+
+    trades, list_bytes = measure(lambda: build_list(N_TRADES))
+    tape,   tape_bytes = measure(lambda: build_tape(N_TRADES))
+    ring,   ring_bytes = measure(lambda: build_tape(N_TRADES, RING))
+
+    print(f"Memory for {N_TRADES:,} trades")
+    print(f"  list[Trade]            {list_bytes / 2**20:8.1f} MiB  "
+          f"({list_bytes / N_TRADES:6.1f} B/trade)")
+    print(f"  TradeTape (unbounded)  {tape_bytes / 2**20:8.1f} MiB  "
+          f"({tape_bytes / N_TRADES:6.1f} B/trade)")
+    print(f"  TradeTape (ring {RING:,}) {ring_bytes / 2**20:6.1f} MiB  "
+          f"(holds last {len(ring):,})")
+
+    t_list = best_of(lambda: list_df(trades))
+    t_tape = best_of(tape.to_df)
+    print(f"\ntrades_df() latency")
+    print(f"  from list[Trade]       {t_list * 1e3:10.2f} ms")
+    print(f"  from TradeTape views   {t_tape * 1e3:10.3f} ms")
@@ -0,0 +1,101 @@
+"""
+bench_ticks.py — Float-price vs. integer-tick LimitOrderBook throughput
+
+Runs the same order stream through a float-keyed book and a tick-keyed
+book (tick_size=TICK) in three phases:
+  1. add     — passive orders on both sides, none crossing
+  2. cancel  — cancel a random half of the resting orders
+  3. match   — aggressive orders that sweep the touch
+
+Also reports how many distinct levels each mode creates when the same
+prices are computed by different arithmetic, which is where float keys
+split one economic price level into several.
+
+Run: python bench_ticks.py
+"""
+
+import random
+import time
+
+from orderbook import LimitOrderBook, Side
+
+
+def make_stream(n_passive: int, n_aggr: int, tick: float, seed: int = 0):
+    rng = random.Random(seed)
+    mid_ticks = round(100.0 / tick)
+
+    passive = []
+    for oid in range(n_passive):
+        side = Side.BID if rng.random() < 0.5 else Side.ASK
+        off  = rng.randint(1, 200)
+        k    = mid_ticks - off if side == Side.BID else mid_ticks + off
+        passive.append((oid, side, round(k * tick, 10), rng.randint(1, 50)))
+
+    cancels = rng.sample(range(n_passive), n_passive // 2)
+
+    aggressive = []
+    for j in range(n_aggr):
+        side = Side.BID if rng.random() < 0.5 else Side.ASK
+        k    = mid_ticks + 20 if side == Side.BID else mid_ticks - 20
+        aggressive.append((n_passive + j, side, round(k * tick, 10),
+                           rng.randint(1, 100)))
+    return passive, cancels, aggressive
+
+
+def run(ob: LimitOrderBook, passive, cancels, aggressive) -> dict:
+    t0 = time.perf_counter()
+    for oid, side, price, qty in passive:
+        ob.add_order(oid, side, price, qty)
+    t1 = time.perf_counter()
+    for oid in cancels:
+        ob.cancel_order(oid)
+    t2 = time.perf_counter()
+    for oid, side, price, qty in aggressive:
+        ob.add_order(oid, side, price, qty)
+    t3 = time.perf_counter()
+    return {
+        "add/s":    len(passive)    / (t1 - t0),
+        "cancel/s": len(cancels)    / (t2 - t1),
+        "match/s":  len(aggressive) / (t3 - t2),
+        "trades":   ob.trade_summary()["n_trades"],
+    }
+
+
+def distinct_levels(tick_size: float | None, tick: float, n: int = 2_000) -> int:
+    """
+    Levels created by 20 economic prices 100 + k*tick, each computed by one
+    of three equivalent formulas (as different order sources would).
+    """
+    ob  = LimitOrderBook("LEVELS", tick_size=tick_size)
+    rng = random.Random(1)
+    formulas = [
+        lambda k: 100 + k * tick,
+        lambda k: (round(100 / tick) + k) * tick,
+        lambda k: sum([tick] * k, 100.0),
+    ]
+    for oid in range(n):
+        k = rng.randint(1, 20)
+        ob.add_order(oid, Side.ASK, rng.choice(formulas)(k), 1)
+    return len(ob._asks)
+
+
+if __name__ == "__main__":
+
+    # ── Config ────────────────────────────────────────────────────────────
+    TICK      = 0.01
+    N_PASSIVE = 200_000
+    N_AGGR    = 50_000
+    REPEATS   = 3               # best-of, to damp scheduler noise
+
+    passive, cancels, aggressive = make_stream(N_PASSIVE, N_AGGR, TICK)
+
+    print(f"{'mode':<8} {'add/s':>12} {'cancel/s':>12} {'match/s':>12} {'trades':>9}")
+    for label, ts in [("float", None), ("tick", TICK)]:
+        runs = [run(LimitOrderBook(label, tick_size=ts), passive, cancels, aggressive)
+                for _ in range(REPEATS)]
+        r = {k: max(x[k] for x in runs) for k in runs[0]}
+        print(f"{label:<8} {r['add/s']:>12,.0f} {r['cancel/s']:>12,.0f} "
+              f"{r['match/s']:>12,.0f} {r['trades']:>9,}")
+
+    print(f"\nDistinct levels for 20 economic prices: "
+          f"float={distinct_levels(None, TICK)}  tick={distinct_levels(TICK, TICK)}")
@@ -0,0 +1,100 @@
+"""
+bench_tombstone.py — Eager vs lazy (tombstone) cancellation under cancel storms
+
+A book with LEVELS levels per side of ORDERS_PER_LEVEL orders each is hit
+by a burst of cancels, in two shapes:
+
+  scatter   CANCEL_FRACTION of all orders, in random order — then a market
+            order sweeps every ask level, so the lazy books also pay for
+            the tombstones still linked
+  pull      every order, one level at a time (random order within the
+            level) — a market maker pulling its quotes; no sweep
+
+  eager      cancel_mode="eager": unlink on every cancel
+  lazy m     cancel_mode="lazy", compact_min=m
+  lazy m rR  ... and lazy_cancel_ratio=R
+
+Columns: ns per cancel, µs for the sweep, ms for cancels + sweep, and
+compactions run. Best of REPEATS, modes interleaved.
+
+Run: python bench_tombstone.py
+"""
+
+import random
+import time
+
+from orderbook import LimitOrderBook, OrderType, Side
+
+TICK = 0.01
+
+
+def make_book(levels: int, per_level: int, **kwargs) -> LimitOrderBook:
+    ob = LimitOrderBook("S", tick_size=TICK, **kwargs)
+    oid = 1
+    for lv in range(levels):
+        for _ in range(per_level):
+            ob.add_order(oid, Side.ASK, round(100 + lv * TICK, 2), 10)
+            ob.add_order(oid + 1, Side.BID, round(99.99 - lv * TICK, 2), 10)
+            oid += 2
+    return ob
+
+
+def storm(kwargs: dict, levels: int, per_level: int, ids: list, sweep: bool) -> tuple:
+    ob     = make_book(levels, per_level, **kwargs)
+    cancel = ob.cancel_order
+    clock  = time.perf_counter_ns
+    t0 = clock()
+    for oid in ids:
+        cancel(oid)
+    t_cancel = (clock() - t0) / len(ids)
+    t_sweep  = 0
+    if sweep:
+        t0 = clock()
+        ob.add_order(0, Side.BID, None, ob.total_ask_qty(), OrderType.MARKET)
+        t_sweep = clock() - t0
+    return t_cancel, t_sweep, ob.compactions
+
+
+if __name__ == "__main__":
+
+    # ── Config ────────────────────────────────────────────────────────────
+    LEVELS           = 50
+    ORDERS_PER_LEVEL = 400
+    CANCEL_FRACTION  = 0.9
+    REPEATS          = 15
+    SEED             = 7
+    MODES = {
+        "eager":     {"cancel_mode": "eager"},
+        "lazy 16":   {"cancel_mode": "lazy", "compact_min": 16},
+        "lazy 64":   {"cancel_mode": "lazy", "compact_min": 64},
+        "lazy 1024": {"cancel_mode": "lazy"},              # default compact_min
+        "lazy 64 r4": {"cancel_mode": "lazy", "compact_min": 64,
+                       "lazy_cancel_ratio": 4.0},
+    }
+
+    rng      = random.Random(SEED)
+    n_orders = 2 * LEVELS * ORDERS_PER_LEVEL
+    scatter  = rng.sample(range(1, n_orders + 1), int(n_orders * CANCEL_FRACTION))
+    pull     = []
+    for lv in rng.sample(range(2 * LEVELS), 2 * LEVELS):   # (level, side) pairs
+        level_ids = [1 + lv % 2 + 2 * (lv // 2 * ORDERS_PER_LEVEL + k)
+                     for k in range(ORDERS_PER_LEVEL)]
+        rng.shuffle(level_ids)
+        pull.extend(level_ids)
+
+    print(f"{LEVELS} levels × {ORDERS_PER_LEVEL} orders per side ({n_orders:,} orders); "
+          f"best of {REPEATS}\n")
+    print(f"{'mode':<12}{'scatter ns':>12}{'sweep µs':>10}{'total ms':>10}{'compact':>9}"
+          f"{'pull ns':>10}{'compact':>9}")
+    best = {m: [float("inf"), float("inf"), 0, float("inf"), 0] for m in MODES}
+    for _ in range(REPEATS):                         # interleaved, best of
+        for mode, kwargs in MODES.items():
+            b = best[mode]
+            t_cancel, t_sweep, c = storm(kwargs, LEVELS, ORDERS_PER_LEVEL, scatter, True)
+            b[0], b[1], b[2] = min(b[0], t_cancel), min(b[1], t_sweep), c
+            t_cancel, _, c = storm(kwargs, LEVELS, ORDERS_PER_LEVEL, pull, False)
+            b[3], b[4] = min(b[3], t_cancel), c
+    for mode, (ts, tw, cs, tp, cp) in best.items():
+        total = (ts * len(scatter) + tw) / 1e6
+        print(f"{mode:<12}{ts:>12,.0f}{tw / 1e3:>10,.0f}{total:>10,.1f}{cs:>9,}"
+              f"{tp:>10,.0f}{cp:>9,}")
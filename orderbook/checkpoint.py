@@ -0,0 +1,177 @@
+"""
+checkpoint.py — Point-in-time book reconstruction from a checkpoint index
+
+build_index() replays a binary event file (replay.py EVENT_DTYPE) once and,
+every `interval` seconds of event time, writes a book snapshot
+(journal.write_snapshot) tagged with the event offset it covers. The
+index directory holds
+  index.json        event file, book settings, [(ts, offset, file), ...]
+  ckpt_NNNNN.snap   one snapshot per checkpoint
+
+CheckpointIndex.book_at(ts) then
+  1. finds the last checkpoint taken at or before ts (binary search)
+  2. maps its snapshot and restores it into a fresh book
+  3. replays events [checkpoint offset, first event after ts) from the
+     memory-mapped event file
+so a query costs one snapshot load plus at most `interval` seconds of
+events, instead of a replay from the open.
+
+The result includes every event with timestamp ≤ ts. Snapshots keep the
+last `trade_capacity` trades (default 10,000) so they stay small; session
+trade stats are exact.
+
+  python checkpoint.py build events.bin idx/ --interval 60
+  python checkpoint.py query idx/ 12345.6 --levels 5
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from journal import load_snapshot, write_snapshot
+from orderbook import LimitOrderBook, Side
+from replay import EVENT_DTYPE, apply_event, iter_events
+
+_SIDES = (Side.BID, Side.ASK)
+
+
+def apply_events(book: LimitOrderBook, events: np.ndarray) -> int:
+    """Apply event records in order, skipping invalid ones; returns rejects."""
+    rejected = 0
+    for kind, oid, side, price, qty in zip(events["kind"].tolist(),
+                                           events["order_id"].tolist(),
+                                           events["side"].tolist(),
+                                           events["price"].tolist(),
+                                           events["qty"].tolist()):
+        try:
+            apply_event(book, kind, oid, _SIDES[side], price, qty)
+        except ValueError:
+            rejected += 1
+    return rejected
+
+
+def build_index(events_path: str, index_dir: str, interval: float = 60.0,
+                tick_size: float | None = None, trade_capacity: int = 10_000,
+                chunk_rows: int = 65_536) -> CheckpointIndex:
+    """Replay events_path once, checkpointing every `interval` event-seconds."""
+    if events_path.lower().endswith(".csv"):
+        raise ValueError("book_at needs random access: use a binary event file")
+    if interval <= 0:
+        raise ValueError("interval must be positive")
+    os.makedirs(index_dir, exist_ok=True)
+    book_kwargs = {"tick_size": tick_size, "trade_capacity": trade_capacity}
+    book = LimitOrderBook("CKPT", **book_kwargs)
+
+    # A checkpoint at boundary C holds every event with ts < C and is keyed
+    # by the last such event's ts, so it is valid for any query ts ≥ key.
+    checkpoints = []
+    offset, next_ck, last_ts = 0, None, None
+    for chunk in iter_events(events_path, chunk_rows):
+        ts = chunk["ts"]
+        if not len(ts):
+            continue
+        if next_ck is None:
+            next_ck = float(ts[0]) + interval
+        lo = 0
+        while next_ck <= ts[-1]:
+            hi = int(np.searchsorted(ts, next_ck, side="left"))
+            apply_events(book, chunk[lo:hi])
+            if hi:
+                last_ts = float(ts[hi - 1])
+            done = offset + hi
+            if done and (not checkpoints or checkpoints[-1]["offset"] < done):
+                name = f"ckpt_{len(checkpoints):05d}.snap"
+                write_snapshot(book, os.path.join(index_dir, name), done)
+                checkpoints.append({"ts": last_ts, "offset": done, "file": name})
+            lo = hi
+            next_ck += interval
+        apply_events(book, chunk[lo:])
+        last_ts = float(ts[-1])
+        offset += len(chunk)
+
+    with open(os.path.join(index_dir, "index.json"), "w") as f:
+        json.dump({"events": os.path.abspath(events_path), "interval": interval,
+                   "n_events": offset, "book": book_kwargs,
+                   "checkpoints": checkpoints}, f, indent=1)
+    return CheckpointIndex(index_dir)
+
+
+class CheckpointIndex:
+    """A built checkpoint directory; answers book_at(ts) queries."""
+
+    def __init__(self, index_dir: str):
+        with open(os.path.join(index_dir, "index.json")) as f:
+            meta = json.load(f)
+        self.dir         = index_dir
+        self.book_kwargs = meta["book"]
+        self.interval    = meta["interval"]
+        self.checkpoints = meta["checkpoints"]
+        self._ck_ts      = np.array([c["ts"] for c in self.checkpoints], dtype=np.float64)
+        self._events     = np.memmap(meta["events"], dtype=EVENT_DTYPE, mode="r",
+                                     shape=(meta["n_events"],))
+        self._ts         = self._events["ts"]
+
+    def book_at(self, ts: float) -> LimitOrderBook:
+        """The book after every event with timestamp ≤ ts."""
+        book = LimitOrderBook("ASOF", **self.book_kwargs)
+        k = int(np.searchsorted(self._ck_ts, ts, side="right")) - 1
+        start = 0
+        if k >= 0:
+            ck = self.checkpoints[k]
+            header, arrays = load_snapshot(os.path.join(self.dir, ck["file"]))
+            trades = {n[len("trade_"):]: a for n, a in arrays.items()
+                      if n.startswith("trade_")}
+            book.restore_state(arrays["orders"], trades, header["stats"])
+            start = ck["offset"]
+        end = int(np.searchsorted(self._ts, ts, side="right"))
+        if end > start:
+            apply_events(book, np.asarray(self._events[start:end]))
+        return book
+
+    def gap_events(self, ts: float) -> int:
+        """Events book_at(ts) has to replay after its checkpoint."""
+        k = int(np.searchsorted(self._ck_ts, ts, side="right")) - 1
+        start = self.checkpoints[k]["offset"] if k >= 0 else 0
+        return max(0, int(np.searchsorted(self._ts, ts, side="right")) - start)
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def main():
+    ap  = argparse.ArgumentParser(description="Point-in-time book reconstruction")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    b = sub.add_parser("build", help="replay an event file and write checkpoints")
+    b.add_argument("events")
+    b.add_argument("index_dir")
+    b.add_argument("--interval", type=float, default=60.0,
+                   help="seconds of event time between checkpoints")
+    b.add_argument("--tick", type=float, default=None)
+
+    q = sub.add_parser("query", help="print the book as of a timestamp")
+    q.add_argument("index_dir")
+    q.add_argument("ts", type=float)
+    q.add_argument("--levels", type=int, default=5)
+    args = ap.parse_args()
+
+    if args.cmd == "build":
+        t0  = time.perf_counter()
+        idx = build_index(args.events, args.index_dir, args.interval, args.tick)
+        print(f"{len(idx.checkpoints)} checkpoints → {args.index_dir} "
+              f"in {time.perf_counter() - t0:.1f}s")
+        return
+
+    idx = CheckpointIndex(args.index_dir)
+    t0  = time.perf_counter()
+    book = idx.book_at(args.ts)
+    dt   = time.perf_counter() - t0
+    print(json.dumps(book.depth_snapshot(args.levels), indent=1))
+    print(f"reconstructed in {dt * 1e3:.1f} ms ({idx.gap_events(args.ts):,} events replayed)")
+
+
+if __name__ == "__main__":
+    main()
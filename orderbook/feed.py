@@ -0,0 +1,103 @@
+"""
+feed.py — Incremental L2/L3 market-data feed
+
+LimitOrderBook.subscribe(fn) calls fn(event) synchronously for every
+change, in the order the book makes it. Events are plain tuples whose
+first element is the kind; prices are API prices (not tick keys):
+
+  L3 (per order)
+    (ORDER_ADD,    order_id, side, price, qty)    order rests
+    (ORDER_UPDATE, order_id, side, price, qty)    remaining qty after a
+                                                  partial fill or amend
+    (ORDER_REMOVE, order_id, side, price)         filled or cancelled
+  L2 (per level)
+    (LEVEL_ADD,    side, price, qty, orders)      new price level
+    (LEVEL_UPDATE, side, price, qty, orders)      level total changed
+    (LEVEL_REMOVE, side, price)                   level emptied
+  Other
+    (TRADE, aggressor_id, resting_id, price, qty, timestamp)
+    (BBO,   best_bid, best_ask, spread, mid)      touch moved (None = empty side)
+    (RESET,)                                      book was cleared
+
+A fill emits TRADE, then the resting order's ORDER_UPDATE/REMOVE, then
+its level's LEVEL_UPDATE/REMOVE; BBO follows once the whole order has
+been processed. side is the orderbook.Side member.
+
+L2BookBuilder is a subscriber that keeps an aggregated L2 view from the
+L2/BBO/RESET events, so readers never have to poll depth_snapshot():
+
+  view = L2BookBuilder()
+  book.subscribe(view)
+  ...
+  view.depth(5)          # same layout as book.depth_snapshot(5)
+"""
+
+from __future__ import annotations
+from itertools import islice
+
+from sortedcontainers import SortedDict
+
+ORDER_ADD    = "order_add"
+ORDER_UPDATE = "order_update"
+ORDER_REMOVE = "order_remove"
+LEVEL_ADD    = "level_add"
+LEVEL_UPDATE = "level_update"
+LEVEL_REMOVE = "level_remove"
+TRADE        = "trade"
+BBO          = "bbo"
+RESET        = "reset"
+
+
+class L2BookBuilder:
+    """
+    Aggregated price → (qty, orders) ladders rebuilt from deltas. Call the
+    builder with each event (or pass it to subscribe directly). Reads are
+    O(levels) and never touch the source book.
+    """
+
+    def __init__(self):
+        self.bids: SortedDict = SortedDict()      # price → (qty, orders)
+        self.asks: SortedDict = SortedDict()
+        self.bbo: tuple = (None, None, None, None)  # bid, ask, spread, mid
+        self.last_trade: tuple | None = None        # (price, qty, timestamp)
+        self.events = 0
+        from orderbook import Side      # deferred: orderbook imports this module
+        self._bid = Side.BID
+
+    def __call__(self, event: tuple):
+        self.events += 1
+        kind = event[0]
+        if kind == LEVEL_UPDATE or kind == LEVEL_ADD:
+            _, side, price, qty, orders = event
+            book = self.bids if side is self._bid else self.asks
+            book[price] = (qty, orders)
+        elif kind == LEVEL_REMOVE:
+            _, side, price = event
+            book = self.bids if side is self._bid else self.asks
+            del book[price]
+        elif kind == BBO:
+            self.bbo = event[1:]
+        elif kind == TRADE:
+            self.last_trade = event[3:]
+        elif kind == RESET:
+            self.bids.clear()
+            self.asks.clear()
+            self.bbo = (None, None, None, None)
+            self.last_trade = None
+
+    def best_bid(self) -> float | None:
+        return self.bbo[0]
+
+    def best_ask(self) -> float | None:
+        return self.bbo[1]
+
+    def depth(self, levels: int = 5) -> dict:
+        """Top N levels per side, in the layout of depth_snapshot()."""
+        bids = [{"price": p, "qty": q, "orders": n}
+                for p, (q, n) in islice(reversed(self.bids.items()), levels)]
+        asks = [{"price": p, "qty": q, "orders": n}
+                for p, (q, n) in islice(self.asks.items(), levels)]
+        best_bid, best_ask, spread, mid = self.bbo
+        return {"bids": bids, "asks": asks,
+                "best_bid": best_bid, "best_ask": best_ask,
+                "spread": spread, "mid": mid}
@@ -0,0 +1,459 @@
+"""
+gateway.py — Asyncio order-entry gateway with micro-batched matching
+
+A TCP (or Unix-socket) server in front of one LimitOrderBook. Any number
+of clients send newline-terminated requests; every connection's reader
+puts parsed requests on one queue, and a single matcher task drains it
+in micro-batches: everything queued when it wakes, up to --max-batch
+requests, optionally lingering --max-delay-us for more (default 0: no
+added latency — batches form naturally under load). Runs of adds in a
+batch go to the book through add_orders. Replies are buffered per
+connection and written once per batch.
+
+Protocol (ASCII, space separated, one message per line)
+  client → gateway
+    A <ref> <B|S> <price> <qty>      new limit order; ref is the client's tag
+    X <order_id>                     cancel
+    M <order_id> <price|-> <qty|->   modify (- keeps the current value)
+    S                                subscribe to market data
+  gateway → client
+    ACK <ref> <order_id>             order accepted (fills, if any, follow)
+    REJ <ref|order_id> <reason>      request refused
+    FILL <order_id> <price> <qty>    one of your orders traded
+    CXL <order_id>                   cancel done
+    MOD <order_id>                   modify done
+    BBO <bid|-> <ask|->              touch after a batch that moved it (S only)
+    TRD <price> <qty>                public trade (S only)
+
+Prices must be finite. A batch that fails unexpectedly answers each of
+its requests that had no reply yet with "REJ <ref> internal error"
+(requests already ACKed, filled or cancelled keep their replies); the
+matcher keeps running, and the error is counted in stats() and kept in
+Gateway.error.
+
+A load generator is bundled:
+  python gateway.py serve --port 7001
+  python gateway.py load --port 7001 --clients 16 --orders 20000
+  python gateway.py load --serve ...   # start an in-process gateway first
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import math
+import random
+import time
+
+from feed import BBO, TRADE
+from latency import LatencyHistogram
+from orderbook import LimitOrderBook
+
+_SIDE_CODES = {"B": 0, "S": 1}
+
+
+def _fmt(price) -> str:
+    return "-" if price is None else f"{price:g}"
+
+
+def _price(token: bytes) -> float:
+    """Parse a price field; ValueError unless it is a finite number."""
+    price = float(token)
+    if not math.isfinite(price):
+        raise ValueError(f"Price {price} is not finite")
+    return price
+
+
+def _ref(parts: list) -> str:
+    """The ref / order id a reply to this request should carry."""
+    return parts[1].decode() if len(parts) > 1 else "-"
+
+
+class _Conn:
+    """One client connection: its writer, pending replies, subscription."""
+
+    __slots__ = ("writer", "out", "subscribed", "task")
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer     = writer
+        self.out: list[str] = []
+        self.subscribed = False
+        self.task       = asyncio.current_task()
+
+
+class Gateway:
+    """
+    book          the LimitOrderBook to trade against (owned by the matcher)
+    max_batch     largest number of requests applied per matcher wake-up
+    max_delay     seconds the matcher waits for more requests once it has one
+    queue_size    bound on queued requests (readers block when full)
+    idle_compact  levels of tombstones a lazy-cancel book compacts after a
+                  batch that leaves the queue empty (0 = never)
+    """
+
+    def __init__(self, book: LimitOrderBook, max_batch: int = 1024,
+                 max_delay: float = 0.0, queue_size: int = 65_536,
+                 idle_compact: int = 64):
+        self.book      = book
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.idle_compact = idle_compact if book.cancel_mode == "lazy" else 0
+        self._queue: asyncio.Queue | None = None
+        self._queue_size = queue_size
+        self._next_id  = 1
+        self._owners: dict[int, list] = {}      # order_id → [conn, remaining]
+        self._conns: set[_Conn] = set()
+        self._md: list[tuple] = []              # feed events for this batch
+        self._replied: set[int] = set()         # batch positions answered
+        self._server  = None
+        self._matcher = None
+        self.batches  = 0
+        self.requests = 0
+        self.errors   = 0                # batches that raised; latest in .error
+        self.error: BaseException | None = None
+        book.subscribe(self._on_event)
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+
+    async def start(self, host: str = "127.0.0.1", port: int = 7001,
+                    path: str | None = None):
+        """Listen on host:port, or on a Unix socket if path is given."""
+        self._queue   = asyncio.Queue(self._queue_size)
+        self._matcher = asyncio.create_task(self._match_loop())
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._client, path)
+        else:
+            self._server = await asyncio.start_server(self._client, host, port)
+
+    async def close(self):
+        """Stop accepting, drop open connections and stop the matcher."""
+        self._server.close()
+        tasks = [conn.task for conn in self._conns]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._matcher.cancel()
+        await asyncio.gather(self._matcher, return_exceptions=True)
+        await self._server.wait_closed()
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "batches": self.batches,
+                "mean_batch": round(self.requests / self.batches, 1)
+                              if self.batches else 0.0,
+                "errors": self.errors}
+
+    # ── Connections ───────────────────────────────────────────────────────────
+
+    async def _client(self, reader: asyncio.StreamReader,
+                      writer: asyncio.StreamWriter):
+        conn = _Conn(writer)
+        self._conns.add(conn)
+        put  = self._queue.put
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                await put((conn, line.split()))
+        except (ConnectionError, asyncio.CancelledError):
+            pass                      # client went away / gateway closing
+        finally:
+            self._conns.discard(conn)
+            writer.close()
+
+    # ── Matching ──────────────────────────────────────────────────────────────
+
+    async def _match_loop(self):
+        while True:
+            batch = [await self._queue.get()]
+            await asyncio.sleep(0)           # let readers with data enqueue
+            self._drain(batch)
+            if self.max_delay > 0 and len(batch) < self.max_batch:
+                await asyncio.sleep(self.max_delay)
+                self._drain(batch)
+            try:
+                self._apply(batch)
+            except Exception as e:           # never let one batch stop the matcher
+                self.errors += 1
+                self.error   = e
+                replied = self._replied
+                for pos, (conn, parts) in enumerate(batch):
+                    if pos not in replied:
+                        conn.out.append(f"REJ {_ref(parts)} internal error\n")
+            await self._flush()
+            if self.idle_compact and self._queue.empty():
+                self.book.compact(self.idle_compact)     # off the request path
+
+    def _drain(self, batch: list):
+        queue = self._queue
+        while len(batch) < self.max_batch and not queue.empty():
+            batch.append(queue.get_nowait())
+
+    def _apply(self, batch: list):
+        """Run one micro-batch against the book, queueing replies."""
+        self.batches  += 1
+        self.requests += len(batch)
+        self._replied = replied = set()
+        adds: list = []
+        for pos, (conn, parts) in enumerate(batch):
+            if parts and parts[0] == b"A":
+                adds.append((pos, conn, parts))
+                continue
+            if adds:
+                self._apply_adds(adds)
+                adds = []
+            n_out = len(conn.out)
+            try:
+                self._apply_other(conn, parts)
+            finally:                         # its first line is the reply
+                if len(conn.out) > n_out:
+                    replied.add(pos)
+        if adds:
+            self._apply_adds(adds)
+
+    def _apply_adds(self, adds: list):
+        ids, sides, prices, qtys, accepted = [], [], [], [], []
+        replied = self._replied
+        for pos, conn, parts in adds:
+            try:
+                _, ref, side, price, qty = parts
+                side = _SIDE_CODES[side.decode()]
+                price, qty = _price(price), int(qty)
+            except (ValueError, KeyError):
+                conn.out.append(f"REJ {_ref(parts)} bad request\n")
+                replied.add(pos)
+                continue
+            ids.append(self._next_id)
+            self._next_id += 1
+            sides.append(side)
+            prices.append(price)
+            qtys.append(qty)
+            accepted.append((pos, conn, ref.decode()))
+        if not ids:
+            return
+
+        fills = self.book.add_orders(ids, sides, prices, qtys, skip_invalid=True)
+        rejected = set(fills["rejected"].tolist())
+        filled   = [0] * len(ids)
+        by_order: dict[int, list] = {}
+        for i, agg, rest, px, q in zip(fills["batch_index"].tolist(),
+                                       fills["aggressor_id"].tolist(),
+                                       fills["resting_id"].tolist(),
+                                       fills["price"].tolist(),
+                                       fills["quantity"].tolist()):
+            filled[i] += q
+            by_order.setdefault(i, []).append(f"FILL {agg} {px:g} {q}\n")
+            owner = self._owners.get(rest)
+            if owner is not None:
+                owner[0].out.append(f"FILL {rest} {px:g} {q}\n")
+                owner[1] -= q
+                if owner[1] <= 0:
+                    del self._owners[rest]
+
+        for i, (pos, conn, ref) in enumerate(accepted):
+            replied.add(pos)
+            if i in rejected:
+                conn.out.append(f"REJ {ref} invalid order\n")
+                continue
+            conn.out.append(f"ACK {ref} {ids[i]}\n")
+            if i in by_order:
+                conn.out.extend(by_order[i])
+            if qtys[i] > filled[i]:
+                self._owners[ids[i]] = [conn, qtys[i] - filled[i]]
+
+    def _apply_other(self, conn: _Conn, parts: list):
+        try:
+            kind = parts[0]
+            if kind == b"S":
+                conn.subscribed = True
+                bb, ba = self.book.best_bid(), self.book.best_ask()
+                conn.out.append(f"BBO {_fmt(bb)} {_fmt(ba)}\n")
+                return
+            oid   = int(parts[1])
+            owner = self._owners.get(oid)
+            if owner is None or owner[0] is not conn:
+                conn.out.append(f"REJ {oid} unknown order\n")
+                return
+            if kind == b"X":
+                self.book.cancel_order(oid)
+                del self._owners[oid]
+                conn.out.append(f"CXL {oid}\n")
+            elif kind == b"M":
+                price = None if parts[2] == b"-" else _price(parts[2])
+                qty   = None if parts[3] == b"-" else int(parts[3])
+                trades = self.book.modify_order(oid, price, qty)
+                owner[1] = ((owner[1] if qty is None else qty)
+                            - sum(t.quantity for t in trades))
+                conn.out.append(f"MOD {oid}\n")
+                for t in trades:
+                    conn.out.append(f"FILL {oid} {t.price:g} {t.quantity}\n")
+                    other = self._owners.get(t.resting_id)
+                    if other is not None:
+                        other[0].out.append(
+                            f"FILL {t.resting_id} {t.price:g} {t.quantity}\n")
+                        other[1] -= t.quantity
+                        if other[1] <= 0:
+                            del self._owners[t.resting_id]
+                if owner[1] <= 0:
+                    self._owners.pop(oid, None)
+            else:
+                conn.out.append(f"REJ {oid} bad request\n")
+        except (ValueError, IndexError):
+            conn.out.append(f"REJ {_ref(parts)} bad request\n")
+
+    # ── Market data and replies ───────────────────────────────────────────────
+
+    def _on_event(self, event: tuple):
+        kind = event[0]
+        if kind == BBO or kind == TRADE:
+            self._md.append(event)
+
+    async def _flush(self):
+        if self._md:
+            md, self._md = self._md, []
+            lines = []
+            bbo   = None
+            for ev in md:
+                if ev[0] == TRADE:
+                    lines.append(f"TRD {ev[3]:g} {ev[4]}\n")
+                else:
+                    bbo = ev
+            if bbo is not None:
+                lines.append(f"BBO {_fmt(bbo[1])} {_fmt(bbo[2])}\n")
+            for conn in self._conns:
+                if conn.subscribed:
+                    conn.out.extend(lines)
+
+        drains = []
+        for conn in self._conns:
+            if conn.out:
+                conn.writer.write("".join(conn.out).encode())
+                conn.out.clear()
+                drains.append(conn.writer.drain())
+        for d in drains:
+            try:
+                await d
+            except ConnectionError:
+                pass
+
+
+# ── Load generator ────────────────────────────────────────────────────────────
+
+async def _load_client(host, port, path, n_orders: int, window: int,
+                       seed: int, hist: LatencyHistogram, counts: dict):
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    rng      = random.Random(seed)
+    sent_at: dict[str, int] = {}
+    slots    = asyncio.Semaphore(window)
+    clock    = time.perf_counter_ns
+
+    async def read_replies():
+        done = 0
+        while done < n_orders:
+            line = await reader.readline()
+            if not line:
+                break
+            parts = line.split()
+            if parts[0] in (b"ACK", b"REJ"):
+                t = sent_at.pop(parts[1].decode(), None)
+                if t is not None:
+                    hist.record(clock() - t)
+                    done += 1
+                    slots.release()
+                counts["acks" if parts[0] == b"ACK" else "rejects"] += 1
+            elif parts[0] == b"FILL":
+                counts["fills"] += 1
+
+    reply_task = asyncio.create_task(read_replies())
+    for i in range(n_orders):
+        await slots.acquire()
+        side = rng.choice("BS")
+        aggressive = rng.random() < 0.3
+        off  = 5 if aggressive else rng.randint(1, 49)
+        sign = -1 if side == "B" else 1
+        ticks = 10_000 + (-sign * off if aggressive else sign * off)
+        ref  = str(i)
+        sent_at[ref] = clock()
+        writer.write(f"A {ref} {side} {ticks / 100:.2f} {rng.randint(1, 99)}\n".encode())
+        if i % 64 == 63:
+            await writer.drain()
+    await writer.drain()
+    await reply_task
+    writer.close()
+
+
+async def run_load(host: str = "127.0.0.1", port: int = 7001,
+                   path: str | None = None, clients: int = 8,
+                   orders: int = 10_000, window: int = 64,
+                   seed: int = 0) -> dict:
+    """Drive `clients` concurrent connections, each sending `orders` adds
+    with at most `window` unacknowledged; returns throughput and RTT."""
+    hist   = LatencyHistogram()
+    counts = {"acks": 0, "rejects": 0, "fills": 0}
+    t0 = time.perf_counter()
+    await asyncio.gather(*(
+        _load_client(host, port, path, orders, window, seed + c, hist, counts)
+        for c in range(clients)))
+    wall = time.perf_counter() - t0
+    return {"orders": clients * orders, "wall_s": round(wall, 3),
+            "orders_per_sec": round(clients * orders / wall),
+            **counts, "rtt_ns": hist.summary()}
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+async def _serve(args):
+    gw = Gateway(LimitOrderBook("GATEWAY", tick_size=args.tick),
+                 args.max_batch, args.max_delay_us * 1e-6)
+    await gw.start(args.host, args.port, args.unix)
+    print(f"Gateway listening on {args.unix or f'{args.host}:{args.port}'}")
+    await asyncio.Event().wait()
+
+
+async def _load(args):
+    gw = None
+    if args.serve:
+        gw = Gateway(LimitOrderBook("GATEWAY", tick_size=args.tick),
+                     args.max_batch, args.max_delay_us * 1e-6)
+        await gw.start(args.host, args.port, args.unix)
+    res = await run_load(args.host, args.port, args.unix, args.clients,
+                         args.orders, args.window)
+    rtt = res.pop("rtt_ns")
+    for k, v in res.items():
+        print(f"  {k:<22}{v:>14,}" if isinstance(v, int) else f"  {k:<22}{v:>14}")
+    print(f"  rtt µs                p50={rtt['p50'] / 1e3:,.0f}  "
+          f"p99={rtt['p99'] / 1e3:,.0f}  p99.9={rtt['p99.9'] / 1e3:,.0f}  "
+          f"max={rtt['max'] / 1e3:,.0f}")
+    if gw is not None:
+        print(f"  gateway               {gw.stats()}")
+        await gw.close()
+
+
+def main():
+    ap  = argparse.ArgumentParser(description="Asyncio order-entry gateway")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    for name in ("serve", "load"):
+        p = sub.add_parser(name)
+        p.add_argument("--host", default="127.0.0.1")
+        p.add_argument("--port", type=int, default=7001)
+        p.add_argument("--unix", default=None, help="Unix socket path instead of TCP")
+        p.add_argument("--tick", type=float, default=0.01)
+        p.add_argument("--max-batch", type=int, default=1024)
+        p.add_argument("--max-delay-us", type=float, default=0.0,
+                       help="linger this long for a fuller batch")
+        if name == "load":
+            p.add_argument("--serve", action="store_true",
+                           help="run the gateway in this process")
+            p.add_argument("--clients", type=int, default=8)
+            p.add_argument("--orders", type=int, default=10_000,
+                           help="orders per client")
+            p.add_argument("--window", type=int, default=64,
+                           help="max unacknowledged orders per client")
+    args = ap.parse_args()
+    asyncio.run(_serve(args) if args.cmd == "serve" else _load(args))
+
+
+if __name__ == "__main__":
+    main()
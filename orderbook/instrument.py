@@ -0,0 +1,172 @@
+"""
+instrument.py — Opt-in latency instrumentation for LimitOrderBook
+
+BookInstruments times the book's operations into LatencyHistograms
+(latency.py) and, for every order that trades on arrival, records how
+many fills it produced and how many price levels it touched:
+
+  ins = book.instrument()               # start
+  ...
+  print(ins.report())                   # or ins.stats() as a dict
+  book.uninstrument()                   # stop
+
+Instrumentation works by shadowing the methods on the book instance with
+timing wrappers; uninstrument() deletes the shadows. The book's own code
+is unchanged, so a book that is not instrumented runs exactly the
+uninstrumented class methods — the disabled cost is zero, not a flag test.
+The book calls self._match / self._submit internally, so the wrappers see
+the matching done inside add_order, add_orders and modify_order too.
+
+Timed operations (nanoseconds, time.perf_counter_ns by default):
+  add_order, add_orders, cancel_order, modify_order   per call
+  match        _match for orders that traded (the matching loop alone)
+Per aggressive order:
+  fills        fills produced
+  levels       distinct price levels traded against
+Per passive order (one that traded nothing on arrival):
+  passive      a count only
+
+Every limit order goes through _match — add_orders is a loop over the
+same _submit as add_order — so a stream gives the same passive /
+aggressive split whether it is submitted one order at a time or as a
+batch. A FOK killed before matching reaches neither count.
+
+A timed call also pays the wrapper and two clock reads; clock_overhead_ns
+in stats() is the measured cost of one back-to-back clock pair, to be
+subtracted mentally from small latencies.
+"""
+
+from __future__ import annotations
+import time
+
+from latency import LatencyHistogram
+
+OPS = ("add_order", "add_orders", "cancel_order", "modify_order")
+
+
+class BookInstruments:
+    """
+    Created by LimitOrderBook.instrument().
+
+    ops    public methods to time (subset of OPS)
+    match  also time _match and count fills / levels per aggressive order
+    clock  integer-nanosecond timer
+    """
+
+    def __init__(self, book, ops=OPS, match: bool = True,
+                 clock=time.perf_counter_ns):
+        unknown = set(ops) - set(OPS)
+        if unknown:
+            raise ValueError(f"Cannot instrument {sorted(unknown)} (choose from {OPS})")
+        self.clock      = clock
+        self.latency    = {op: LatencyHistogram() for op in ops}
+        if match:
+            self.latency["match"] = LatencyHistogram()
+        self.fills      = LatencyHistogram()
+        self.levels     = LatencyHistogram()
+        self.passive    = 0            # orders that reached _match and did not trade
+        self._book      = book
+        self._match     = match
+        self._overhead  = _clock_overhead(clock)
+
+    # ── Attach / detach ───────────────────────────────────────────────────────
+
+    def attach(self):
+        book, cls = self._book, type(self._book)
+        for op, hist in self.latency.items():
+            if op != "match":
+                setattr(book, op, self._timed(getattr(cls, op).__get__(book), hist))
+        if self._match:
+            book._match = self._timed_match(cls._match.__get__(book))
+
+    def detach(self):
+        names = [op for op in self.latency if op != "match"]
+        if self._match:
+            names.append("_match")
+        for name in names:
+            self._book.__dict__.pop(name, None)
+
+    def _timed(self, fn, hist: LatencyHistogram):
+        clock, record = self.clock, hist.record
+
+        def timed(*args, **kwargs):
+            t0 = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(clock() - t0)
+        timed.__wrapped__ = fn
+        return timed
+
+    def _timed_match(self, fn):
+        clock  = self.clock
+        record = self.latency["match"].record
+        fills, levels = self.fills.record, self.levels.record
+
+        def match(aggressor_id, side, price, quantity, trades, fill_cols):
+            n0 = len(trades) if trades is not None else len(fill_cols[2])
+            t0 = clock()
+            remaining = fn(aggressor_id, side, price, quantity, trades, fill_cols)
+            dt = clock() - t0
+            if remaining == quantity:
+                self.passive += 1
+                return remaining
+            record(dt)
+            # Fills arrive level by level, so levels = runs of equal price
+            prices = ([t.price for t in trades[n0:]] if trades is not None
+                      else fill_cols[2][n0:])
+            touched, last = 0, None
+            for p in prices:
+                if p != last:
+                    touched += 1
+                    last = p
+            fills(len(prices))
+            levels(touched)
+            return remaining
+        match.__wrapped__ = fn
+        return match
+
+    # ── Export ────────────────────────────────────────────────────────────────
+
+    def reset(self):
+        for hist in (*self.latency.values(), self.fills, self.levels):
+            hist.reset()
+        self.passive = 0
+
+    def stats(self) -> dict:
+        """Latency summaries (ns) per operation plus the per-order counts."""
+        return {
+            "latency_ns":        {op: h.summary() for op, h in self.latency.items()},
+            "aggressive_orders": self.fills.count,
+            "passive_orders":    self.passive,
+            "fills_per_aggressive":  self.fills.summary(),
+            "levels_per_aggressive": self.levels.summary(),
+            "clock_overhead_ns": self._overhead,
+        }
+
+    def report(self) -> str:
+        """Plain-text table of stats()."""
+        cols  = ("count", "mean", "p50", "p90", "p99", "p99.9", "max")
+        lines = [f"{'operation':<16}" + "".join(f"{c:>12}" for c in cols)]
+
+        def row(label: str, s: dict) -> str:
+            return f"{label:<16}" + "".join(
+                f"{s[c]:>12,}" if s[c] is not None else f"{'-':>12}" for c in cols)
+
+        for op, h in self.latency.items():
+            lines.append(row(op + " ns", h.summary()))
+        lines.append(row("fills/order", self.fills.summary()))
+        lines.append(row("levels/order", self.levels.summary()))
+        lines.append(f"aggressive orders {self.fills.count:,}, passive {self.passive:,}; "
+                     f"clock overhead ≈ {self._overhead} ns per timed call")
+        return "\n".join(lines)
+
+
+def _clock_overhead(clock, n: int = 2_000) -> int:
+    """Median cost of two back-to-back clock reads."""
+    samples = []
+    for _ in range(n):
+        t0 = clock()
+        samples.append(clock() - t0)
+    samples.sort()
+    return samples[n // 2]
@@ -0,0 +1,436 @@
+"""
+journal.py — Write-ahead journal and snapshot/restore for LimitOrderBook
+
+Durability for a single book in three pieces:
+  Journal         append-only file of accepted events, packed as the
+                  replay.py EVENT_DTYPE (34 bytes/event). Records are
+                  buffered and written + fsync'd in groups (group commit):
+                  every `commit_every` records, or once the oldest
+                  buffered record is `commit_interval` seconds old (a
+                  flusher thread commits an idle journal), or on commit().
+  JournaledBook   wraps a book; every add / cancel / modify is written to
+                  the journal before it is applied, and dropped from the
+                  buffer again if the book rejects it (so replay never has
+                  to reproduce an error). Mutators that cannot be
+                  journaled (reset, restore_state) are not forwarded.
+  snapshots       write_snapshot() dumps export_state() — resting orders
+                  in queue priority, the trade tape window and session
+                  stats — into one binary file; load_snapshot() maps it
+                  back with np.memmap, no parsing.
+
+Recovery = newest snapshot + the journal records after the snapshot's
+journal position (recover()). A torn final record left by a crash is
+dropped when the journal is reopened.
+
+Snapshot file layout:
+  b"LOBSNAP1" | u64 header length | JSON header | arrays, 64-byte aligned
+The header holds the book name / tick size, the journal position, the
+stats and {array name: offset, dtype, length}.
+
+Matching is deterministic, so the recovered book has the same resting
+orders, queue priority, trades and stats; timestamps given by the book
+clock during journal replay are replay-time. The rolling VWAP window and
+spread history restart empty.
+
+  python journal.py demo /tmp/jdemo        # write, snapshot, crash, recover
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import math
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+from orderbook import LimitOrderBook, OrderType, Side, Trade
+from replay import ADD, CANCEL, MODIFY, IOC, FOK, MARKET, EVENT_DTYPE, apply_event
+
+_RECORD = struct.Struct("<dBBqdq")          # EVENT_DTYPE, packed
+assert _RECORD.size == EVENT_DTYPE.itemsize
+_SIDES  = (Side.BID, Side.ASK)
+_KINDS  = {OrderType.LIMIT: ADD, OrderType.IOC: IOC, OrderType.FOK: FOK,
+           OrderType.MARKET: MARKET}
+_MAGIC  = b"LOBSNAP1"
+_ALIGN  = 64
+
+
+# ── Journal ───────────────────────────────────────────────────────────────────
+
+class Journal:
+    """
+    path             journal file, created or appended to
+    commit_every     group size: write + fsync after this many records
+    commit_interval  seconds a buffered record may wait for its group; a
+                     daemon thread commits the buffer once it is this old,
+                     so an idle book loses at most this window. None (or
+                     inf) disables the thread: only commit_every, commit()
+                     and close() commit
+    fsync            False writes without fsync (OS-buffered; survives a
+                     process crash, not a power loss)
+
+    Thread-safe: appends, commits and the flusher share one lock.
+    """
+
+    def __init__(self, path: str, commit_every: int = 256,
+                 commit_interval: float | None = 0.005, fsync: bool = True):
+        if commit_every <= 0:
+            raise ValueError("commit_every must be positive")
+        if commit_interval is not None and not commit_interval > 0:
+            raise ValueError("commit_interval must be positive or None")
+        self.path            = path
+        self.commit_every    = commit_every
+        self.commit_interval = commit_interval
+        self.fsync           = fsync
+
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        torn = size % _RECORD.size
+        self._f = open(path, "ab")
+        if torn:                                   # partial record from a crash
+            self._f.truncate(size - torn)
+        self.committed = size // _RECORD.size      # records durable on disk
+        self.commits   = 0
+        self.closed    = False
+        self._buf      = bytearray()
+        self._pending  = 0
+        self._first    = 0.0                       # monotonic time of oldest buffered record
+        self._lock     = threading.Lock()
+        self._stop     = threading.Event()
+        self._flusher: threading.Thread | None = None
+        if commit_interval is not None and math.isfinite(commit_interval):
+            self._flusher = threading.Thread(target=self._flush_loop,
+                                             name="journal-flush", daemon=True)
+            self._flusher.start()
+
+    @property
+    def records(self) -> int:
+        """Records appended so far, committed or not."""
+        return self.committed + self._pending
+
+    def append(self, kind: int, order_id: int, side: int,
+               price: float, qty: int):
+        with self._lock:
+            self._stage(kind, order_id, side, price, qty)
+            self._commit_due()
+
+    def commit(self):
+        """Write and (if enabled) fsync every buffered record."""
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        """Commit what is buffered and close the file; later calls do nothing."""
+        if self.closed:
+            return
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._lock:
+            self._commit()
+            self._f.close()
+            self.closed = True
+
+    # Staging: JournaledBook holds _lock across stage → apply → commit or
+    # truncate, so no commit can write a record the book then rejects.
+
+    def _stage(self, kind: int, order_id: int, side: int, price: float, qty: int):
+        if self.closed:
+            raise ValueError(f"Journal {self.path} is closed")
+        if not self._pending:
+            self._first = time.monotonic()
+        self._buf += _RECORD.pack(time.time(), kind, side, order_id, price, qty)
+        self._pending += 1
+
+    def _truncate(self, pending: int):
+        """Drop buffered records past the first `pending`."""
+        del self._buf[pending * _RECORD.size:]
+        self._pending = pending
+
+    def _drop(self, first: int, positions):
+        """Drop buffered records first + i for i in positions."""
+        size = _RECORD.size
+        for i in sorted(positions, reverse=True):
+            del self._buf[(first + i) * size:(first + i + 1) * size]
+        self._pending -= len(positions)
+
+    def _commit_due(self):
+        if self._pending >= self.commit_every or (
+                self._pending and self.commit_interval is not None
+                and time.monotonic() - self._first >= self.commit_interval):
+            self._commit()
+
+    def _commit(self):
+        if self._pending:
+            self._f.write(self._buf)
+            self._f.flush()
+            if self.fsync:
+                os.fsync(self._f.fileno())
+            self.committed += self._pending
+            self.commits   += 1
+            self._buf.clear()
+            self._pending = 0
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.commit_interval):
+            with self._lock:
+                if not self.closed:
+                    self._commit_due()
+
+
+def read_journal(path: str, start: int = 0) -> np.ndarray:
+    """Memory-map journal records [start, end) — whole records only."""
+    n = os.path.getsize(path) // EVENT_DTYPE.itemsize if os.path.exists(path) else 0
+    if start >= n:
+        return np.empty(0, EVENT_DTYPE)
+    return np.memmap(path, EVENT_DTYPE, "r", offset=start * EVENT_DTYPE.itemsize,
+                     shape=(n - start,))
+
+
+# ── Journaled book ────────────────────────────────────────────────────────────
+
+class JournaledBook:
+    """
+    A LimitOrderBook whose accepted mutations are journaled, write-ahead:
+    each request's record is buffered before the book applies it and
+    dropped again if the book rejects it. Reads are forwarded to the
+    wrapped book; reset and restore_state (and the private mutators)
+    raise AttributeError — they cannot be journaled, so call them on
+    .book and start a new journal + snapshot.
+    """
+
+    _UNJOURNALED = frozenset({"reset", "restore_state", "_submit",
+                              "_submit_immediate", "_cancel", "_match"})
+
+    def __init__(self, book: LimitOrderBook, journal: Journal):
+        self.book    = book
+        self.journal = journal
+
+    def __getattr__(self, name):
+        if name in JournaledBook._UNJOURNALED:
+            raise AttributeError(f"{name} cannot be journaled; call it on "
+                                 f"JournaledBook.book and start a new journal")
+        return getattr(self.book, name)
+
+    def _ahead(self, record: tuple, op, *args):
+        """Stage `record`, apply op(*args); keep the record unless op raises
+        or reports no effect (None / False)."""
+        j = self.journal
+        with j._lock:
+            mark = j._pending
+            j._stage(*record)
+            try:
+                result = op(*args)
+            except BaseException:
+                j._truncate(mark)
+                raise
+            if result is None or result is False:
+                j._truncate(mark)
+            else:
+                j._commit_due()
+        return result
+
+    def add_order(self, order_id: int, side: Side, price: float | None,
+                  quantity: int, order_type: OrderType = OrderType.LIMIT) -> list[Trade]:
+        j = self.journal                                  # _ahead, inlined
+        with j._lock:
+            mark = j._pending
+            j._stage(_KINDS[order_type], order_id, 0 if side is Side.BID else 1,
+                     0.0 if price is None else price, quantity)
+            try:
+                trades = self.book.add_order(order_id, side, price, quantity, order_type)
+            except BaseException:
+                j._truncate(mark)
+                raise
+            j._commit_due()
+        return trades
+
+    def market_order(self, order_id: int, side: Side, quantity: int) -> list[Trade]:
+        return self.add_order(order_id, side, None, quantity, OrderType.MARKET)
+
+    def add_orders(self, order_ids, sides, prices, quantities,
+                   skip_invalid: bool = False) -> dict:
+        cols = (order_ids, sides, prices, quantities)
+        j    = self.journal
+        with j._lock:
+            mark = j._pending
+            for oid, side, px, qty in zip(*cols):
+                if side.__class__ is Side:
+                    side = 0 if side is Side.BID else 1
+                j._stage(ADD, int(oid), int(side), float(px), int(qty))
+            try:
+                fills = self.book.add_orders(*cols, skip_invalid)
+            except BaseException as e:
+                # Orders before the failing one were applied: keep their records
+                j._truncate(mark + getattr(e, "batch_index", 0))
+                raise
+            if len(fills["rejected"]):
+                j._drop(mark, fills["rejected"].tolist())
+            j._commit_due()
+        return fills
+
+    def cancel_order(self, order_id: int) -> bool:
+        return self._ahead((CANCEL, order_id, 0, 0.0, 0),
+                           self.book.cancel_order, order_id)
+
+    def modify_order(self, order_id: int, price: float | None = None,
+                     quantity: int | None = None) -> list[Trade] | None:
+        return self._ahead((MODIFY, order_id, 0,
+                            math.nan if price is None else price,
+                            0 if quantity is None else quantity),
+                           self.book.modify_order, order_id, price, quantity)
+
+    def snapshot(self, path: str):
+        """Commit the journal, then snapshot the book at that position."""
+        self.journal.commit()
+        write_snapshot(self.book, path, self.journal.records)
+
+    def close(self):
+        self.journal.close()
+
+
+# ── Snapshots ─────────────────────────────────────────────────────────────────
+
+def write_snapshot(book: LimitOrderBook, path: str, journal_seq: int = 0):
+    """Atomically write book.export_state() to path (tmp file + rename)."""
+    state  = book.export_state()
+    arrays = {"orders": state["orders"],
+              **{f"trade_{k}": v for k, v in state["trades"].items()}}
+
+    meta, offset = {}, 0
+    for name, arr in arrays.items():
+        meta[name] = {"offset": offset, "length": len(arr),
+                      "dtype": np.lib.format.dtype_to_descr(arr.dtype)}
+        offset += -(-arr.nbytes // _ALIGN) * _ALIGN
+    header = json.dumps({
+        "version":     1,
+        "name":        book.name,
+        "tick_size":   book.tick_size,
+        "journal_seq": journal_seq,
+        "stats":       state["stats"],
+        "arrays":      meta,
+    }).encode()
+    base = -(-(len(_MAGIC) + 8 + len(header)) // _ALIGN) * _ALIGN
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_MAGIC + struct.pack("<Q", len(header)) + header)
+        for name, arr in arrays.items():
+            f.seek(base + meta[name]["offset"])
+            f.write(np.ascontiguousarray(arr).tobytes())
+        f.truncate(base + offset)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_snapshot(path: str) -> tuple[dict, dict[str, np.ndarray]]:
+    """(header, arrays); arrays are read-only views of a memory map."""
+    mm = np.memmap(path, np.uint8, "r")
+    if bytes(mm[:len(_MAGIC)]) != _MAGIC:
+        raise ValueError(f"{path} is not a book snapshot")
+    hlen   = struct.unpack("<Q", bytes(mm[8:16]))[0]
+    header = json.loads(bytes(mm[16:16 + hlen]))
+    base   = -(-(16 + hlen) // _ALIGN) * _ALIGN
+    arrays = {}
+    for name, m in header["arrays"].items():
+        dt = np.lib.format.descr_to_dtype(
+            [tuple(f) for f in m["dtype"]] if isinstance(m["dtype"], list) else m["dtype"])
+        arrays[name] = np.frombuffer(mm, dt, m["length"], base + m["offset"])
+    return header, arrays
+
+
+# ── Recovery ──────────────────────────────────────────────────────────────────
+
+def replay_journal(book: LimitOrderBook, records: np.ndarray,
+                   chunk_rows: int = 65_536) -> int:
+    """Apply journal records to book; returns the number applied."""
+    for lo in range(0, len(records), chunk_rows):
+        chunk = records[lo:lo + chunk_rows]
+        for kind, oid, side, price, qty in zip(chunk["kind"].tolist(),
+                                               chunk["order_id"].tolist(),
+                                               chunk["side"].tolist(),
+                                               chunk["price"].tolist(),
+                                               chunk["qty"].tolist()):
+            if kind == MODIFY:
+                book.modify_order(oid, None if price != price else price,
+                                  qty or None)
+            else:
+                apply_event(book, kind, oid, _SIDES[side], price, qty)
+    return len(records)
+
+
+def recover(journal_path: str, snapshot_path: str | None = None,
+            **book_kwargs) -> tuple[LimitOrderBook, dict]:
+    """
+    Rebuild a book from the snapshot (if given and present) plus the
+    journal tail. book_kwargs configure the new book; name and tick_size
+    default to the snapshot's. Returns (book, timings).
+    """
+    t0 = time.perf_counter()
+    seq, header = 0, None
+    if snapshot_path is not None and os.path.exists(snapshot_path):
+        header, arrays = load_snapshot(snapshot_path)
+        book_kwargs.setdefault("name", header["name"])
+        book_kwargs.setdefault("tick_size", header["tick_size"])
+        seq = header["journal_seq"]
+    book = LimitOrderBook(**book_kwargs)
+    if header is not None:
+        trades = {k[len("trade_"):]: v for k, v in arrays.items()
+                  if k.startswith("trade_")}
+        book.restore_state(arrays["orders"], trades, header["stats"])
+    t1 = time.perf_counter()
+    n  = replay_journal(book, read_journal(journal_path, seq))
+    t2 = time.perf_counter()
+    return book, {"snapshot_s": round(t1 - t0, 4), "journal_s": round(t2 - t1, 4),
+                  "journal_records": n, "snapshot_orders":
+                  len(arrays["orders"]) if header is not None else 0}
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def main():
+    ap = argparse.ArgumentParser(description="Book journal / snapshot demo")
+    ap.add_argument("cmd", choices=["demo"])
+    ap.add_argument("dir")
+    ap.add_argument("-n", "--events", type=int, default=200_000)
+    args = ap.parse_args()
+
+    from replay import generate_events, iter_events
+    os.makedirs(args.dir, exist_ok=True)
+    ev_path   = os.path.join(args.dir, "events.bin")
+    j_path    = os.path.join(args.dir, "book.journal")
+    snap_path = os.path.join(args.dir, "book.snap")
+    for p in (j_path, snap_path):
+        if os.path.exists(p):
+            os.remove(p)
+    generate_events(ev_path, args.events)
+
+    # Snapshot at 90% of the stream; the rest is only in the journal
+    live = JournaledBook(LimitOrderBook("DEMO", tick_size=0.01), Journal(j_path))
+    done, snap_at = 0, int(args.events * 0.9)
+    for chunk in iter_events(ev_path):
+        for kind, oid, side, price, qty in zip(
+                chunk["kind"].tolist(), chunk["order_id"].tolist(),
+                chunk["side"].tolist(), chunk["price"].tolist(),
+                chunk["qty"].tolist()):
+            try:
+                apply_event(live, kind, oid, _SIDES[side], price, qty)
+            except ValueError:
+                pass
+            done += 1
+            if done == snap_at:
+                live.snapshot(snap_path)
+    live.close()
+
+    for label, snap in (("journal only", None), ("snapshot + tail", snap_path)):
+        book, t = recover(j_path, snap, tick_size=0.01)
+        same = (book.depth_snapshot(10) == live.depth_snapshot(10)
+                and book.trade_summary() == live.trade_summary())
+        print(f"{label:<16} identical={same}  {t}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+ladder.py — Dense price-ladder level store for tick-mode books
+
+PriceLadder is a drop-in for the SortedDict that holds one side of a
+LimitOrderBook (integer tick key → PriceLevel), tuned for books whose
+activity sits within a few hundred ticks of the touch:
+
+  window   `size` consecutive ticks [base, base + size) around the touch.
+           Which of them hold a level is an occupancy bitmap (one Python
+           int, bit i ⇔ key base + i), so the best level is a single
+           bit_length() / lowest-set-bit and insert/delete flip one bit.
+  far      keys outside the window live in a SortedList, as before.
+  map      every key → PriceLevel in a plain dict, so get / [] / in are
+           dict lookups regardless of where the key sits.
+
+The anchor moves with the market: when a level is added outside the
+window while this side's best price is also outside it, the window is
+re-centred on the best price (bids keep most of the window below the
+touch, asks above) and keys are redistributed — O(levels), amortised over
+the inserts that drifted.
+
+Only the operations LimitOrderBook uses are provided: get, [], []=, del,
+in, len, bool, peekitem(0 | -1), keys()[0 | -1], items() (ascending and
+reversed()), values(), clear().
+"""
+
+from __future__ import annotations
+
+from sortedcontainers import SortedList
+
+
+class PriceLadder:
+    """
+    size    window width in ticks (levels kept in the bitmap)
+    is_bid  True for the bid side: the touch is the highest key and the
+            window extends mostly below it; False for asks (lowest key)
+    """
+
+    __slots__ = ("size", "is_bid", "get", "_map", "_base", "_bits", "_far",
+                 "recenters")
+
+    def __init__(self, size: int = 4096, is_bid: bool = True):
+        if size <= 0:
+            raise ValueError("Ladder size must be positive")
+        self.size      = size
+        self.is_bid    = is_bid
+        self._map: dict = {}
+        self.get       = self._map.get        # C-level dict lookup
+        self._base     = None                 # anchored on the first insert
+        self._bits     = 0
+        self._far      = SortedList()
+        self.recenters = 0
+
+    # ── Mapping ───────────────────────────────────────────────────────────────
+
+    def __getitem__(self, key):
+        return self._map[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._map
+
+    def __len__(self) -> int:
+        return len(self._map)
+
+    def __bool__(self) -> bool:
+        return bool(self._map)
+
+    def __setitem__(self, key, level):
+        m = self._map
+        if key in m:
+            m[key] = level
+            return
+        m[key] = level
+        if self._base is None:
+            self._anchor(key)
+        i = key - self._base
+        if 0 <= i < self.size:
+            self._bits |= 1 << i
+            return
+        self._far.add(key)
+        best = self._peek_key(-1 if self.is_bid else 0)
+        if not 0 <= best - self._base < self.size:
+            self._recenter(best)
+
+    def __delitem__(self, key):
+        del self._map[key]
+        i = key - self._base
+        if 0 <= i < self.size:
+            self._bits &= ~(1 << i)
+        else:
+            self._far.remove(key)
+
+    def clear(self):
+        self._map.clear()
+        self._bits = 0
+        self._far.clear()
+        self._base = None
+
+    # ── Ordered access ────────────────────────────────────────────────────────
+
+    def _peek_key(self, index: int):
+        bits, far = self._bits, self._far
+        if index == 0:
+            if bits:
+                key = self._base + (bits & -bits).bit_length() - 1
+                return far[0] if far and far[0] < key else key
+            return far[0]                     # IndexError when empty
+        if index == -1:
+            if bits:
+                key = self._base + bits.bit_length() - 1
+                return far[-1] if far and far[-1] > key else key
+            return far[-1]
+        return self._sorted_keys()[index]
+
+    def peekitem(self, index: int = -1):
+        bits, far = self._bits, self._far
+        if bits and not far:                  # common case: all levels dense
+            if index == -1:
+                key = self._base + bits.bit_length() - 1
+                return key, self._map[key]
+            if index == 0:
+                key = self._base + (bits & -bits).bit_length() - 1
+                return key, self._map[key]
+        if not self._map:
+            raise IndexError("peekitem on an empty ladder")
+        key = self._peek_key(index)
+        return key, self._map[key]
+
+    def _dense_keys(self, reverse: bool = False):
+        bits, base = self._bits, self._base
+        if reverse:
+            while bits:
+                i = bits.bit_length() - 1
+                yield base + i
+                bits ^= 1 << i
+        else:
+            while bits:
+                low = bits & -bits
+                yield base + low.bit_length() - 1
+                bits ^= low
+
+    def _iter_keys(self, reverse: bool = False):
+        far = self._far
+        if self._base is None:
+            yield from (reversed(far) if reverse else far)
+            return
+        lo, hi = self._base, self._base + self.size
+        if reverse:
+            yield from far.irange(minimum=hi, reverse=True)
+            yield from self._dense_keys(True)
+            yield from far.irange(maximum=lo - 1, reverse=True)
+        else:
+            yield from far.irange(maximum=lo - 1)
+            yield from self._dense_keys()
+            yield from far.irange(minimum=hi)
+
+    def _sorted_keys(self) -> list:
+        return list(self._iter_keys())
+
+    def keys(self) -> _KeysView:
+        return _KeysView(self)
+
+    def items(self) -> _ItemsView:
+        return _ItemsView(self)
+
+    def values(self):
+        m = self._map
+        return (m[k] for k in self._iter_keys())
+
+    # ── Anchor ────────────────────────────────────────────────────────────────
+
+    def _anchor(self, touch):
+        # Three quarters of the window on the passive side of the touch
+        self._base = touch - (self.size * 3 // 4 if self.is_bid else self.size // 4)
+
+    def _recenter(self, touch):
+        self._anchor(touch)
+        self.recenters += 1
+        lo, hi = self._base, self._base + self.size
+        bits, far = 0, []
+        for key in self._map:
+            if lo <= key < hi:
+                bits |= 1 << (key - lo)
+            else:
+                far.append(key)
+        self._bits = bits
+        self._far  = SortedList(far)
+
+
+class _KeysView:
+    __slots__ = ("_ladder",)
+
+    def __init__(self, ladder: PriceLadder):
+        self._ladder = ladder
+
+    def __getitem__(self, index: int):
+        return self._ladder._peek_key(index)
+
+    def __iter__(self):
+        return self._ladder._iter_keys()
+
+    def __reversed__(self):
+        return self._ladder._iter_keys(reverse=True)
+
+    def __len__(self) -> int:
+        return len(self._ladder)
+
+
+class _ItemsView:
+    __slots__ = ("_ladder",)
+
+    def __init__(self, ladder: PriceLadder):
+        self._ladder = ladder
+
+    def __iter__(self):
+        m = self._ladder._map
+        return ((k, m[k]) for k in self._ladder._iter_keys())
+
+    def __reversed__(self):
+        m = self._ladder._map
+        return ((k, m[k]) for k in self._ladder._iter_keys(reverse=True))
+
+    def __len__(self) -> int:
+        return len(self._ladder)
@@ -0,0 +1,105 @@
+"""
+latency.py — Log-bucketed latency histogram (HDR-style)
+
+Constant-memory recorder for nanosecond latencies. Values are bucketed by
+their top SIG_BITS significant bits, the scheme HdrHistogram uses:
+  v < 32            exact buckets
+  v ≥ 32            16 linear sub-buckets per power of two
+so a bucket spans 1/16 of its power of two and the reported midpoint is
+within ~3% of any value in it, from 1 ns to centuries, in under a thousand
+integer counters.
+
+  index(v) = 16·s + (v >> s),   s = max(0, bit_length(v) − 5)
+"""
+
+from __future__ import annotations
+
+SIG_BITS = 5
+_HALF    = 1 << (SIG_BITS - 1)          # 16 sub-buckets per octave
+_N_BUCKETS = (64 - SIG_BITS + 2) * _HALF
+
+
+def bucket_index(v: int) -> int:
+    s = v.bit_length() - SIG_BITS
+    if s < 0:
+        s = 0
+    return s * _HALF + (v >> s)
+
+
+def bucket_bounds(i: int) -> tuple[int, int]:
+    """Inclusive [low, high] of the values that land in bucket i."""
+    if i < 2 * _HALF:
+        return i, i
+    s   = i // _HALF - 1
+    top = i - s * _HALF
+    return top << s, ((top + 1) << s) - 1
+
+
+class LatencyHistogram:
+    """
+    record(ns) is O(1); percentile(p) is O(buckets). min, max, count and
+    sum are exact; percentiles are reported as the midpoint of the bucket.
+    """
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * _N_BUCKETS
+        self.count  = 0
+        self.total  = 0
+        self.min: int | None = None
+        self.max: int | None = None
+
+    def record(self, ns: int):
+        if ns < 0:
+            ns = 0
+        s = ns.bit_length() - SIG_BITS
+        if s < 0:
+            s = 0
+        self.counts[s * _HALF + (ns >> s)] += 1
+        self.count += 1
+        self.total += ns
+        if self.min is None or ns < self.min:
+            self.min = ns
+        if self.max is None or ns > self.max:
+            self.max = ns
+
+    def merge(self, other: LatencyHistogram):
+        for i, c in enumerate(other.counts):
+            if c:
+                self.counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def reset(self):
+        self.counts = [0] * _N_BUCKETS
+        self.count  = 0
+        self.total  = 0
+        self.min = self.max = None
+
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    def percentile(self, p: float) -> int | None:
+        """Value at percentile p (0–100), clamped to the exact min/max."""
+        if not self.count:
+            return None
+        target = max(1, -(-self.count * p // 100))     # ceil
+        seen   = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                lo, hi = bucket_bounds(i)
+                return int(min(max((lo + hi) // 2, self.min), self.max))
+        return self.max
+
+    def summary(self, percentiles=(50, 90, 99, 99.9)) -> dict:
+        out = {"count": self.count, "min": self.min, "max": self.max,
+               "mean": round(self.mean(), 1) if self.count else None}
+        for p in percentiles:
+            out[f"p{p:g}"] = self.percentile(p)
+        return out
@@ -0,0 +1,255 @@
+"""
+live.py — Background market simulation feeding the live dashboard
+
+LiveMarket runs a simulator.Simulation in a daemon thread and, at a fixed
+frame rate, publishes an immutable Frame for the UI to draw. The UI
+thread never touches the live book: it only reads market.frame, one
+attribute load, and a Frame is never modified after publication (the
+same single-writer scheme as snapshots.py). Everything a Frame holds is
+O(levels + max_points), however many orders rest in the book:
+
+  snapshot  BookSnapshot of the top `levels` per side (publish_snapshots,
+            throttled to the frame rate)
+  summary   trade_summary() — O(1) running accumulators
+  trades    trade prices, downsampled
+  spread    spread per simulation block against simulated time, downsampled
+
+Series are downsampled incrementally as they grow (Downsampler): at most
+max_points buckets, each keeping the first x, min, max and last value of
+the raw points it covers, so spikes survive. When the buckets run out,
+adjacent pairs merge and the bucket width doubles — amortised O(1) per
+point, no pass over the history.
+
+preload rests that many extra orders 50+ ticks away from the mid before
+the flow starts, to exercise a deep book (1e6+ orders).
+
+  market = LiveMarket(SimConfig(), fps=5, preload=1_000_000).start()
+  frame  = market.frame          # any thread, any time
+  market.stop()
+"""
+
+from __future__ import annotations
+from typing import NamedTuple
+import threading
+import time
+
+import numpy as np
+
+from simulator import SimConfig, Simulation
+from snapshots import BookSnapshot
+
+
+# ── Downsampling ──────────────────────────────────────────────────────────────
+
+class Downsampler:
+    """
+    Min / max / last envelope of an append-only series in at most
+    max_points buckets. extend() takes a block of values (and optionally
+    their x); envelope() returns copies of the live buckets.
+    """
+
+    def __init__(self, max_points: int = 2_000):
+        if max_points < 2:
+            raise ValueError("max_points must be at least 2")
+        self.max_points = max_points
+        self.width      = 1            # raw points per full bucket
+        self.total      = 0            # raw points seen
+        self._n         = 0            # buckets in use; the last may be partial
+        self._x    = np.empty(max_points)
+        self._lo   = np.empty(max_points)
+        self._hi   = np.empty(max_points)
+        self._last = np.empty(max_points)
+        self._cnt  = np.zeros(max_points, np.int64)
+
+    def extend(self, values, x=None):
+        v  = np.asarray(values, dtype=np.float64)
+        xs = (np.arange(self.total, self.total + len(v), dtype=np.float64)
+              if x is None else np.asarray(x, dtype=np.float64))
+        i, n = 0, len(v)
+        while i < n:
+            b = self._n - 1
+            if b >= 0 and self._cnt[b] < self.width:
+                # Top up the open bucket
+                take = min(n - i, self.width - self._cnt[b])
+                part = v[i:i + take]
+                self._lo[b]   = min(self._lo[b], part.min())
+                self._hi[b]   = max(self._hi[b], part.max())
+                self._last[b] = part[-1]
+                self._cnt[b] += take
+                i += take
+                continue
+            if self._n == self.max_points:
+                self._halve()
+                continue
+            # Whole buckets straight from a reshape, then a partial one
+            w = self.width
+            k = min((n - i) // w, self.max_points - self._n)
+            if k:
+                chunk = v[i:i + k * w].reshape(k, w)
+                s = slice(self._n, self._n + k)
+                self._x[s]    = xs[i:i + k * w:w]
+                self._lo[s]   = chunk.min(axis=1)
+                self._hi[s]   = chunk.max(axis=1)
+                self._last[s] = chunk[:, -1]
+                self._cnt[s]  = w
+                self._n += k
+                i += k * w
+            else:
+                b = self._n
+                part = v[i:]
+                self._x[b], self._lo[b], self._hi[b] = xs[i], part.min(), part.max()
+                self._last[b], self._cnt[b] = part[-1], len(part)
+                self._n += 1
+                i = n
+        self.total += n
+
+    def _halve(self):
+        """Merge adjacent bucket pairs; an odd last bucket stays as the open one."""
+        n, m = self._n, self._n // 2
+        for arr, f in ((self._lo, np.minimum), (self._hi, np.maximum)):
+            arr[:m] = f(arr[0:2 * m:2], arr[1:2 * m:2])
+        self._x[:m]    = self._x[0:2 * m:2]
+        self._last[:m] = self._last[1:2 * m:2]
+        self._cnt[:m]  = self._cnt[0:2 * m:2] + self._cnt[1:2 * m:2]
+        if n % 2:
+            for arr in (self._x, self._lo, self._hi, self._last, self._cnt):
+                arr[m] = arr[n - 1]
+            m += 1
+        self._n     = m
+        self.width *= 2
+
+    def envelope(self) -> tuple:
+        """(x, low, high, last) arrays, one entry per bucket (copies)."""
+        n = self._n
+        return (self._x[:n].copy(), self._lo[:n].copy(), self._hi[:n].copy(),
+                self._last[:n].copy())
+
+    def clear(self):
+        self.width = 1
+        self.total = 0
+        self._n    = 0
+
+
+# ── Worker ────────────────────────────────────────────────────────────────────
+
+class Frame(NamedTuple):
+    """One published view of the live market; never modified."""
+    version:        int
+    snapshot:       BookSnapshot
+    summary:        dict
+    resting_orders: int
+    events:         int
+    events_per_sec: float          # over the last frame interval
+    sim_seconds:    float
+    trades:         tuple          # (trade #, low, high, last price)
+    spread:         tuple          # (sim seconds, low, high, last spread)
+    running:        bool
+
+
+class LiveMarket:
+    """
+    config      simulator configuration (n_events is ignored; the worker
+                runs until stop(), or max_events if given)
+    fps         frames published per second
+    levels      depth levels per side in each frame's snapshot
+    max_points  downsampled points per series
+    max_rate    cap on events per second of wall time (None = flat out)
+    preload     resting orders added before the flow starts
+    """
+
+    def __init__(self, config: SimConfig | None = None, seed: int = 0,
+                 fps: float = 5.0, levels: int = 15, max_points: int = 2_000,
+                 max_rate: float | None = None, preload: int = 0,
+                 max_events: int | None = None):
+        if fps <= 0:
+            raise ValueError("fps must be positive")
+        self.config     = config if config is not None else SimConfig()
+        self.sim        = Simulation(self.config, seed)
+        self.book       = self.sim.book
+        self.fps        = fps
+        self.max_rate   = max_rate
+        self.max_events = max_events
+        self._publisher = self.book.publish_snapshots(levels, min_interval=1.0 / fps)
+        self._trades    = Downsampler(max_points)
+        self._spread    = Downsampler(max_points)
+        self._stop      = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._version   = 0
+        self.error: BaseException | None = None
+        if preload:
+            self._preload(preload)
+        self.frame      = self._make_frame(0.0, running=False)
+
+    def _preload(self, n: int):
+        """Rest n orders 50–5,049 ticks from the mid, ids -1 … -n."""
+        rng   = np.random.default_rng(12345)
+        tick  = self.config.tick
+        side  = rng.integers(0, 2, n)
+        dist  = rng.integers(50, 5_050, n)
+        mid   = round(self.config.mid / tick)
+        price = np.round(np.where(side == 0, mid - dist, mid + dist) * tick, 10)
+        ok    = price > 0
+        self.book.add_orders(-np.arange(1, n + 1)[ok], side[ok], price[ok],
+                             rng.integers(1, 100, n)[ok])
+
+    # ── Control ───────────────────────────────────────────────────────────────
+
+    def start(self) -> LiveMarket:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="live-market",
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ── Worker thread ─────────────────────────────────────────────────────────
+
+    def _run(self):
+        sim, period = self.sim, 1.0 / self.fps
+        t0 = last = time.monotonic()
+        start_events = last_events = sim.events
+        try:
+            while not self._stop.is_set():
+                if self.max_events is not None and sim.events >= self.max_events:
+                    break
+                block = sim.step()
+                if block is not None:
+                    fills = block["fills"]["price"]
+                    if len(fills):
+                        self._trades.extend(fills)
+                    sp = self.book.spread()
+                    if sp is not None:
+                        self._spread.extend((sp,), (sim.t,))
+                now = time.monotonic()
+                if now - last >= period:
+                    rate = (sim.events - last_events) / (now - last)
+                    self._publish(rate, True)
+                    last, last_events = now, sim.events
+                if self.max_rate:
+                    ahead = (sim.events - start_events) / self.max_rate - (now - t0)
+                    if ahead > 0:
+                        time.sleep(min(ahead, period))
+        except BaseException as e:       # surfaced to the UI via .error
+            self.error = e
+        finally:
+            self._publish(0.0, False)
+
+    def _publish(self, rate: float, running: bool):
+        self._publisher.flush()
+        self.frame = self._make_frame(rate, running)
+
+    def _make_frame(self, rate: float, running: bool) -> Frame:
+        self._version += 1
+        return Frame(self._version, self._publisher.latest, self.book.trade_summary(),
+                     len(self.book._order_index), self.sim.events, rate,
+                     self.sim.t, self._trades.envelope(), self._spread.envelope(),
+                     running)
@@ -0,0 +1,286 @@
+"""
+manager.py — Multi-symbol book manager with process-sharded matching
+
+BookManager owns one LimitOrderBook per symbol and routes orders to them.
+Symbols are assigned round-robin to shards:
+  shards=0   every book lives in this process; ops are applied on flush()
+  shards=N   N worker processes, each owning its symbols' books. Ops are
+             buffered per shard and shipped as one message per batch_size
+             ops, so the queue/pickle cost is paid per batch, not per order.
+
+Within a shard a batch is applied in submission order per symbol; runs of
+adds to the same symbol go through add_orders in one call. Order between
+different symbols is not preserved (their books are independent).
+
+Submission is asynchronous: submit / cancel / modify return nothing.
+Results are read back with call(symbol, method, ...) — e.g.
+call("AAPL", "depth_snapshot", 5) — which first flushes that shard's
+buffer, so the answer reflects every op submitted before it.
+
+A worker that hits an unexpected error in a batch keeps running and
+raises it from the next call() / counts() to its shard; a worker that has
+died, or does not reply within reply_timeout, raises in the caller instead
+of blocking it.
+
+  with BookManager(symbols, shards=4, tick_size=0.01) as mgr:
+      mgr.submit("AAPL", 1, Side.BID, 189.50, 100)
+      mgr.call("AAPL", "trade_summary")
+"""
+
+from __future__ import annotations
+import multiprocessing as mp
+import queue
+import time
+
+from orderbook import LimitOrderBook, Side
+from replay import ADD, CANCEL, MODIFY, apply_event
+
+_SIDES = (Side.BID, Side.ASK)               # side code 0 = BID, 1 = ASK
+_POLL  = 0.1                                # s between worker liveness checks
+
+
+class _Shard:
+    """The books of one shard plus per-symbol counters; runs in a worker."""
+
+    def __init__(self, symbols: list[str], book_kwargs: dict):
+        self.books = {s: LimitOrderBook(s, **book_kwargs) for s in symbols}
+        self.counts = {s: {"ops": 0, "fills": 0, "rejected": 0, "missed": 0}
+                       for s in symbols}
+
+    def apply(self, ops: list[tuple]):
+        """ops: (symbol, kind, order_id, side_code, price, qty) tuples."""
+        pending: dict[str, tuple] = {}       # symbol → add columns not yet sent
+        for symbol, kind, oid, side, price, qty in ops:
+            if kind == ADD:
+                cols = pending.get(symbol)
+                if cols is None:
+                    cols = pending[symbol] = ([], [], [], [])
+                cols[0].append(oid)
+                cols[1].append(side)
+                cols[2].append(price)
+                cols[3].append(qty)
+                continue
+            if symbol in pending:
+                self._add(symbol, pending.pop(symbol))
+            c = self.counts[symbol]
+            c["ops"] += 1
+            try:
+                n = apply_event(self.books[symbol], kind, oid,
+                                _SIDES[side], price, qty)
+            except ValueError:
+                c["rejected"] += 1
+                continue
+            if n < 0:
+                c["missed"] += 1
+            else:
+                c["fills"] += n
+        for symbol, cols in pending.items():
+            self._add(symbol, cols)
+
+    def _add(self, symbol: str, cols: tuple):
+        fills = self.books[symbol].add_orders(*cols, skip_invalid=True)
+        c = self.counts[symbol]
+        c["ops"]      += len(cols[0])
+        c["fills"]    += len(fills["price"])
+        c["rejected"] += len(fills["rejected"])
+
+
+def _worker(symbols: list[str], book_kwargs: dict, inbox, outbox):
+    shard = _Shard(symbols, book_kwargs)
+    error = None                              # from a batch, for the next reply
+    while True:
+        msg = inbox.get()
+        tag = msg[0]
+        if tag == "ops":
+            try:
+                shard.apply(msg[1])
+            except Exception as e:            # keep the shard alive
+                error = e
+            continue
+        if tag == "stop":
+            break
+        seq = msg[1]
+        if error is not None:
+            outbox.put(("err", seq, error))
+            error = None
+            continue
+        try:
+            if tag == "call":
+                _, _, symbol, method, args, kwargs = msg
+                result = getattr(shard.books[symbol], method)(*args, **kwargs)
+            else:                             # "counts"
+                result = shard.counts
+            outbox.put(("ok", seq, result))
+        except Exception as e:                # report, keep the shard alive
+            outbox.put(("err", seq, e))
+
+
+class BookManager:
+    """
+    symbols        instruments to create books for (fixed at construction)
+    shards         0 = in-process; N ≥ 1 = N worker processes
+    batch_size     ops buffered per shard before a message is sent
+    max_inflight   bound on queued batches per shard (back-pressure)
+    reply_timeout  seconds to wait for a worker's reply (None = no limit)
+    book_kwargs    passed to every LimitOrderBook (tick_size, clock, ...)
+    """
+
+    def __init__(self, symbols, shards: int = 0, batch_size: int = 4096,
+                 max_inflight: int = 64, reply_timeout: float | None = 60.0,
+                 **book_kwargs):
+        symbols = list(symbols)
+        if len(set(symbols)) != len(symbols):
+            raise ValueError("Duplicate symbols")
+        if shards < 0:
+            raise ValueError("shards must be ≥ 0")
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        self.symbols       = symbols
+        self.n_shards      = shards
+        self.batch_size    = batch_size
+        self.reply_timeout = reply_timeout
+        self._seq          = 0            # request number, echoed in replies
+
+        n = max(1, shards)
+        self._shard_of = {s: i % n for i, s in enumerate(symbols)}
+        self._buffers: list[list] = [[] for _ in range(n)]
+        self._local: _Shard | None = None
+        self._procs, self._inboxes, self._outboxes = [], [], []
+
+        if shards == 0:
+            self._local = _Shard(symbols, book_kwargs)
+            return
+        for i in range(n):
+            inbox  = mp.Queue(maxsize=max_inflight)
+            outbox = mp.Queue()
+            proc   = mp.Process(target=_worker, daemon=True,
+                                args=([s for s in symbols if self._shard_of[s] == i],
+                                      book_kwargs, inbox, outbox))
+            proc.start()
+            self._procs.append(proc)
+            self._inboxes.append(inbox)
+            self._outboxes.append(outbox)
+
+    # ── Submission ────────────────────────────────────────────────────────────
+
+    def _push(self, symbol: str, op: tuple):
+        i   = self._shard_of[symbol]          # KeyError for an unknown symbol
+        buf = self._buffers[i]
+        buf.append(op)
+        if len(buf) >= self.batch_size:
+            self._send(i)
+
+    def submit(self, symbol: str, order_id: int, side: Side | int,
+               price: float, quantity: int):
+        """Queue a limit order. side is a Side or 0 = BID / 1 = ASK."""
+        if side.__class__ is Side:
+            side = 0 if side is Side.BID else 1
+        self._push(symbol, (symbol, ADD, order_id, side, price, quantity))
+
+    def cancel(self, symbol: str, order_id: int):
+        self._push(symbol, (symbol, CANCEL, order_id, 0, 0.0, 0))
+
+    def modify(self, symbol: str, order_id: int, price: float | None = None,
+               quantity: int | None = None):
+        self._push(symbol, (symbol, MODIFY, order_id, 0, price, quantity))
+
+    def _send(self, i: int):
+        buf = self._buffers[i]
+        if not buf:
+            return
+        self._buffers[i] = []
+        if self._local is not None:
+            self._local.apply(buf)
+        else:
+            self._put(i, ("ops", buf))
+
+    def flush(self):
+        """Send every buffered op to its shard."""
+        for i in range(len(self._buffers)):
+            self._send(i)
+
+    # ── Queries ───────────────────────────────────────────────────────────────
+
+    def _check_alive(self, i: int):
+        proc = self._procs[i]
+        if not proc.is_alive():
+            raise RuntimeError(f"Shard {i} worker exited (exit code {proc.exitcode})")
+
+    def _put(self, i: int, msg: tuple):
+        """inbox.put that fails instead of blocking on a dead worker."""
+        while True:
+            try:
+                self._inboxes[i].put(msg, timeout=_POLL)
+                return
+            except queue.Full:
+                self._check_alive(i)
+
+    def _request(self, i: int, tag: str, *args):
+        self._seq += 1
+        seq = self._seq
+        self._put(i, (tag, seq, *args))
+        deadline = (None if self.reply_timeout is None
+                    else time.monotonic() + self.reply_timeout)
+        while True:
+            try:
+                status, reply_seq, result = self._outboxes[i].get(timeout=_POLL)
+            except queue.Empty:
+                self._check_alive(i)
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TimeoutError(f"Shard {i} did not reply within "
+                                       f"{self.reply_timeout} s")
+                continue
+            if reply_seq == seq:              # else a late reply to a timed-out request
+                break
+        if status == "err":
+            raise result
+        return result
+
+    def call(self, symbol: str, method: str, *args, **kwargs):
+        """
+        Run book.<method>(*args, **kwargs) on the symbol's book after its
+        shard has applied everything submitted so far; returns the result.
+        """
+        i = self._shard_of[symbol]
+        self._send(i)
+        if self._local is not None:
+            return getattr(self._local.books[symbol], method)(*args, **kwargs)
+        return self._request(i, "call", symbol, method, args, kwargs)
+
+    def book(self, symbol: str) -> LimitOrderBook:
+        """Direct access to a book — in-process mode (shards=0) only."""
+        if self._local is None:
+            raise RuntimeError("Books live in worker processes; use call()")
+        self._send(self._shard_of[symbol])
+        return self._local.books[symbol]
+
+    def counts(self) -> dict[str, dict]:
+        """
+        Per-symbol {ops, fills, rejected, missed}. Flushes and waits for
+        every shard, so it doubles as a barrier.
+        """
+        self.flush()
+        if self._local is not None:
+            return {s: dict(c) for s, c in self._local.counts.items()}
+        out = {}
+        for i in range(len(self._procs)):
+            out.update(self._request(i, "counts"))
+        return out
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+
+    def close(self):
+        """Flush, stop the workers and wait for them to exit."""
+        self.flush()
+        for inbox, proc in zip(self._inboxes, self._procs):
+            if proc.is_alive():
+                inbox.put(("stop",))
+        for proc in self._procs:
+            proc.join()
+        self._procs, self._inboxes, self._outboxes = [], [], []
+
+    def __enter__(self) -> BookManager:
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
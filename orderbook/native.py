@@ -0,0 +1,387 @@
+"""
+native.py — LimitOrderBook API over the C order book (order-book/)
+
+NativeOrderBook drives order-book/orderbook.c through ctypes. The C book
+uses integer prices, so the wrapper always runs in tick mode: prices are
+converted to ticks on the way in and back on the way out, exactly as
+LimitOrderBook(tick_size=...) does.
+
+The shared library is built on first use with the system C compiler
+($CC, default cc) into order-book/liborderbook.so and rebuilt when the C
+sources are newer. build() can be called explicitly; NativeUnavailable is
+raised if no compiler is found.
+
+Per-call overhead is what limits a ctypes backend, so the C API has
+  ob_add_orders        one call for a whole batch (add_orders)
+  ob_fills             fills left in a C-side buffer, read as one array
+  ob_set_fill_callback optional per-fill callback (on_fill=...)
+
+Covered: add_order, add_orders, cancel_order, modify_order, best_bid,
+best_ask, spread, mid_price, total_bid_qty, total_ask_qty,
+order_flow_imbalance, depth_snapshot, vwap, trade_summary. Not covered:
+the trade tape, spread history, rolling VWAP window, delta feed and
+state export. Order ids must fit in a signed 32-bit int.
+
+  python -m pytest test_native.py   # parity tests against LimitOrderBook
+  python bench_native.py            # parity session + throughput
+"""
+
+from __future__ import annotations
+import ctypes
+import math
+import os
+import shutil
+import subprocess
+import sys
+import time
+from decimal import Decimal
+
+from orderbook import Side, Trade
+
+_SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        os.pardir, "order-book")
+_SOURCES = ("orderbook.c", "orderbook.h")
+_LIBNAME = "orderbook.dll" if sys.platform == "win32" else "liborderbook.so"
+_INT_MAX = 2**31 - 1
+_INF     = math.inf
+
+_lib = None
+
+
+class NativeUnavailable(RuntimeError):
+    """The C library could not be built or loaded."""
+
+
+class _Fill(ctypes.Structure):
+    _fields_ = [("batch_index",  ctypes.c_int),
+                ("aggressor_id", ctypes.c_int),
+                ("resting_id",   ctypes.c_int),
+                ("price",        ctypes.c_int),
+                ("quantity",     ctypes.c_int)]
+
+
+class _Stats(ctypes.Structure):
+    _fields_ = [("fills",      ctypes.c_longlong),
+                ("volume",     ctypes.c_longlong),
+                ("notional",   ctypes.c_longlong),
+                ("min_price",  ctypes.c_int),
+                ("max_price",  ctypes.c_int),
+                ("bid_orders", ctypes.c_int),
+                ("ask_orders", ctypes.c_int),
+                ("bid_qty",    ctypes.c_longlong),
+                ("ask_qty",    ctypes.c_longlong)]
+
+
+_FILL_FN = ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_int, ctypes.c_int,
+                            ctypes.c_int, ctypes.c_int)
+
+
+# ── Build / load ──────────────────────────────────────────────────────────────
+
+def build(force: bool = False) -> str:
+    """Compile the C book into a shared library if missing or stale."""
+    out  = os.path.join(_SRC_DIR, _LIBNAME)
+    srcs = [os.path.join(_SRC_DIR, s) for s in _SOURCES]
+    if (not force and os.path.exists(out)
+            and os.path.getmtime(out) >= max(map(os.path.getmtime, srcs))):
+        return out
+    cc = os.environ.get("CC", "cc")
+    if shutil.which(cc) is None:
+        raise NativeUnavailable(f"C compiler {cc!r} not found (set $CC)")
+    cmd = [cc, "-O2", "-shared", "-fPIC", "-o", out, srcs[0]]
+    res = subprocess.run(cmd, capture_output=True, text=True)
+    if res.returncode != 0:
+        raise NativeUnavailable(f"{' '.join(cmd)} failed:\n{res.stderr}")
+    return out
+
+
+def load() -> ctypes.CDLL:
+    """Build (if needed) and load the library, declaring its signatures."""
+    global _lib
+    if _lib is not None:
+        return _lib
+    lib = ctypes.CDLL(build())
+    P, I, LL = ctypes.c_void_p, ctypes.c_int, ctypes.c_longlong
+    IP       = ctypes.POINTER(ctypes.c_int)
+    sigs = {
+        "ob_create":            ([], P),
+        "ob_destroy":           ([P], None),
+        "ob_add_order":         ([P, I, I, I, I], I),
+        "ob_add_orders":        ([P, I, IP, IP, IP, IP, IP, I], I),
+        "ob_cancel_order":      ([P, I], I),
+        "ob_reduce_order":      ([P, I, I], I),
+        "ob_order_info":        ([P, I, IP, IP, IP], I),
+        "ob_set_fill_callback": ([P, _FILL_FN, P], None),
+        "ob_record_fills":      ([P, I], None),
+        "ob_fills":             ([P, IP], ctypes.POINTER(_Fill)),
+        "ob_best_bid":          ([P], I),
+        "ob_best_ask":          ([P], I),
+        "ob_levels":            ([P, I, I, IP, ctypes.POINTER(LL), IP], I),
+        "ob_get_stats":         ([P, ctypes.POINTER(_Stats)], None),
+    }
+    for name, (args, res) in sigs.items():
+        fn = getattr(lib, name)
+        fn.argtypes, fn.restype = args, res
+    _lib = lib
+    return lib
+
+
+# ── Book ──────────────────────────────────────────────────────────────────────
+
+class NativeOrderBook:
+    """
+    name       label, as LimitOrderBook
+    tick_size  price increment; required, the C book keys levels by tick
+    on_fill    optional fn(aggressor_id, resting_id, price, quantity)
+               called from C for every fill
+    """
+
+    def __init__(self, name: str = "Book", tick_size: float = 0.01,
+                 on_fill=None):
+        if tick_size is None or tick_size <= 0:
+            raise ValueError("Tick size must be positive")
+        self._lib = lib = load()
+        self.name      = name
+        self.tick_size = tick_size
+        self._price_dp = max(0, -Decimal(str(tick_size)).as_tuple().exponent)
+        self._tick_tol = tick_size * 1e-6
+        self._ob = lib.ob_create()
+        if not self._ob:
+            raise MemoryError("ob_create failed")
+        lib.ob_record_fills(self._ob, 1)
+        self._n_fills = ctypes.c_int()
+        self._stats   = _Stats()
+        self._on_fill = None
+        if on_fill is not None:
+            tick, dp = tick_size, self._price_dp
+            self._on_fill = _FILL_FN(lambda _, agg, rest, px, qty:
+                                     on_fill(agg, rest, round(px * tick, dp), qty))
+            lib.ob_set_fill_callback(self._ob, self._on_fill, None)
+
+    def __del__(self):
+        if getattr(self, "_ob", None):
+            self._lib.ob_destroy(self._ob)
+            self._ob = None
+
+    # ── Price conversion ──────────────────────────────────────────────────────
+
+    def _to_ticks(self, price: float) -> int:
+        if not math.isfinite(price):
+            raise ValueError(f"Price {price} is not finite")
+        ticks = round(price / self.tick_size)
+        if abs(ticks * self.tick_size - price) > self._tick_tol:
+            raise ValueError(f"Price {price} is not a multiple of "
+                             f"tick size {self.tick_size}")
+        if ticks > _INT_MAX:
+            raise ValueError(f"Price {price} is out of range for the C book")
+        return ticks
+
+    def _to_price(self, ticks: int) -> float:
+        return round(ticks * self.tick_size, self._price_dp)
+
+    # ── Submission ────────────────────────────────────────────────────────────
+
+    def add_order(self, order_id: int, side: Side,
+                  price: float, quantity: int) -> list[Trade]:
+        """Submit a limit order; returns the trades it executed."""
+        if not (0 < quantity < _INF and 0 < price < _INF):
+            raise ValueError("Quantity and price must be positive and finite")
+        if not 0 <= order_id <= _INT_MAX or quantity > _INT_MAX:
+            raise ValueError(f"Order {order_id} does not fit the C book's int fields")
+        try:
+            ticks = self._to_ticks(price)
+        except ValueError:
+            # LimitOrderBook reports a duplicate id before an off-tick price
+            if self._lib.ob_order_info(self._ob, order_id, None, None, None):
+                raise ValueError(f"Duplicate order_id {order_id}") from None
+            raise
+        if not self._lib.ob_add_order(self._ob, order_id,
+                                      0 if side is Side.BID else 1, ticks, quantity):
+            raise ValueError(f"Duplicate order_id {order_id}")
+        return self._trades()
+
+    def _trades(self) -> list[Trade]:
+        ptr = self._lib.ob_fills(self._ob, ctypes.byref(self._n_fills))
+        n   = self._n_fills.value
+        if not n:
+            return []
+        ts, to_price = time.time(), self._to_price
+        return [Trade(f.aggressor_id, f.resting_id, to_price(f.price), f.quantity, ts)
+                for f in ptr[:n]]
+
+    def add_orders(self, order_ids, sides, prices, quantities,
+                   skip_invalid: bool = False) -> dict:
+        """
+        Batch submit in one C call; same arguments, semantics and result
+        columns as LimitOrderBook.add_orders.
+        """
+        import numpy as np
+
+        ids  = np.asarray(order_ids)
+        sds  = np.asarray(sides)
+        pxs  = np.asarray(prices, dtype=np.float64)
+        qtys = np.asarray(quantities)
+        n    = len(ids)
+        if not n == len(sds) == len(pxs) == len(qtys):
+            raise ValueError("Batch columns must have equal length")
+        if sds.dtype == object:
+            sds = np.fromiter((0 if s is Side.BID or s == 0 else 1 for s in sds),
+                              np.int32, n)
+
+        # Invalid rows get price -1 so the C book rejects them in sequence
+        with np.errstate(invalid="ignore"):        # NaN / ±inf rows, bad_num
+            bad_num = ((qtys <= 0) | ~np.isfinite(qtys)
+                       | (pxs <= 0) | ~np.isfinite(pxs))
+            ticks  = np.rint(pxs / self.tick_size)
+            bad_px = np.abs(ticks * self.tick_size - pxs) > self._tick_tol
+        bad_rng = ((ids < 0) | (ids > _INT_MAX) | (qtys > _INT_MAX)
+                   | (ticks > _INT_MAX))
+        invalid = bad_num | bad_px | bad_rng
+        c_ticks = np.where(invalid, -1, ticks).astype(np.int32)
+
+        c_ids  = np.ascontiguousarray(np.where(bad_rng, 0, ids), np.int32)
+        c_sds  = np.ascontiguousarray(sds, np.int32)
+        c_qtys = np.ascontiguousarray(np.where(bad_rng | bad_num, 0, qtys), np.int32)
+        status = np.zeros(n, np.int32)
+        ip     = lambda a: a.ctypes.data_as(ctypes.POINTER(ctypes.c_int))
+        done = self._lib.ob_add_orders(self._ob, n, ip(c_ids), ip(c_sds),
+                                       ip(c_ticks), ip(c_qtys), ip(status),
+                                       int(skip_invalid))
+
+        fills = self._fill_columns()
+        if done < n:                               # stopped on a reject
+            if bad_num[done]:
+                e = ValueError("Quantity and price must be positive and finite")
+            elif bad_px[done]:
+                e = ValueError(f"Price {pxs[done]} is not a multiple of "
+                               f"tick size {self.tick_size}")
+            elif bad_rng[done]:
+                e = ValueError(f"Order {ids[done]} does not fit the C book's int fields")
+            else:
+                e = ValueError(f"Duplicate order_id {ids[done]}")
+            e.batch_index = done                   # as LimitOrderBook.add_orders
+            raise e
+        fills["rejected"] = np.flatnonzero(status == 0).astype(np.int64)
+        return fills
+
+    def _fill_columns(self) -> dict:
+        import numpy as np
+
+        ptr = self._lib.ob_fills(self._ob, ctypes.byref(self._n_fills))
+        n   = self._n_fills.value
+        raw = (np.ctypeslib.as_array(ptr, (n,)) if n
+               else np.zeros(0, [(f, np.int32) for f, _ in _Fill._fields_]))
+        return {
+            "batch_index":  raw["batch_index"].astype(np.int64),
+            "aggressor_id": raw["aggressor_id"].astype(np.int64),
+            "resting_id":   raw["resting_id"].astype(np.int64),
+            "price":        np.round(raw["price"] * self.tick_size, self._price_dp),
+            "quantity":     raw["quantity"].astype(np.int64),
+        }
+
+    # ── Cancellation / amendment ──────────────────────────────────────────────
+
+    def cancel_order(self, order_id: int) -> bool:
+        if not 0 <= order_id <= _INT_MAX:
+            return False
+        return bool(self._lib.ob_cancel_order(self._ob, order_id))
+
+    def modify_order(self, order_id: int, price: float | None = None,
+                     quantity: int | None = None) -> list[Trade] | None:
+        """Same semantics as LimitOrderBook.modify_order."""
+        if not 0 <= order_id <= _INT_MAX:
+            return None
+        side, key, qty = ctypes.c_int(), ctypes.c_int(), ctypes.c_int()
+        if not self._lib.ob_order_info(self._ob, order_id, ctypes.byref(side),
+                                       ctypes.byref(key), ctypes.byref(qty)):
+            return None
+        new_qty = qty.value if quantity is None else quantity
+        if price is None:
+            new_key = key.value
+        else:
+            if not 0 < price < _INF:
+                raise ValueError("Quantity and price must be positive and finite")
+            new_key = self._to_ticks(price)
+        if not 0 < new_qty < _INF:
+            raise ValueError("Quantity and price must be positive and finite")
+        if new_qty > _INT_MAX:
+            raise ValueError(f"Order {order_id} does not fit the C book's int fields")
+
+        if new_key == key.value and new_qty <= qty.value:
+            if new_qty < qty.value:
+                self._lib.ob_reduce_order(self._ob, order_id, new_qty)
+            return []
+        # Everything is validated: the resubmit below cannot fail, so the
+        # order is never lost between cancel and add
+        self._lib.ob_cancel_order(self._ob, order_id)
+        self._lib.ob_add_order(self._ob, order_id, side.value, new_key, new_qty)
+        return self._trades()
+
+    # ── Market Data ───────────────────────────────────────────────────────────
+
+    def best_bid(self) -> float | None:
+        t = self._lib.ob_best_bid(self._ob)
+        return self._to_price(t) if t >= 0 else None
+
+    def best_ask(self) -> float | None:
+        t = self._lib.ob_best_ask(self._ob)
+        return self._to_price(t) if t >= 0 else None
+
+    def spread(self) -> float | None:
+        bb, ba = self._lib.ob_best_bid(self._ob), self._lib.ob_best_ask(self._ob)
+        return self._to_price(ba - bb) if bb >= 0 and ba >= 0 else None
+
+    def mid_price(self) -> float | None:
+        bb, ba = self._lib.ob_best_bid(self._ob), self._lib.ob_best_ask(self._ob)
+        if bb < 0 or ba < 0:
+            return None
+        return round((bb + ba) * self.tick_size / 2, self._price_dp + 1)
+
+    def _get_stats(self) -> _Stats:
+        self._lib.ob_get_stats(self._ob, ctypes.byref(self._stats))
+        return self._stats
+
+    def total_bid_qty(self) -> int:
+        return self._get_stats().bid_qty
+
+    def total_ask_qty(self) -> int:
+        return self._get_stats().ask_qty
+
+    def order_flow_imbalance(self) -> float:
+        st = self._get_stats()
+        total = st.bid_qty + st.ask_qty
+        return round((st.bid_qty - st.ask_qty) / total, 4) if total > 0 else 0.0
+
+    def depth_snapshot(self, levels: int = 5) -> dict:
+        """Top N levels per side; same layout as LimitOrderBook.depth_snapshot."""
+        px  = (ctypes.c_int * levels)()
+        qty = (ctypes.c_longlong * levels)()
+        cnt = (ctypes.c_int * levels)()
+        out = {}
+        for name, code in (("bids", 0), ("asks", 1)):
+            n = self._lib.ob_levels(self._ob, code, levels, px, qty, cnt)
+            out[name] = [{"price": self._to_price(px[i]), "qty": qty[i],
+                          "orders": cnt[i]} for i in range(n)]
+        out.update(best_bid=self.best_bid(), best_ask=self.best_ask(),
+                   spread=self.spread(), mid=self.mid_price())
+        return out
+
+    # ── Analytics ─────────────────────────────────────────────────────────────
+
+    def vwap(self) -> float | None:
+        st = self._get_stats()
+        return round(st.notional * self.tick_size / st.volume, 4) if st.volume else None
+
+    def trade_summary(self) -> dict:
+        st = self._get_stats()
+        if st.fills == 0:
+            return {"n_trades": 0}
+        vwap = self.vwap()
+        return {
+            "n_trades":     st.fills,
+            "total_volume": st.volume,
+            "vwap":         vwap,
+            "min_price":    self._to_price(st.min_price),
+            "max_price":    self._to_price(st.max_price),
+            "avg_price":    vwap,
+        }
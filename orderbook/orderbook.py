@@ -3,36 +3,81 @@ orderbook.py — Limit Order Book: core matching engine
 
 Implements a full price-time priority order book with:
   - Bid/ask sides using SortedDict (BST-equivalent O(log n) ops)
-  - FIFO queue at each price level (deque)
+  - Optional integer tick prices (exact level keys, no float noise)
+  - FIFO queue at each price level (intrusive doubly linked list)
   - Aggressive order matching with partial fills
-  - Order cancellation by id
-  - Trade history and analytics: VWAP, spread history, order flow imbalance
+  - Market, immediate-or-cancel and fill-or-kill orders (never rest);
+    FOK decided in O(levels) from per-level totals before any fill
+  - O(1) order cancellation by id; optional lazy (tombstone) cancels with
+    threshold-triggered level compaction
+  - In-place amend: quantity-down keeps queue priority
+  - Running per-level and per-side quantity totals (O(1) OFI reads)
+  - Columnar trade tape (bounded ring, optional spill to disk)
+  - Streaming trade statistics: O(1) session and rolling-window VWAP
+  - Trade analytics: spread history (recorded on BBO change), order flow imbalance
   - Market depth snapshot
+  - Compact resting orders: __slots__ records, configurable cheap clock
+  - Incremental L2/L3 delta events to subscribers (see feed.py)
+  - State export / restore for snapshots (see journal.py)
+  - Optional dense price-ladder level store near the touch (see ladder.py)
+  - Immutable versioned snapshots for lock-free readers (see snapshots.py)
+  - Incremental OFI / microprice / imbalance signals via the feed (see signals.py)
+  - Opt-in per-operation latency histograms (see instrument.py)
 """
 
 from __future__ import annotations
-from collections import deque, defaultdict
 from dataclasses import dataclass, field
 from enum import Enum
+from decimal import Decimal
+from itertools import count, islice
 from sortedcontainers import SortedDict
+import math
 import time
 
+from ladder import PriceLadder
+from tape import TradeTape
+from trade_stats import TradeStats
+from recorder import SpreadRecorder
+from snapshots import SnapshotPublisher
+from instrument import BookInstruments, OPS as INSTRUMENTED_OPS
+from feed import (ORDER_ADD, ORDER_UPDATE, ORDER_REMOVE, LEVEL_ADD,
+                  LEVEL_UPDATE, LEVEL_REMOVE, TRADE, BBO, RESET)
+
 
 class Side(Enum):
     BID = "BID"
     ASK = "ASK"
 
 
-@dataclass
+class OrderType(Enum):
+    LIMIT  = "LIMIT"     # rest whatever does not fill
+    MARKET = "MARKET"    # no price limit; unfilled quantity is dropped
+    IOC    = "IOC"       # immediate-or-cancel: fill up to the limit, drop the rest
+    FOK    = "FOK"       # fill-or-kill: fill the whole quantity up to the limit, or nothing
+
+
+# Hot-path aliases: attribute access on an Enum class costs ~10x an `is` test
+_BID, _ASK = Side.BID, Side.ASK
+_LIMIT, _MARKET, _FOK = OrderType.LIMIT, OrderType.MARKET, OrderType.FOK
+_INF = float("inf")
+
+
+# slots=True: no per-instance __dict__ (~120 vs ~170 bytes per resting order
+# on CPython 3.11, see bench_memory.py). The timestamp is passed in by the
+# book from its configured clock instead of an eager time.time() default.
+@dataclass(slots=True)
 class Order:
     order_id:  int
     side:      Side
-    price:     float     # limit price
+    price:     float     # limit price (integer ticks in tick mode)
     quantity:  int       # remaining quantity
-    timestamp: float = field(default_factory=time.time)
+    timestamp: float = 0  # book clock at entry, supplied by LimitOrderBook
+    # Intrusive queue links, owned by the PriceLevel the order rests in
+    prev: Order | None = field(default=None, repr=False, compare=False)
+    next: Order | None = field(default=None, repr=False, compare=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class Trade:
     aggressor_id:  int
     resting_id:    int
@@ -41,200 +86,871 @@ class Trade:
     timestamp:     float = field(default_factory=time.time)
 
 
+class PriceLevel:
+    """
+    FIFO queue of resting orders at one price.
+
+    The queue is a doubly linked list threaded through the Order objects
+    themselves (prev/next), so given the order node:
+      append   O(1)  — new order joins the back (time priority)
+      popleft  O(1)  — oldest order leaves the front when filled
+      remove   O(1)  — cancel unlinks the node wherever it sits
+
+    qty is the running sum of remaining quantity at the level. append and
+    remove/popleft adjust it by the order's current quantity; partial fills
+    are applied by the matcher (reduce both order.quantity and level.qty).
+    """
+
+    __slots__ = ("price", "head", "tail", "count", "qty")
+
+    def __init__(self, price: float):
+        self.price = price
+        self.head: Order | None = None   # oldest — matched first
+        self.tail: Order | None = None   # newest
+        self.count = 0
+        self.qty   = 0
+
+    def append(self, order: Order):
+        order.prev = self.tail
+        order.next = None
+        if self.tail is None:
+            self.head = order
+        else:
+            self.tail.next = order
+        self.tail = order
+        self.count += 1
+        self.qty   += order.quantity
+
+    def popleft(self) -> Order:
+        order = self.head
+        self.head = order.next
+        if self.head is None:
+            self.tail = None
+        else:
+            self.head.prev = None
+        order.next = None
+        self.count -= 1
+        self.qty   -= order.quantity
+        return order
+
+    def remove(self, order: Order):
+        prev, nxt = order.prev, order.next
+        if prev is None:
+            self.head = nxt
+        else:
+            prev.next = nxt
+        if nxt is None:
+            self.tail = prev
+        else:
+            nxt.prev = prev
+        order.prev = order.next = None
+        self.count -= 1
+        self.qty   -= order.quantity
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __bool__(self) -> bool:
+        return self.head is not None
+
+    def __iter__(self):
+        node = self.head
+        while node is not None:
+            yield node
+            node = node.next
+
+
+class LazyPriceLevel(PriceLevel):
+    """
+    PriceLevel for cancel_mode="lazy". The book cancels an order that is
+    not the head by tombstoning it in place: its quantity is zeroed and it
+    leaves count / qty, but stays linked; `dead` counts such nodes.
+
+    The head is never a tombstone. popleft and remove walk past any that
+    surface at the front, dropping them on the way, so the matcher sees an
+    ordinary FIFO. When the last live order leaves, the whole chain is
+    dropped without a walk. compact() unlinks every tombstone; len, bool
+    and iteration cover live orders only.
+    """
+
+    __slots__ = ("dead",)
+
+    def __init__(self, price: float):
+        self.price = price
+        self.head: Order | None = None
+        self.tail: Order | None = None
+        self.count = 0
+        self.qty   = 0
+        self.dead  = 0                   # tombstones still linked
+
+    def popleft(self) -> Order:
+        order = PriceLevel.popleft(self)
+        if self.dead:
+            self._skip_dead()
+        return order
+
+    def remove(self, order: Order):
+        head = order is self.head
+        PriceLevel.remove(self, order)
+        if self.dead and head:
+            self._skip_dead()
+
+    def _skip_dead(self):
+        """Advance the head past tombstones (called with dead > 0)."""
+        if not self.count:               # only tombstones left: drop the chain
+            self.head = self.tail = None
+            self.dead = 0
+            return
+        node, dropped = self.head, 0
+        while not node.quantity:
+            node = node.next
+            dropped += 1
+        node.prev  = None
+        self.head  = node
+        self.dead -= dropped
+
+    def compact(self) -> int:
+        """Unlink every tombstone; returns how many. O(nodes at the level)."""
+        purged = self.dead
+        node, prev = self.head, None
+        while node is not None and self.dead:
+            nxt = node.next
+            if node.quantity:
+                prev = node
+            else:                        # never the head, so prev is set
+                prev.next = nxt
+                if nxt is None:
+                    self.tail = prev
+                else:
+                    nxt.prev = prev
+                node.prev = node.next = None
+                self.dead -= 1
+            node = nxt
+        return purged
+
+    def __iter__(self):
+        node = self.head
+        while node is not None:
+            if node.quantity:            # skip tombstones
+                yield node
+            node = node.next
+
+
 class LimitOrderBook:
     """
     Full limit order book with price-time priority matching.
 
     Internal structure:
-      bids: SortedDict  price → deque[Order]  (highest price = best bid)
-      asks: SortedDict  price → deque[Order]  (lowest price  = best ask)
+      bids: SortedDict  price → PriceLevel  (highest price = best bid)
+      asks: SortedDict  price → PriceLevel  (lowest price  = best ask)
 
     SortedDict is a BST-backed dict giving O(log n) insert/lookup/delete.
-    deque gives O(1) append (enqueue) and popleft (dequeue) — FIFO.
+    PriceLevel gives O(1) append, popleft and unlink-by-node — FIFO.
+
+    Price keys:
+      tick_size=None  keys are the float prices as submitted (legacy mode).
+                      100.1 and 100.10000000000001 are different levels.
+      tick_size=0.01  keys are integer ticks (price / tick_size), like the
+                      integer cents in order-book/orderbook.h. Prices are
+                      converted on the way in (add_order) and on the way
+                      out (trades, market data); off-grid prices raise.
+
+    Quantity aggregates (level.qty, _bid_qty, _ask_qty) are maintained
+    incrementally by add_order / _match / cancel_order. With
+    check_invariants=True every mutation is followed by a full recount
+    (check_invariants()), which is slow and meant for tests.
+
+    Executed trades go to a columnar TradeTape (see tape.py) rather than a
+    list of Trade objects. trade_capacity bounds it to the most recent N
+    fills; trade_spill_dir additionally appends evicted fills to disk.
+    VWAP and trade_summary come from running TradeStats accumulators, so
+    they cover the whole session regardless of the tape bound;
+    vwap_window_seconds / vwap_window_trades add a rolling-window VWAP.
+
+    Spread history is written to a SpreadRecorder (see recorder.py) only
+    when the best bid or best ask price changes. Pass spread_recorder to
+    choose ring vs. OHLC storage, capacity and clock.
+
+    Order and trade timestamps come from the book clock:
+      clock="wall"  time.time(), float seconds (default)
+      clock="ns"    time.monotonic_ns(), int nanoseconds; the trade tape
+                    stores them as int64 and vwap_window_seconds is still
+                    given in seconds
+      clock="seq"   per-book counter 1, 2, 3, ... — cheapest, gives a
+                    total order of events but no elapsed time, so it
+                    cannot be combined with vwap_window_seconds
+
+    Cancels:
+      cancel_mode="eager"   unlink the order from its level (default)
+      cancel_mode="lazy"    tombstone it in place (LazyPriceLevel): drop it
+                            from the index and the level / side totals,
+                            leave the node linked. Tombstones go when the
+                            front of the queue walks past them, all at
+                            once when a level's last live order leaves,
+                            or by compaction.
+      compact_min,          a cancel compacts its level once the level
+      lazy_cancel_ratio     holds at least compact_min tombstones (default
+                            1024) and more than lazy_cancel_ratio × its
+                            live orders (default 1.0). The floor keeps the
+                            walk rare: with a small one, compaction costs
+                            about what the deferred unlinks would have
+                            (bench_tombstone.py).
+      compact(max_levels)   purges tombstones off the cancel path, e.g.
+                            from an idle loop (Gateway does this between
+                            batches); a bounded call resumes where the
+                            last one stopped.
+    Aggregates, depth, trades and events are identical in both modes, and
+    eager books run the plain PriceLevel code.
+
+    Level store:
+      level_store="sorted"  SortedDict per side (default, any price keys)
+      level_store="ladder"  PriceLadder per side: a bitmap-indexed window
+                            of ladder_size ticks around the touch with a
+                            sorted fallback for far prices. Tick mode only.
+
+    subscribe(fn) registers a market-data listener that receives every
+    order, level, trade and BBO change as a delta event (see feed.py).
+    With no listeners the hot paths only pay an empty-list test.
+    signals.SignalStream is such a listener: it keeps best-level OFI,
+    microprice and queue / trade imbalance up to date as the book changes.
+
+    publish_snapshots() makes the book publish an immutable top-N
+    BookSnapshot after every mutation, for reader threads that must not
+    touch the live structures (see snapshots.py).
+
+    instrument() times add / cancel / modify / matching into latency
+    histograms until uninstrument(); uninstrumented books run the plain
+    methods (see instrument.py).
     """
 
-    def __init__(self, name: str = "Book"):
+    def __init__(self, name: str = "Book", tick_size: float | None = None,
+                 check_invariants: bool = False,
+                 trade_capacity: int | None = None,
+                 trade_spill_dir: str | None = None,
+                 vwap_window_seconds: float | None = None,
+                 vwap_window_trades: int | None = None,
+                 spread_recorder: SpreadRecorder | None = None,
+                 clock: str = "wall",
+                 level_store: str = "sorted",
+                 ladder_size: int = 4096,
+                 cancel_mode: str = "eager",
+                 compact_min: int = 1024,
+                 lazy_cancel_ratio: float = 1.0):
         self.name = name
+        self._check = check_invariants
 
-        # BST-backed: bids sorted ascending so bids.keys()[-1] = best bid
-        self._bids: SortedDict = SortedDict()
-        # BST-backed: asks sorted ascending so asks.keys()[0]  = best ask
-        self._asks: SortedDict = SortedDict()
+        if cancel_mode not in ("eager", "lazy"):
+            raise ValueError(f"Unknown cancel_mode {cancel_mode!r} (use 'eager' or 'lazy')")
+        if compact_min <= 0:
+            raise ValueError("compact_min must be positive")
+        if not 0 <= lazy_cancel_ratio < _INF:
+            raise ValueError("lazy_cancel_ratio must be non-negative and finite")
+        self.cancel_mode = cancel_mode
+        self.lazy_cancel_ratio = lazy_cancel_ratio
+        self.compact_min = compact_min
+        self.compactions = 0            # level compactions run (lazy mode)
+        self._compact_at = None         # (side, key) where a bounded compact() resumes
+        self._lazy       = cancel_mode == "lazy"
+        self._level_cls  = LazyPriceLevel if self._lazy else PriceLevel
+
+        # Timestamp source for orders and trades
+        if clock == "wall":
+            self._clock, ts_dtype, window = time.time, "f8", vwap_window_seconds
+        elif clock == "ns":
+            self._clock, ts_dtype = time.monotonic_ns, "i8"
+            window = (vwap_window_seconds * 1e9
+                      if vwap_window_seconds is not None else None)
+        elif clock == "seq":
+            if vwap_window_seconds is not None:
+                raise ValueError("vwap_window_seconds needs a time clock, not 'seq'")
+            self._clock, ts_dtype, window = count(1).__next__, "i8", None
+        else:
+            raise ValueError(f"Unknown clock {clock!r} (use 'wall', 'ns' or 'seq')")
+        self.clock = clock
+
+        # Tick mode: integer level keys, converted only at the API edge
+        if tick_size is not None and tick_size <= 0:
+            raise ValueError("Tick size must be positive")
+        self.tick_size = tick_size
+        self._price_dp = (max(0, -Decimal(str(tick_size)).as_tuple().exponent)
+                          if tick_size is not None else 6)
+        self._tick_tol = tick_size * 1e-6 if tick_size is not None else 0.0
+
+        # Both sides sorted ascending: bids.keys()[-1] = best bid,
+        # asks.keys()[0] = best ask
+        if level_store == "sorted":
+            self._bids: SortedDict = SortedDict()
+            self._asks: SortedDict = SortedDict()
+        elif level_store == "ladder":
+            if tick_size is None:
+                raise ValueError("level_store='ladder' needs tick_size")
+            self._bids = PriceLadder(ladder_size, is_bid=True)
+            self._asks = PriceLadder(ladder_size, is_bid=False)
+        else:
+            raise ValueError(f"Unknown level_store {level_store!r} "
+                             "(use 'sorted' or 'ladder')")
+        self.level_store = level_store
 
-        # Order id → (side, price) for O(1) cancellation lookup
-        self._order_index: dict[int, tuple[Side, float]] = {}
+        # Order id → resting Order node for O(1) cancellation
+        self._order_index: dict[int, Order] = {}
 
         # Analytics
-        self._trades:        list[Trade] = []
-        self._spread_history: list[tuple[float, float]] = []  # (timestamp, spread)
+        self._trades = TradeTape(trade_capacity, trade_spill_dir, ts_dtype)
+        self._stats  = TradeStats(window, vwap_window_trades, self._clock)
+        self._spread_history = (spread_recorder if spread_recorder is not None
+                                else SpreadRecorder())
+        # Best (bid, ask) level keys, refreshed by _check_bbo after any change
+        self._bbo: tuple = (None, None)
         self._order_count_bid = 0
         self._order_count_ask = 0
+        self._bid_qty = 0     # Σ remaining qty resting on each side
+        self._ask_qty = 0
+
+        # Market-data subscribers, called with each delta event
+        self._listeners: list = []
+
+        # Copy-on-write snapshot publisher (publish_snapshots)
+        self._publisher: SnapshotPublisher | None = None
+
+        # Latency instrumentation (instrument), None when off
+        self._instruments: BookInstruments | None = None
 
     # ── Submission ────────────────────────────────────────────────────────────
 
     def add_order(self, order_id: int, side: Side,
-                   price: float, quantity: int) -> list[Trade]:
+                   price: float | None, quantity: int,
+                   order_type: OrderType = OrderType.LIMIT) -> list[Trade]:
         """
-        Submit a limit order. Matches immediately if crossing; rests otherwise.
+        Submit an order. Matches immediately if crossing; a LIMIT order rests
+        whatever is left. MARKET (price ignored, may be None), IOC and FOK
+        orders never rest: the unfilled part is dropped, and a FOK that
+        cannot fill completely within its limit trades nothing.
         Returns a list of Trade objects executed (may be empty).
         """
-        if quantity <= 0 or price <= 0:
-            raise ValueError("Quantity and price must be positive")
+        trades: list[Trade] = []
+        if order_type is _LIMIT:
+            self._submit(order_id, side, price, quantity, trades, None)
+        else:
+            self._submit_immediate(order_id, side, price, quantity, order_type, trades)
+        if self._publisher is not None:
+            # A passive order only touched its own level (see on_mutation)
+            order = None if trades else self._order_index.get(order_id)
+            if order is None:
+                self._publisher.on_mutation()
+            else:
+                self._publisher.on_mutation(side is _BID, order.price)
+        return trades
+
+    def market_order(self, order_id: int, side: Side, quantity: int) -> list[Trade]:
+        """Buy / sell `quantity` at any price; add_order(..., OrderType.MARKET)."""
+        return self.add_order(order_id, side, None, quantity, _MARKET)
+
+    def add_orders(self, order_ids, sides, prices, quantities,
+                   skip_invalid: bool = False) -> dict:
+        """
+        Submit a batch of limit orders given as columns (NumPy arrays or any
+        sequences of equal length). Each order is processed exactly as if
+        add_order had been called on it in sequence (it is a loop over the
+        same _submit), but fills come back as columns instead of Trade
+        objects and the snapshot publisher is notified once per batch. It
+        is an interface for columnar callers, not a faster matching path:
+        throughput is that of the add_order loop.
+
+        sides may hold Side members or the C book's codes (0 = BID, 1 = ASK).
+
+        An invalid order (non-positive or non-finite price/qty, duplicate
+        id, off-tick price) raises ValueError with the earlier orders
+        already applied, like a plain loop over add_order; the error's
+        batch_index attribute is the failing position. With
+        skip_invalid=True it is skipped instead and its batch position
+        reported in "rejected".
+
+        Returns the fills as columns:
+          batch_index, aggressor_id, resting_id, price, quantity  (+ rejected)
+        """
+        import numpy as np
+
+        ids  = order_ids.tolist()  if hasattr(order_ids,  "tolist") else list(order_ids)
+        sds  = sides.tolist()      if hasattr(sides,      "tolist") else list(sides)
+        pxs  = prices.tolist()     if hasattr(prices,     "tolist") else list(prices)
+        qtys = quantities.tolist() if hasattr(quantities, "tolist") else list(quantities)
+        if not len(ids) == len(sds) == len(pxs) == len(qtys):
+            raise ValueError("Batch columns must have equal length")
+
+        codes     = (_BID, _ASK)
+        fills     = ([], [], [], [])     # aggressor, resting, price, qty
+        agg_col   = fills[0]
+        batch_idx = []
+        rejected  = []
+        submit    = self._submit
+        for i in range(len(ids)):
+            side = sds[i]
+            if side.__class__ is not Side:
+                side = codes[side]
+            n_before = len(agg_col)
+            try:
+                submit(ids[i], side, pxs[i], qtys[i], None, fills)
+            except ValueError as e:
+                if not skip_invalid:
+                    if self._publisher is not None:
+                        self._publisher.on_mutation()
+                    e.batch_index = i                # orders [0, i) applied
+                    raise
+                rejected.append(i)
+                continue
+            n_new = len(agg_col) - n_before
+            if n_new:
+                batch_idx.extend([i] * n_new)
+
+        if self._publisher is not None:
+            self._publisher.on_mutation()
+        return {
+            "batch_index":  np.array(batch_idx, dtype=np.int64),
+            "aggressor_id": np.array(fills[0], dtype=np.int64),
+            "resting_id":   np.array(fills[1], dtype=np.int64),
+            "price":        np.array(fills[2], dtype=np.float64),
+            "quantity":     np.array(fills[3], dtype=np.int64),
+            "rejected":     np.array(rejected, dtype=np.int64),
+        }
+
+    def _submit(self, order_id: int, side: Side, price: float, quantity: int,
+                trades: list | None, fills: tuple | None):
+        """
+        Validate, match and rest one limit order. Fills are reported either
+        as Trade objects appended to `trades` (add_order) or as columns
+        appended to `fills` (add_orders).
+        """
+        # Chained comparisons also reject NaN and ±inf
+        if not (0 < quantity < _INF and 0 < price < _INF):
+            raise ValueError("Quantity and price must be positive and finite")
         if order_id in self._order_index:
             raise ValueError(f"Duplicate order_id {order_id}")
 
-        order  = Order(order_id, side, price, quantity)
-        trades = self._match(order)
+        if self.tick_size is not None:
+            price = self._to_ticks(price)
+
+        remaining = self._match(order_id, side, price, quantity, trades, fills)
+        moved     = remaining != quantity   # fills may have consumed the touch
 
         # Rest any unfilled quantity
-        if order.quantity > 0:
-            book = self._bids if side == Side.BID else self._asks
-            if price not in book:
-                book[price] = deque()
-            book[price].append(order)
-            self._order_index[order_id] = (side, price)
-            if side == Side.BID:
+        if remaining > 0:
+            order = Order(order_id, side, price, remaining, self._clock())
+            book  = self._bids if side is _BID else self._asks
+            level = book.get(price)
+            if level is None:
+                level = book[price] = self._level_cls(price)
+                moved = True         # a new level may be the new best
+            level.append(order)
+            self._order_index[order_id] = order
+            if side is _BID:
                 self._order_count_bid += 1
+                self._bid_qty += remaining
             else:
                 self._order_count_ask += 1
+                self._ask_qty += remaining
+            if self._listeners:
+                px = self._to_price(price)
+                self._emit((ORDER_ADD, order_id, side, px, remaining))
+                self._emit((LEVEL_ADD if level.count == 1 else LEVEL_UPDATE,
+                            side, px, level.qty, level.count))
 
-        # Record spread snapshot
-        s = self.spread()
-        if s is not None:
-            self._spread_history.append((time.time(), s))
+        if moved:
+            self._check_bbo()
 
-        return trades
+        if self._check:
+            self.check_invariants()
+
+    def _submit_immediate(self, order_id: int, side: Side, price: float | None,
+                          quantity: int, order_type: OrderType, trades: list):
+        """Validate and match a MARKET / IOC / FOK order. Nothing rests."""
+        if not 0 < quantity < _INF:
+            raise ValueError("Quantity must be positive and finite")
+        if order_type is _MARKET:
+            key = _INF if side is _BID else -_INF
+        else:
+            if price is None or not 0 < price < _INF:
+                raise ValueError("Quantity and price must be positive and finite")
+            key = self._to_ticks(price) if self.tick_size is not None else price
+        if order_id in self._order_index:
+            raise ValueError(f"Duplicate order_id {order_id}")
+
+        if order_type is _FOK and not self._can_fill(side, key, quantity):
+            return                   # killed: no queue was touched
+        if self._match(order_id, side, key, quantity, trades, None) != quantity:
+            self._check_bbo()
+        if self._check:
+            self.check_invariants()
+
+    def _can_fill(self, side: Side, limit, quantity: int) -> bool:
+        """
+        Whether the opposite side holds `quantity` at prices no worse than
+        `limit`. Sums level.qty from the touch outwards: O(levels needed).
+        """
+        if side is _BID:
+            book = self._asks
+            for key in book.keys():
+                if key > limit:
+                    return False
+                quantity -= book[key].qty
+                if quantity <= 0:
+                    return True
+        else:
+            book = self._bids
+            for key in reversed(book.keys()):
+                if key < limit:
+                    return False
+                quantity -= book[key].qty
+                if quantity <= 0:
+                    return True
+        return False
 
     # ── Cancellation ──────────────────────────────────────────────────────────
 
     def cancel_order(self, order_id: int) -> bool:
         """
         Remove a resting order by id. Returns True if found and removed.
-        O(1) lookup via index, O(queue_len) removal from deque.
+        O(1) lookup via index, O(1) unlink from the level queue (or, with
+        cancel_mode="lazy", an O(1) tombstone; compaction is amortised).
         """
-        if order_id not in self._order_index:
+        order = self._cancel(order_id)
+        if order is None:
             return False
+        if self._publisher is not None:
+            self._publisher.on_mutation(order.side is _BID, order.price)
+        return True
 
-        side, price = self._order_index.pop(order_id)
-        book = self._bids if side == Side.BID else self._asks
+    def _cancel(self, order_id: int) -> Order | None:
+        """cancel_order without publishing; returns the removed order."""
+        order = self._order_index.pop(order_id, None)
+        if order is None:
+            return None
 
-        if price in book:
-            queue = book[price]
-            # Remove from deque (O(n) in deque length at that level)
-            new_q = deque(o for o in queue if o.order_id != order_id)
-            if new_q:
-                book[price] = new_q
-            else:
-                del book[price]
+        side  = order.side
+        qty   = order.quantity
+        book  = self._bids if side is _BID else self._asks
+        level = book[order.price]
+        if self._lazy and order is not level.head:
+            # Tombstone (LazyPriceLevel fields, inlined)
+            order.quantity = 0
+            level.count -= 1
+            level.qty   -= qty
+            level.dead  += 1
+            if (level.dead >= self.compact_min
+                    and level.dead > self.lazy_cancel_ratio * level.count):
+                level.compact()             # amortised O(1) per cancel
+                self.compactions += 1
+        else:
+            level.remove(order)
+        if self._listeners:
+            self._emit((ORDER_REMOVE, order_id, side, self._to_price(order.price)))
+            self._emit_level(side, level)
+        if not level:
+            del book[order.price]
+            self._check_bbo()
 
-        if side == Side.BID:
+        if side is _BID:
             self._order_count_bid -= 1
+            self._bid_qty -= qty
         else:
             self._order_count_ask -= 1
+            self._ask_qty -= qty
 
-        return True
+        if self._check:
+            self.check_invariants()
+        return order
+
+    def compact(self, max_levels: int | None = None) -> int:
+        """
+        Purge tombstones (lazy cancel mode); returns how many. With
+        max_levels, compact at most that many levels and leave the rest to
+        the next call, which resumes at the first level not reached —
+        bounded work for an idle loop.
+        """
+        purged = 0
+        if not self._lazy:
+            return purged
+        resume, self._compact_at = self._compact_at, None
+        budget = max_levels
+        for side, book in enumerate((self._bids, self._asks)):
+            if resume is not None and side < resume[0]:
+                continue
+            start = resume[1] if resume is not None and side == resume[0] else None
+            for key, level in book.items():
+                if not level.dead or (start is not None and key < start):
+                    continue
+                if budget is not None:
+                    if budget <= 0:
+                        self._compact_at = (side, key)
+                        return purged
+                    budget -= 1
+                purged += level.compact()
+                self.compactions += 1
+        return purged
+
+    # ── Amendment ─────────────────────────────────────────────────────────────
+
+    def modify_order(self, order_id: int, price: float | None = None,
+                     quantity: int | None = None) -> list[Trade] | None:
+        """
+        Amend a resting order's price and/or remaining quantity (None keeps
+        the current value). Returns the trades caused by the amend, or None
+        if no order with this id is resting.
+
+          same price, quantity down   O(1) in place, keeps queue priority
+          same price, same quantity   no-op
+          quantity up / price change  cancel + resubmit under the same id:
+                                      loses priority, may match if it now
+                                      crosses the spread
+        """
+        order = self._order_index.get(order_id)
+        if order is None:
+            return None
+
+        new_qty = order.quantity if quantity is None else quantity
+        if price is None:
+            new_key = order.price
+        else:
+            if not 0 < price < _INF:
+                raise ValueError("Quantity and price must be positive and finite")
+            new_key = self._to_ticks(price) if self.tick_size is not None else price
+        if not 0 < new_qty < _INF:
+            raise ValueError("Quantity and price must be positive and finite")
+
+        if new_key == order.price and new_qty <= order.quantity:
+            delta = order.quantity - new_qty
+            if delta:
+                order.quantity -= delta
+                book  = self._bids if order.side is _BID else self._asks
+                level = book[new_key]
+                level.qty -= delta
+                if order.side is _BID:
+                    self._bid_qty -= delta
+                else:
+                    self._ask_qty -= delta
+                if self._listeners:
+                    self._emit((ORDER_UPDATE, order_id, order.side,
+                                self._to_price(new_key), new_qty))
+                    self._emit_level(order.side, level)
+                if self._check:
+                    self.check_invariants()
+                if self._publisher is not None:
+                    self._publisher.on_mutation(order.side is _BID, new_key)
+            return []
+
+        # One mutation for readers: no snapshot between cancel and resubmit
+        side = order.side
+        self._cancel(order_id)
+        trades: list[Trade] = []
+        self._submit(order_id, side, self._to_price(new_key), new_qty, trades, None)
+        if self._publisher is not None:
+            self._publisher.on_mutation()
+        return trades
+
+    def _check_bbo(self):
+        """Record the top of book if the best bid or ask price moved."""
+        bb = self._bids.keys()[-1] if self._bids else None
+        ba = self._asks.keys()[0]  if self._asks else None
+        if bb == self._bbo[0] and ba == self._bbo[1]:
+            return
+        self._bbo = (bb, ba)
+        if bb is not None and ba is not None:
+            self._spread_history.record(self._to_price(bb), self._to_price(ba),
+                                        self.spread())
+        if self._listeners:
+            self._emit((BBO, self.best_bid(), self.best_ask(),
+                        self.spread(), self.mid_price()))
+
+    # ── Market-Data Feed ──────────────────────────────────────────────────────
+
+    def subscribe(self, listener):
+        """
+        Call listener(event) for every subsequent book change (event
+        layouts in feed.py). Listeners run synchronously inside the
+        book's call and must not modify the book.
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    def _emit(self, event: tuple):
+        for fn in self._listeners:
+            fn(event)
+
+    def _emit_level(self, side: Side, level: PriceLevel):
+        """LEVEL_UPDATE for a level that still has orders, else LEVEL_REMOVE."""
+        if level.count:
+            self._emit((LEVEL_UPDATE, side, self._to_price(level.price),
+                        level.qty, level.count))
+        else:
+            self._emit((LEVEL_REMOVE, side, self._to_price(level.price)))
 
     # ── Matching Engine ───────────────────────────────────────────────────────
 
-    def _match(self, aggressor: Order) -> list[Trade]:
+    def _match(self, aggressor_id: int, side: Side, price, quantity: int,
+               trades: list | None, fills: tuple | None) -> int:
         """
-        Execute fills against the opposite side. Modifies aggressor.quantity
-        in place and removes/reduces resting orders.
+        Execute fills for an incoming order against the opposite side,
+        removing/reducing resting orders. Returns the unfilled quantity.
+        Every fill goes to the tape and stats; it is also appended to
+        `trades` as a Trade, or to the `fills` columns, whichever is given.
         """
-        trades    = []
-        opp_book  = self._asks if aggressor.side == Side.BID else self._bids
+        # Fast reject from the cached touch: most orders do not cross
+        if side is _BID:
+            best = self._bbo[1]
+            if best is None or best > price:
+                return quantity
+            opp_book, best_idx = self._asks, 0
+        else:
+            best = self._bbo[0]
+            if best is None or best < price:
+                return quantity
+            opp_book, best_idx = self._bids, -1
+        ts   = self._clock()         # one timestamp per aggressive order
+        feed = bool(self._listeners)
 
-        while aggressor.quantity > 0 and opp_book:
-            # Best opposing price: lowest ask for buyer, highest bid for seller
-            best_price = (opp_book.keys()[0]  if aggressor.side == Side.BID
-                          else opp_book.keys()[-1])
+        while quantity > 0 and opp_book:
+            # Best opposing level: lowest ask for buyer, highest bid for seller
+            best_price, level = opp_book.peekitem(best_idx)
 
             # Check if crossing
-            if aggressor.side == Side.BID and best_price > aggressor.price:
+            if side is _BID and best_price > price:
                 break
-            if aggressor.side == Side.ASK and best_price < aggressor.price:
+            if side is _ASK and best_price < price:
                 break
 
-            queue = opp_book[best_price]
+            fill_price = (best_price if self.tick_size is None
+                          else self._to_price(best_price))
+
+            while quantity > 0 and level:
+                resting  = level.head
+                fill_qty = min(quantity, resting.quantity)
 
-            while aggressor.quantity > 0 and queue:
-                resting  = queue[0]
-                fill_qty = min(aggressor.quantity, resting.quantity)
+                if trades is not None:
+                    trades.append(Trade(aggressor_id, resting.order_id,
+                                        fill_price, fill_qty, ts))
+                else:
+                    fills[0].append(aggressor_id)
+                    fills[1].append(resting.order_id)
+                    fills[2].append(fill_price)
+                    fills[3].append(fill_qty)
+                self._trades.record(aggressor_id, resting.order_id,
+                                    fill_price, fill_qty, ts)
+                self._stats.update(fill_price, fill_qty, ts)
 
-                trade = Trade(
-                    aggressor_id = aggressor.order_id,
-                    resting_id   = resting.order_id,
-                    price        = best_price,
-                    quantity     = fill_qty,
-                )
-                trades.append(trade)
-                self._trades.append(trade)
+                quantity         -= fill_qty
+                resting.quantity -= fill_qty
+                level.qty        -= fill_qty
 
-                aggressor.quantity -= fill_qty
-                resting.quantity   -= fill_qty
+                if side is _BID:
+                    self._ask_qty -= fill_qty
+                else:
+                    self._bid_qty -= fill_qty
 
                 if resting.quantity == 0:
-                    queue.popleft()
+                    level.popleft()
                     self._order_index.pop(resting.order_id, None)
-                    if aggressor.side == Side.BID:
+                    if side is _BID:
                         self._order_count_ask -= 1
                     else:
                         self._order_count_bid -= 1
 
-            if not queue:
+                if feed:
+                    self._emit_fill(aggressor_id, resting, level,
+                                    fill_price, fill_qty, ts)
+
+            if not level:
                 del opp_book[best_price]
 
-        return trades
+        return quantity
+
+    def _emit_fill(self, aggressor_id: int, resting: Order, level: PriceLevel,
+                   fill_price: float, fill_qty: int, ts):
+        self._emit((TRADE, aggressor_id, resting.order_id, fill_price, fill_qty, ts))
+        if resting.quantity:
+            self._emit((ORDER_UPDATE, resting.order_id, resting.side,
+                        fill_price, resting.quantity))
+        else:
+            self._emit((ORDER_REMOVE, resting.order_id, resting.side, fill_price))
+        self._emit_level(resting.side, level)
+
+    # ── Tick Conversion ───────────────────────────────────────────────────────
+
+    def _to_ticks(self, price: float) -> int:
+        """API price → integer tick key. Rejects prices off the tick grid."""
+        if not math.isfinite(price):
+            raise ValueError(f"Price {price} is not finite")
+        ticks = round(price / self.tick_size)
+        if abs(ticks * self.tick_size - price) > self._tick_tol:
+            raise ValueError(f"Price {price} is not a multiple of "
+                             f"tick size {self.tick_size}")
+        return ticks
+
+    def _to_price(self, key: float | int) -> float:
+        """Level key → API price (identity in float mode)."""
+        if self.tick_size is None:
+            return key
+        return round(key * self.tick_size, self._price_dp)
 
     # ── Market Data ───────────────────────────────────────────────────────────
 
     def best_bid(self) -> float | None:
-        return self._bids.keys()[-1] if self._bids else None
+        return self._to_price(self._bids.keys()[-1]) if self._bids else None
 
     def best_ask(self) -> float | None:
-        return self._asks.keys()[0] if self._asks else None
+        return self._to_price(self._asks.keys()[0]) if self._asks else None
 
     def spread(self) -> float | None:
-        bb, ba = self.best_bid(), self.best_ask()
-        return round(ba - bb, 6) if (bb and ba) else None
+        if not (self._bids and self._asks):
+            return None
+        bb, ba = self._bids.keys()[-1], self._asks.keys()[0]
+        if self.tick_size is None:
+            return round(ba - bb, 6)
+        return self._to_price(ba - bb)
 
     def mid_price(self) -> float | None:
-        bb, ba = self.best_bid(), self.best_ask()
-        return round((bb + ba) / 2, 6) if (bb and ba) else None
+        if not (self._bids and self._asks):
+            return None
+        bb, ba = self._bids.keys()[-1], self._asks.keys()[0]
+        if self.tick_size is None:
+            return round((bb + ba) / 2, 6)
+        # Half-tick mids need one more decimal than the tick itself
+        return round((bb + ba) * self.tick_size / 2, self._price_dp + 1)
 
     def total_bid_qty(self) -> int:
-        return sum(sum(o.quantity for o in q) for q in self._bids.values())
+        return self._bid_qty
 
     def total_ask_qty(self) -> int:
-        return sum(sum(o.quantity for o in q) for q in self._asks.values())
+        return self._ask_qty
 
     def order_flow_imbalance(self) -> float:
         """
         OFI = (bid_qty - ask_qty) / (bid_qty + ask_qty).
         Range [-1, 1]: +1 = all buying pressure, -1 = all selling pressure.
         """
-        bq = self.total_bid_qty()
-        aq = self.total_ask_qty()
+        bq = self._bid_qty
+        aq = self._ask_qty
         total = bq + aq
         return round((bq - aq) / total, 4) if total > 0 else 0.0
 
     def depth_snapshot(self, levels: int = 5) -> dict:
         """
         Top N price levels per side with aggregated quantities.
+        O(levels): reads the running level totals, no queue walks.
         """
         bids = [
-            {"price": p,
-             "qty":   sum(o.quantity for o in q),
-             "orders": len(q)}
-            for p, q in reversed(self._bids.items())
-        ][:levels]
+            {"price": self._to_price(p),
+             "qty":   q.qty,
+             "orders": q.count}
+            for p, q in islice(reversed(self._bids.items()), levels)
+        ]
 
         asks = [
-            {"price": p,
-             "qty":   sum(o.quantity for o in q),
-             "orders": len(q)}
-            for p, q in self._asks.items()
-        ][:levels]
+            {"price": self._to_price(p),
+             "qty":   q.qty,
+             "orders": q.count}
+            for p, q in islice(self._asks.items(), levels)
+        ]
 
         return {"bids": bids, "asks": asks,
                 "best_bid": self.best_bid(),
@@ -242,53 +958,249 @@ class LimitOrderBook:
                 "spread":   self.spread(),
                 "mid":      self.mid_price()}
 
+    # ── Consistency ───────────────────────────────────────────────────────────
+
+    def check_invariants(self):
+        """
+        Recount every queue from scratch and compare against the running
+        aggregates. Raises AssertionError on the first mismatch.
+        O(resting orders) — for tests and debugging only.
+        """
+        for side, book, total, count in (
+                (Side.BID, self._bids, self._bid_qty, self._order_count_bid),
+                (Side.ASK, self._asks, self._ask_qty, self._order_count_ask)):
+            side_qty = side_orders = 0
+            for key, level in book.items():
+                orders = list(level)
+                qty    = sum(o.quantity for o in orders)
+                if not orders:
+                    raise AssertionError(f"{side.value} level {key} is empty")
+                if level.qty != qty or level.count != len(orders):
+                    raise AssertionError(
+                        f"{side.value} level {key}: running qty/count "
+                        f"{level.qty}/{level.count} != recount {qty}/{len(orders)}")
+                if self._lazy:
+                    dead, node = 0, level.head
+                    while node is not None:
+                        dead += node.quantity == 0
+                        node = node.next
+                    if level.dead != dead or level.head.quantity == 0:
+                        raise AssertionError(
+                            f"{side.value} level {key}: {dead} tombstones, "
+                            f"{level.dead} counted or one at the head")
+                for o in orders:
+                    if o.side is not side or o.price != key or o.quantity <= 0:
+                        raise AssertionError(f"Order {o.order_id} misplaced at "
+                                             f"{side.value} level {key}")
+                    if self._order_index.get(o.order_id) is not o:
+                        raise AssertionError(f"Order {o.order_id} not indexed")
+                side_qty    += qty
+                side_orders += len(orders)
+            if side_qty != total or side_orders != count:
+                raise AssertionError(
+                    f"{side.value} side: running qty/count {total}/{count} "
+                    f"!= recount {side_qty}/{side_orders}")
+        if len(self._order_index) != self._order_count_bid + self._order_count_ask:
+            raise AssertionError("Order index size does not match resting count")
+
+    # ── Persistence ───────────────────────────────────────────────────────────
+
+    RESTING_FIELDS = [("order_id", "<i8"), ("side", "u1"), ("price", "<f8"),
+                      ("quantity", "<i8"), ("timestamp", "<f8")]
+
+    def export_state(self) -> dict:
+        """
+        Book state as arrays, for snapshots:
+          orders  structured array (RESTING_FIELDS) of every resting order in
+                  queue priority — per level FIFO; side 0 = BID, 1 = ASK;
+                  price is the level key (ticks in tick mode)
+          trades  the trade tape's live window (views — copy to keep)
+          stats   session TradeStats accumulators
+        The rolling VWAP window and spread history are not included.
+        """
+        import numpy as np
+        rows = [(o.order_id, code, o.price, o.quantity, o.timestamp)
+                for code, book in ((0, self._bids), (1, self._asks))
+                for level in book.values()
+                for o in level]
+        st = self._stats
+        return {
+            "orders": np.array(rows, dtype=self.RESTING_FIELDS),
+            "trades": self._trades.columns(),
+            "stats":  {"count": st.count, "volume": st.volume,
+                       "notional": st.notional, "min_price": st.min_price,
+                       "max_price": st.max_price},
+        }
+
+    def restore_state(self, orders, trades: dict | None = None,
+                      stats: dict | None = None):
+        """
+        Load export_state() output into this empty book. Orders are re-queued
+        in array order without matching, so the array must come from an
+        uncrossed book with the same tick mode. Subscribers get RESET, then
+        ORDER_ADD per order and LEVEL_ADD per level, then BBO — the sequence
+        that rebuilds any feed view from scratch.
+        """
+        if self._order_index or len(self._trades) or self._stats.count:
+            raise ValueError("restore_state needs an empty book")
+        ticked = self.tick_size is not None
+        index  = self._order_index
+        for oid, code, key, qty, ts in zip(orders["order_id"].tolist(),
+                                           orders["side"].tolist(),
+                                           orders["price"].tolist(),
+                                           orders["quantity"].tolist(),
+                                           orders["timestamp"].tolist()):
+            if ticked:
+                key = int(key)
+            side  = _BID if code == 0 else _ASK
+            book  = self._bids if code == 0 else self._asks
+            level = book.get(key)
+            if level is None:
+                level = book[key] = self._level_cls(key)
+            order = Order(oid, side, key, qty, ts)
+            level.append(order)
+            index[oid] = order
+        self._order_count_bid = sum(lv.count for lv in self._bids.values())
+        self._order_count_ask = sum(lv.count for lv in self._asks.values())
+        self._bid_qty = sum(lv.qty for lv in self._bids.values())
+        self._ask_qty = sum(lv.qty for lv in self._asks.values())
+
+        if trades is not None and len(next(iter(trades.values()), ())):
+            self._trades.extend(trades)
+        if stats is not None:
+            st = self._stats
+            st.count, st.volume, st.notional = (stats["count"], stats["volume"],
+                                                stats["notional"])
+            st.min_price, st.max_price = stats["min_price"], stats["max_price"]
+        if self._listeners:
+            self._emit((RESET,))
+            for side, book in ((_BID, self._bids), (_ASK, self._asks)):
+                for key, level in book.items():
+                    px = self._to_price(key)
+                    for order in level:
+                        self._emit((ORDER_ADD, order.order_id, side, px, order.quantity))
+                    self._emit((LEVEL_ADD, side, px, level.qty, level.count))
+        self._check_bbo()
+        if self._check:
+            self.check_invariants()
+        if self._publisher is not None:
+            self._publisher.on_mutation()
+
+    # ── Read Snapshots ────────────────────────────────────────────────────────
+
+    def publish_snapshots(self, levels: int = 10, min_interval: float = 0.0,
+                          full_every: int = 0) -> SnapshotPublisher:
+        """
+        Start publishing an immutable BookSnapshot of the top `levels` per
+        side after every mutation; readers take publisher.latest without
+        locking. Replaces any previous publisher. See snapshots.py.
+        """
+        self._publisher = SnapshotPublisher(self, levels, min_interval, full_every)
+        return self._publisher
+
+    def stop_publishing(self):
+        self._publisher = None
+
+    # ── Instrumentation ───────────────────────────────────────────────────────
+
+    def instrument(self, ops=INSTRUMENTED_OPS, match: bool = True) -> BookInstruments:
+        """
+        Start recording per-call latency of `ops` (and of _match, with fills
+        and levels per aggressive order) into fresh histograms. Replaces any
+        previous instrumentation. See instrument.py.
+        """
+        self.uninstrument()
+        self._instruments = BookInstruments(self, ops, match)
+        self._instruments.attach()
+        return self._instruments
+
+    def uninstrument(self) -> BookInstruments | None:
+        """Stop instrumenting; returns the instruments (with their data)."""
+        ins, self._instruments = self._instruments, None
+        if ins is not None:
+            ins.detach()
+        return ins
+
+    def _top_levels(self, levels: int | None, prices: dict) -> tuple:
+        """
+        (bids, asks, bid_keys, ask_keys): ((price, qty, orders), ...) and
+        the level keys per side, best first; levels=None for all. prices
+        caches level key → API price across calls.
+        """
+        bids, asks = self._bids, self._asks
+        if self.level_store == "sorted":
+            # Key slices are one SortedList call; reversed(items()) indexes
+            bk = bids.keys()[-levels:] if levels is not None else bids.keys()[:]
+            bk.reverse()
+            ak = asks.keys()[:levels]
+        else:
+            bk = list(islice(reversed(bids.keys()), levels))
+            ak = list(islice(asks.keys(), levels))
+        to_price = self._to_price
+        out = []
+        for side, keys in ((bids, bk), (asks, ak)):
+            rows = []
+            for k in keys:
+                level = side[k]
+                px = prices.get(k)
+                if px is None:
+                    px = prices[k] = to_price(k)
+                rows.append((px, level.qty, level.count))
+            out.append(tuple(rows))
+        return out[0], out[1], bk, ak
+
     # ── Analytics ─────────────────────────────────────────────────────────────
 
     def vwap(self) -> float | None:
-        """Volume-Weighted Average Price across all executed trades."""
-        if not self._trades:
-            return None
-        total_vol = sum(t.quantity for t in self._trades)
-        if total_vol == 0:
-            return None
-        return round(
-            sum(t.price * t.quantity for t in self._trades) / total_vol, 4
-        )
+        """Volume-Weighted Average Price across all executed trades. O(1)."""
+        v = self._stats.vwap()
+        return round(v, 4) if v is not None else None
+
+    def window_vwap(self) -> float | None:
+        """VWAP over the configured rolling window (None if not configured)."""
+        v = self._stats.window_vwap()
+        return round(v, 4) if v is not None else None
 
     def trade_summary(self) -> dict:
-        if not self._trades:
+        """Session trade statistics from the running accumulators. O(1)."""
+        st = self._stats
+        if st.count == 0:
             return {"n_trades": 0}
-        prices = [t.price    for t in self._trades]
-        qtys   = [t.quantity for t in self._trades]
-        return {
-            "n_trades":    len(self._trades),
-            "total_volume": sum(qtys),
-            "vwap":         self.vwap(),
-            "min_price":    min(prices),
-            "max_price":    max(prices),
-            "avg_price":    round(sum(p * q for p, q in zip(prices, qtys))
-                                  / sum(qtys), 4),
+        vwap = self.vwap()
+        summary = {
+            "n_trades":    st.count,
+            "total_volume": st.volume,
+            "vwap":         vwap,
+            "min_price":    st.min_price,
+            "max_price":    st.max_price,
+            "avg_price":    vwap,
         }
+        if st.window_seconds is not None or st.window_trades is not None:
+            summary["window"] = st.window_summary()
+        return summary
 
     def spread_history_df(self):
-        """Return spread history as a DataFrame for plotting."""
-        import pandas as pd
-        if not self._spread_history:
-            return pd.DataFrame(columns=["timestamp", "spread"])
-        return pd.DataFrame(self._spread_history,
-                             columns=["timestamp", "spread"])
+        """
+        Spread history as a DataFrame for plotting. Zero-copy views of the
+        recorder: ring mode has timestamp/best_bid/best_ask/spread columns,
+        OHLC mode has timestamp/open/high/low/close/updates.
+        """
+        return self._spread_history.to_df()
 
     def trades_df(self):
-        """All executed trades as a DataFrame."""
+        """
+        Trades on the tape as a DataFrame. Zero-copy: the columns are views
+        of the tape, valid until the next order is submitted — call .copy()
+        to keep them.
+        """
         import pandas as pd
-        if not self._trades:
+        if not len(self._trades):
             return pd.DataFrame()
-        return pd.DataFrame([{
-            "aggressor_id": t.aggressor_id,
-            "resting_id":   t.resting_id,
-            "price":        t.price,
-            "quantity":     t.quantity,
-        } for t in self._trades])
+        return self._trades.to_df()
+
+    def flush_trades(self):
+        """Write trades not yet on disk to trade_spill_dir (no-op without one)."""
+        self._trades.flush()
 
     def reset(self):
         """Clear the book and all analytics."""
@@ -296,6 +1208,14 @@ class LimitOrderBook:
         self._asks.clear()
         self._order_index.clear()
         self._trades.clear()
+        self._stats.reset()
         self._spread_history.clear()
+        self._bbo = (None, None)
         self._order_count_bid = 0
         self._order_count_ask = 0
+        self._bid_qty = 0
+        self._ask_qty = 0
+        if self._listeners:
+            self._emit((RESET,))
+        if self._publisher is not None:
+            self._publisher.on_mutation()
@@ -0,0 +1,99 @@
+"""
+recorder.py — Bounded top-of-book / spread history
+
+SpreadRecorder is fed by LimitOrderBook only when the best bid or best ask
+price changes (not once per submitted order), and stores the history in a
+ColumnarRing so memory is bounded and reads are zero-copy views.
+
+Storage modes:
+  "ring"  one row per BBO change: timestamp, best_bid, best_ask, spread;
+          keeps the most recent `capacity` changes
+  "ohlc"  one row per `interval` of clock time: open/high/low/close of the
+          spread plus the number of BBO changes in the bucket; the open
+          bucket is the last row and is updated in place
+
+The clock is any zero-argument callable (time.time, time.monotonic,
+time.perf_counter, a simulation clock, ...).
+"""
+
+from __future__ import annotations
+import math
+import time
+
+from tape import ColumnarRing
+
+RING_SCHEMA = {
+    "timestamp": "f8",
+    "best_bid":  "f8",
+    "best_ask":  "f8",
+    "spread":    "f8",
+}
+
+OHLC_SCHEMA = {
+    "timestamp": "f8",     # bucket start
+    "open":      "f8",
+    "high":      "f8",
+    "low":       "f8",
+    "close":     "f8",
+    "updates":   "i8",
+}
+
+
+class SpreadRecorder:
+    """
+    mode      "ring" or "ohlc"
+    capacity  rows kept in memory (BBO changes, or buckets in ohlc mode)
+    interval  bucket width in clock units (ohlc mode only)
+    clock     timestamp source
+    """
+
+    def __init__(self, mode: str = "ring", capacity: int = 100_000,
+                 interval: float = 1.0, clock=time.time):
+        if mode not in ("ring", "ohlc"):
+            raise ValueError(f"Unknown recorder mode {mode!r}")
+        if mode == "ohlc" and interval <= 0:
+            raise ValueError("interval must be positive")
+        self.mode     = mode
+        self.interval = interval
+        self.clock    = clock
+        self._ring    = ColumnarRing(RING_SCHEMA if mode == "ring" else OHLC_SCHEMA,
+                                     capacity)
+        self._bucket: float | None = None     # start of the open ohlc bucket
+        self._ohlc:   list | None  = None     # [open, high, low, close, updates]
+
+    def record(self, best_bid: float, best_ask: float, spread: float):
+        """Record a new two-sided top of book."""
+        ts = self.clock()
+        if self.mode == "ring":
+            self._ring.append(ts, best_bid, best_ask, spread)
+            return
+
+        bucket = math.floor(ts / self.interval) * self.interval
+        if bucket != self._bucket:
+            self._bucket = bucket
+            self._ohlc   = [spread, spread, spread, spread, 1]
+            self._ring.append(bucket, *self._ohlc)
+            return
+        o = self._ohlc
+        if spread > o[1]:
+            o[1] = spread
+        if spread < o[2]:
+            o[2] = spread
+        o[3]  = spread
+        o[4] += 1
+        self._ring.update_last(bucket, *o)
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+    def columns(self):
+        """Column views of the recorded history (no copy)."""
+        return self._ring.columns()
+
+    def to_df(self):
+        return self._ring.to_df()
+
+    def clear(self):
+        self._ring.clear()
+        self._bucket = None
+        self._ohlc   = None
@@ -0,0 +1,343 @@
+"""
+replay.py — Historical order-event replay for LimitOrderBook
+
+Streams add / cancel / modify events from a file through a book in fixed
+size chunks (memory stays constant regardless of file length) and reports:
+  - throughput: events/sec wall-clock, and events/sec of pure book time
+  - per-event latency p50 / p99 / p99.9 (LatencyHistogram, constant memory)
+  - optional depth snapshots every N seconds of event time, as JSON lines
+
+File formats (chosen by extension):
+  .csv          header ts,kind,order_id,side,price,qty
+                kind A=add X=cancel M=modify, I=IOC F=FOK T=market order,
+                side BID/ASK (blank on cancel), price blank on a market order;
+                a modify with a blank price / qty keeps the current value
+  anything else packed binary records of EVENT_DTYPE (34 bytes/event)
+
+A synthetic generator is included so the tool runs offline:
+  python replay.py generate events.bin -n 1000000
+  python replay.py run events.bin --snapshot-interval 1 --snapshots snaps.jsonl
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from latency import LatencyHistogram
+from orderbook import LimitOrderBook, OrderType, Side
+
+ADD, CANCEL, MODIFY = 0, 1, 2
+IOC, FOK, MARKET    = 3, 4, 5               # adds that never rest
+_KIND_CODES = {"A": ADD, "X": CANCEL, "M": MODIFY, "I": IOC, "F": FOK, "T": MARKET}
+_KIND_CHARS = np.array(["A", "X", "M", "I", "F", "T"])
+_SIDES      = (Side.BID, Side.ASK)          # side code 0 = BID, 1 = ASK
+_ORDER_TYPES = {IOC: OrderType.IOC, FOK: OrderType.FOK, MARKET: OrderType.MARKET}
+
+EVENT_DTYPE = np.dtype([
+    ("ts",       "<f8"),     # event time, seconds
+    ("kind",     "u1"),      # ADD / CANCEL / MODIFY / IOC / FOK / MARKET
+    ("side",     "u1"),      # 0 = BID, 1 = ASK
+    ("order_id", "<i8"),
+    ("price",    "<f8"),
+    ("qty",      "<i8"),
+])
+
+
+# ── Event files ───────────────────────────────────────────────────────────────
+
+def _is_csv(path: str) -> bool:
+    return path.lower().endswith(".csv")
+
+
+def iter_events(path: str, chunk_rows: int = 65_536):
+    """Yield EVENT_DTYPE record arrays of at most chunk_rows events."""
+    if _is_csv(path):
+        import pandas as pd
+        for df in pd.read_csv(path, chunksize=chunk_rows,
+                              dtype={"side": "string", "kind": "string"}):
+            chunk = np.empty(len(df), dtype=EVENT_DTYPE)
+            chunk["ts"]       = df["ts"].to_numpy()
+            chunk["kind"]     = df["kind"].map(_KIND_CODES).to_numpy()
+            chunk["side"]     = (df["side"] == "ASK").fillna(False).to_numpy()
+            chunk["order_id"] = df["order_id"].to_numpy()
+            chunk["price"]    = df["price"].to_numpy(dtype=np.float64)   # NaN = blank
+            chunk["qty"]      = df["qty"].fillna(0).to_numpy()
+            yield chunk
+        return
+
+    events = np.memmap(path, dtype=EVENT_DTYPE, mode="r")
+    for lo in range(0, len(events), chunk_rows):
+        yield np.array(events[lo:lo + chunk_rows])
+
+
+class EventWriter:
+    """Append EVENT_DTYPE chunks to a CSV or binary event file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._csv = _is_csv(path)
+        self._f   = open(path, "w" if self._csv else "wb")
+        if self._csv:
+            self._f.write("ts,kind,order_id,side,price,qty\n")
+
+    def write(self, chunk: np.ndarray):
+        if not self._csv:
+            chunk.astype(EVENT_DTYPE, copy=False).tofile(self._f)
+            return
+        import pandas as pd
+        is_cancel = chunk["kind"] == CANCEL
+        pd.DataFrame({
+            "ts":       chunk["ts"],
+            "kind":     _KIND_CHARS[chunk["kind"]],
+            "order_id": chunk["order_id"],
+            "side":     np.where(is_cancel, "",
+                                 np.where(chunk["side"] == 0, "BID", "ASK")),
+            "price":    np.where(is_cancel | (chunk["kind"] == MARKET), np.nan,
+                                 chunk["price"]),
+            "qty":      np.where(is_cancel, np.nan, chunk["qty"]),
+        }).to_csv(self._f, header=False, index=False, float_format="%.10g")
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ── Synthetic generator ───────────────────────────────────────────────────────
+
+def generate_events(path: str, n_events: int, seed: int = 0,
+                    chunk_rows: int = 100_000, tick: float = 0.01,
+                    mid: float = 100.0, rate: float = 50_000.0,
+                    cancel_ratio: float = 0.45, modify_ratio: float = 0.10,
+                    aggr_ratio: float = 0.10, cancel_window: int = 2_000):
+    """
+    Write n_events synthetic events: adds around a random-walk mid, cancels
+    and modifies aimed at recently added ids (some will already be filled,
+    as in real flow), and a share of aggressive adds that cross the touch.
+    Timestamps advance with exponential gaps at `rate` events/sec.
+    """
+    rng      = np.random.default_rng(seed)
+    next_id  = 1
+    ts       = 0.0
+    mid_tick = round(mid / tick)
+
+    with EventWriter(path) as out:
+        for lo in range(0, n_events, chunk_rows):
+            n = min(chunk_rows, n_events - lo)
+            chunk = np.zeros(n, dtype=EVENT_DTYPE)
+
+            gaps = rng.exponential(1.0 / rate, n)
+            chunk["ts"] = ts + np.cumsum(gaps)
+            ts = float(chunk["ts"][-1])
+
+            u    = rng.random(n)
+            kind = np.where(u < cancel_ratio, CANCEL,
+                            np.where(u < cancel_ratio + modify_ratio, MODIFY, ADD))
+            chunk["kind"] = kind
+
+            # Adds take fresh ids; cancels/modifies aim at a recent add
+            is_add   = kind == ADD
+            n_added  = np.cumsum(is_add)
+            recent   = next_id + n_added - 1 - rng.integers(0, cancel_window, n)
+            chunk["order_id"] = np.where(is_add, next_id + n_added - 1,
+                                         np.maximum(recent, 1))
+            next_id += int(n_added[-1])
+
+            # Mid random walk (in ticks) and order placement around it
+            walk  = mid_tick + np.cumsum(rng.choice([-1, 0, 0, 1], n))
+            mid_tick = int(walk[-1])
+            side  = rng.integers(0, 2, n)
+            sign  = np.where(side == 0, -1, 1)             # passive side of mid
+            aggr  = is_add & (rng.random(n) < aggr_ratio)
+            off   = np.where(aggr, -rng.integers(1, 4, n), rng.integers(1, 30, n))
+            chunk["side"]  = side
+            chunk["price"] = np.round(np.maximum(walk + sign * off, 1) * tick, 10)
+            chunk["qty"]   = rng.integers(1, 100, n)
+
+            out.write(chunk)
+
+
+# ── Replay ────────────────────────────────────────────────────────────────────
+
+@dataclass
+class ReplayReport:
+    events:    int = 0
+    adds:      int = 0
+    cancels:   int = 0
+    modifies:  int = 0
+    rejected:  int = 0          # invalid adds/modifies (ValueError)
+    missed:    int = 0          # cancels/modifies of ids not resting
+    fills:     int = 0
+    snapshots: int = 0
+    wall_s:    float = 0.0
+    latency:   LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def events_per_sec(self) -> float:
+        return self.events / self.wall_s if self.wall_s else 0.0
+
+    def book_events_per_sec(self) -> float:
+        """Throughput counting only time spent inside the book."""
+        return self.events / (self.latency.total / 1e9) if self.latency.total else 0.0
+
+    def summary(self) -> dict:
+        lat = self.latency.summary(percentiles=(50, 99, 99.9))
+        return {
+            "events":          self.events,
+            "adds":            self.adds,
+            "cancels":         self.cancels,
+            "modifies":        self.modifies,
+            "rejected":        self.rejected,
+            "missed":          self.missed,
+            "fills":           self.fills,
+            "snapshots":       self.snapshots,
+            "wall_s":          round(self.wall_s, 3),
+            "events_per_sec":  round(self.events_per_sec()),
+            "book_events_per_sec": round(self.book_events_per_sec()),
+            "latency_ns":      lat,
+        }
+
+
+def apply_event(book: LimitOrderBook, kind: int, order_id: int, side: Side,
+                price: float, qty: int) -> int:
+    """
+    Apply one event and return the number of fills. Raises ValueError for
+    an invalid add/modify; returns -1 when a cancel/modify targets no
+    resting order. A modify goes through modify_order, so a same-price
+    size reduction keeps queue priority (the side field is ignored); a NaN
+    price or zero qty keeps the current value, as in the journal.
+    """
+    if kind == ADD:
+        return len(book.add_order(order_id, side, price, qty))
+    if kind == CANCEL:
+        return 0 if book.cancel_order(order_id) else -1
+    if kind != MODIFY:
+        return len(book.add_order(order_id, side, None if kind == MARKET else price,
+                                  qty, _ORDER_TYPES[kind]))
+    trades = book.modify_order(order_id, None if price != price else price,
+                               qty or None)
+    return -1 if trades is None else len(trades)
+
+
+def replay(book: LimitOrderBook, path: str, chunk_rows: int = 65_536,
+           snapshot_interval: float | None = None,
+           snapshot_path: str | None = None,
+           snapshot_levels: int = 5) -> ReplayReport:
+    """Replay an event file through `book` and return the report."""
+    report = ReplayReport()
+    hist   = report.latency
+    clock  = time.perf_counter_ns
+    snap_f = (open(snapshot_path, "w")
+              if snapshot_interval is not None and snapshot_path else None)
+    next_snap = None
+
+    t0 = time.perf_counter()
+    try:
+        for chunk in iter_events(path, chunk_rows):
+            ts_col   = chunk["ts"].tolist()
+            kinds    = chunk["kind"].tolist()
+            ids      = chunk["order_id"].tolist()
+            sides    = chunk["side"].tolist()
+            prices   = chunk["price"].tolist()
+            qtys     = chunk["qty"].tolist()
+
+            for i in range(len(kinds)):
+                if snapshot_interval is not None:
+                    ts = ts_col[i]
+                    if next_snap is None:
+                        next_snap = ts + snapshot_interval
+                    elif ts >= next_snap:
+                        if snap_f is not None:
+                            snap = book.depth_snapshot(snapshot_levels)
+                            snap["ts"] = next_snap
+                            snap_f.write(json.dumps(snap) + "\n")
+                        report.snapshots += 1
+                        while next_snap <= ts:
+                            next_snap += snapshot_interval
+
+                kind = kinds[i]
+                t = clock()
+                try:
+                    n = apply_event(book, kind, ids[i], _SIDES[sides[i]],
+                                    prices[i], qtys[i])
+                except ValueError:
+                    n = 0
+                    report.rejected += 1
+                hist.record(clock() - t)
+
+                if n < 0:
+                    report.missed += 1
+                else:
+                    report.fills += n
+                if kind == CANCEL:
+                    report.cancels += 1
+                elif kind == MODIFY:
+                    report.modifies += 1
+                else:
+                    report.adds += 1
+            report.events += len(kinds)
+    finally:
+        if snap_f is not None:
+            snap_f.close()
+
+    report.wall_s = time.perf_counter() - t0
+    return report
+
+
+def print_report(report: ReplayReport):
+    s = report.summary()
+    lat = s.pop("latency_ns")
+    for k, v in s.items():
+        print(f"  {k:<22}{v:>14,}" if isinstance(v, int) else f"  {k:<22}{v:>14}")
+    print(f"  latency ns            p50={lat['p50']:,}  p99={lat['p99']:,}  "
+          f"p99.9={lat['p99.9']:,}  max={lat['max']:,}")
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def main():
+    ap  = argparse.ArgumentParser(description="Replay order events through LimitOrderBook")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    g = sub.add_parser("generate", help="write a synthetic event file")
+    g.add_argument("path")
+    g.add_argument("-n", "--events", type=int, default=1_000_000)
+    g.add_argument("--seed", type=int, default=0)
+    g.add_argument("--tick", type=float, default=0.01)
+
+    r = sub.add_parser("run", help="replay an event file")
+    r.add_argument("path")
+    r.add_argument("--chunk-rows", type=int, default=65_536)
+    r.add_argument("--tick", type=float, default=None,
+                   help="run the book in integer tick mode")
+    r.add_argument("--snapshot-interval", type=float, default=None,
+                   help="seconds of event time between depth snapshots")
+    r.add_argument("--snapshots", default=None, help="JSON-lines snapshot output")
+    r.add_argument("--levels", type=int, default=5)
+    r.add_argument("--clock", choices=["wall", "ns", "seq"], default="wall",
+                   help="book timestamp source for orders and trades")
+
+    args = ap.parse_args()
+    if args.cmd == "generate":
+        generate_events(args.path, args.events, seed=args.seed, tick=args.tick)
+        print(f"Wrote {args.events:,} events → {args.path} "
+              f"({os.path.getsize(args.path) / 2**20:.1f} MiB)")
+        return
+
+    book   = LimitOrderBook("REPLAY", tick_size=args.tick, clock=args.clock)
+    report = replay(book, args.path, args.chunk_rows, args.snapshot_interval,
+                    args.snapshots, args.levels)
+    print(f"Replayed {args.path}")
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
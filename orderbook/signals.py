@@ -0,0 +1,331 @@
+"""
+signals.py — Incremental microstructure signals from the book's feed
+
+SignalStream subscribes to a LimitOrderBook (see feed.py) and updates its
+signals as each touch change or trade happens, instead of recomputing
+them from the book:
+
+  ofi              Cont–Kukanov–Stoikov best-level order flow imbalance.
+                   Each change of the best bid (price pb, size qb) or best
+                   ask (pa, qa) contributes
+                     e = 1{pb' ≥ pb}·qb' − 1{pb' ≤ pb}·qb
+                       − 1{pa' ≤ pa}·qa' + 1{pa' ≥ pa}·qa
+                   (positive = buying pressure). Summed over the session
+                   (ofi_total) and over the rolling window (ofi()).
+  microprice       (pb·qa + pa·qb) / (qb + qa): the mid weighted towards
+                   the side with the thinner queue
+  queue_imbalance  (B − A) / (B + A) over the resting quantity B, A of the
+                   top `levels` levels per side
+  trade_imbalance  signed volume / volume over the rolling window; a fill
+                   at or above the best ask is a buy, otherwise a sell
+
+The rolling window is the last window_events events and/or the last
+window_seconds of `clock` time, as in TradeStats: with both set an event
+leaves as soon as either limit excludes it. OFI increments and trades each
+have their own window.
+
+Reads are O(1) (window ageing is amortised O(1), like TradeStats). Level
+updates inside the top `levels` adjust the queue sums in place; a level
+entering or leaving the top N marks them stale and they are recomputed
+from the book, O(levels), on the next touch change or read.
+
+Every touch change also appends one row to a bounded ColumnarRing
+(HISTORY_SCHEMA), for strategies and the dashboard:
+
+  sig = SignalStream(book, levels=5, window_events=500)
+  ...
+  sig.ofi(), sig.microprice(), sig.queue_imbalance(), sig.trade_imbalance()
+  sig.to_df()            # history, zero-copy
+"""
+
+from __future__ import annotations
+from collections import deque
+import math
+import time
+
+from feed import LEVEL_ADD, LEVEL_UPDATE, LEVEL_REMOVE, TRADE, BBO, RESET
+from tape import ColumnarRing
+
+HISTORY_SCHEMA = {
+    "timestamp":       "f8",
+    "best_bid":        "f8",     # NaN = empty side
+    "best_ask":        "f8",
+    "bid_size":        "i8",
+    "ask_size":        "i8",
+    "ofi":             "f8",     # this row's increment
+    "ofi_total":       "f8",
+    "microprice":      "f8",
+    "queue_imbalance": "f8",
+    "trade_imbalance": "f8",
+}
+
+_INF = math.inf
+
+
+class _RollingSum:
+    """Σ value and Σ weight over the last `events` entries / `seconds` of time."""
+
+    __slots__ = ("events", "seconds", "_items", "_bounded", "count", "value",
+                 "weight")
+
+    def __init__(self, events: int | None, seconds: float | None):
+        self.events   = events
+        self.seconds  = seconds
+        self._items   = deque()        # (ts, value, weight)
+        self._bounded = events is not None or seconds is not None
+        self.count    = 0              # entries in the window
+        self.value    = 0.0
+        self.weight   = 0.0
+
+    def add(self, ts: float, value: float, weight: float):
+        self.count  += 1
+        self.value  += value
+        self.weight += weight
+        if self._bounded:              # unbounded: session sums only
+            self._items.append((ts, value, weight))
+            self.evict(ts)
+
+    def evict(self, now: float):
+        items = self._items
+        if self.events is not None:
+            while len(items) > self.events:
+                self._drop()
+        if self.seconds is not None:
+            cutoff = now - self.seconds
+            while items and items[0][0] <= cutoff:
+                self._drop()
+
+    def _drop(self):
+        _, value, weight = self._items.popleft()
+        self.count  -= 1
+        self.value  -= value
+        self.weight -= weight
+        if not self._items:
+            # Re-anchor so float drift from add/subtract cannot accumulate
+            self.value = self.weight = 0.0
+
+    def clear(self):
+        self._items.clear()
+        self.count = 0
+        self.value = self.weight = 0.0
+
+
+class SignalStream:
+    """
+    Feed subscriber computing OFI / microprice / imbalance signals.
+
+    book            the LimitOrderBook to attach to (subscribes at once;
+                    close() detaches)
+    levels          depth of the top-N queue imbalance
+    window_events   rolling window length in events (None = unbounded)
+    window_seconds  rolling window length in clock units (None = unbounded)
+    capacity        history rows kept in memory
+    clock           timestamp source for the windows and the history
+    """
+
+    def __init__(self, book, levels: int = 5, window_events: int | None = 1_000,
+                 window_seconds: float | None = None, capacity: int = 100_000,
+                 clock=time.time):
+        if levels <= 0:
+            raise ValueError("levels must be positive")
+        if window_events is not None and window_events <= 0:
+            raise ValueError("window_events must be positive")
+        if window_seconds is not None and window_seconds <= 0:
+            raise ValueError("window_seconds must be positive")
+        self.levels         = levels
+        self.window_events  = window_events
+        self.window_seconds = window_seconds
+        self.clock          = clock
+        self._book          = book
+        self._prices: dict  = {}       # level key → API price, for _top_levels
+        self._ofi           = _RollingSum(window_events, window_seconds)
+        self._trades        = _RollingSum(window_events, window_seconds)
+        self._ring          = ColumnarRing(HISTORY_SCHEMA, capacity)
+        self._reset_state()
+        from orderbook import Side      # deferred: orderbook imports feed
+        self._bid = Side.BID
+        book.subscribe(self)
+        if book._bbo != (None, None):  # attach to a live book: no OFI for it
+            self._pb, self._qb, self._pa, self._qa = self._read_touch()
+            self._refresh_top()
+
+    def _reset_state(self):
+        self.events     = 0
+        self.ofi_total  = 0.0
+        # Best level per side; an empty side is price ∓inf with size 0
+        self._pb, self._qb = -_INF, 0
+        self._pa, self._qa = _INF, 0
+        # Top-N queues: API price → qty, their sums, and whether a level
+        # entered or left them since they were last read from the book
+        self._top_bids: dict = {}
+        self._top_asks: dict = {}
+        self._sum_b = self._sum_a = 0
+        self._stale = False
+
+    def close(self):
+        """Stop following the book."""
+        self._book.unsubscribe(self)
+
+    # ── Feed ──────────────────────────────────────────────────────────────────
+
+    def __call__(self, event: tuple):
+        self.events += 1
+        kind = event[0]
+        if kind == LEVEL_UPDATE or kind == LEVEL_ADD or kind == LEVEL_REMOVE:
+            self._on_level(kind, event)
+        elif kind == TRADE:
+            _, _, _, price, qty, _ = event
+            self._trades.add(self.clock(), qty if price >= self._pa else -qty, qty)
+        elif kind == BBO:
+            self._on_bbo()
+        elif kind == RESET:
+            self._ofi.clear()
+            self._trades.clear()
+            self._ring.clear()
+            self._reset_state()
+
+    def _on_level(self, kind: str, event: tuple):
+        side, price = event[1], event[2]
+        qty = event[3] if kind != LEVEL_REMOVE else 0
+        if side is self._bid:
+            top = self._top_bids
+            if price in top:
+                if kind == LEVEL_REMOVE:
+                    # The book still holds the emptied level: re-read later
+                    self._stale = True
+                else:
+                    self._sum_b += qty - top[price]
+                    top[price] = qty
+            elif kind == LEVEL_ADD and (len(top) < self.levels or price > min(top)):
+                self._stale = True
+            if price == self._pb:
+                self._touch(qty - self._qb, 0)
+                self._qb = qty
+        else:
+            top = self._top_asks
+            if price in top:
+                if kind == LEVEL_REMOVE:
+                    self._stale = True
+                else:
+                    self._sum_a += qty - top[price]
+                    top[price] = qty
+            elif kind == LEVEL_ADD and (len(top) < self.levels or price < max(top)):
+                self._stale = True
+            if price == self._pa:
+                self._touch(0, qty - self._qa)
+                self._qa = qty
+
+    def _touch(self, d_bid: int, d_ask: int):
+        """Best-level queue changed at an unchanged price."""
+        e = d_bid - d_ask
+        if not e:
+            return
+        if d_bid and self._qb + d_bid == 0 or d_ask and self._qa + d_ask == 0:
+            # The touch level emptied: a BBO event follows and records the row
+            self._add_ofi(e, record=False)
+        else:
+            self._add_ofi(e)
+
+    def _read_touch(self) -> tuple:
+        book   = self._book
+        bk, ak = book._bbo
+        return (book._to_price(bk) if bk is not None else -_INF,
+                book._bids[bk].qty if bk is not None else 0,
+                book._to_price(ak) if ak is not None else _INF,
+                book._asks[ak].qty if ak is not None else 0)
+
+    def _on_bbo(self):
+        """Touch moved; the book is consistent here, so read the new best levels."""
+        pb, qb, pa, qa = self._read_touch()
+        e = ((qb if pb >= self._pb else 0) - (self._qb if pb <= self._pb else 0)
+             - (qa if pa <= self._pa else 0) + (self._qa if pa >= self._pa else 0))
+        self._pb, self._qb, self._pa, self._qa = pb, qb, pa, qa
+        self._stale = True
+        self._add_ofi(e)
+
+    def _add_ofi(self, e: int, record: bool = True):
+        self.ofi_total += e
+        now = self.clock()
+        if e:
+            self._ofi.add(now, e, abs(e))
+        if record:
+            self._ring.append(now,
+                              self._pb if self._qb else math.nan,
+                              self._pa if self._qa else math.nan,
+                              self._qb, self._qa, e, self.ofi_total,
+                              _nan(self.microprice()), self.queue_imbalance(),
+                              self._trade_imbalance(now))
+
+    def _refresh_top(self):
+        bids, asks, _, _ = self._book._top_levels(self.levels, self._prices)
+        self._top_bids = {p: q for p, q, _ in bids}
+        self._top_asks = {p: q for p, q, _ in asks}
+        self._sum_b    = sum(self._top_bids.values())
+        self._sum_a    = sum(self._top_asks.values())
+        self._stale    = False
+        if len(self._prices) > 65_536:                 # bound the cache
+            self._prices.clear()
+
+    # ── Reads ─────────────────────────────────────────────────────────────────
+
+    def ofi(self) -> float:
+        """Σ OFI increments over the rolling window (session if unbounded)."""
+        self._ofi.evict(self.clock())
+        return self._ofi.value
+
+    def normalized_ofi(self) -> float:
+        """Window OFI / Σ|increments| in the window, in [-1, 1]."""
+        self._ofi.evict(self.clock())
+        w = self._ofi
+        return w.value / w.weight if w.weight else 0.0
+
+    def microprice(self) -> float | None:
+        """Size-weighted mid of the best levels (None if a side is empty)."""
+        qb, qa = self._qb, self._qa
+        if not (qb and qa):
+            return None
+        return (self._pb * qa + self._pa * qb) / (qb + qa)
+
+    def queue_imbalance(self) -> float:
+        """(B − A) / (B + A) over the top `levels` levels, in [-1, 1]."""
+        if self._stale:
+            self._refresh_top()
+        total = self._sum_b + self._sum_a
+        return (self._sum_b - self._sum_a) / total if total else 0.0
+
+    def trade_imbalance(self) -> float:
+        """Signed / total traded volume over the rolling window, in [-1, 1]."""
+        return self._trade_imbalance(self.clock())
+
+    def _trade_imbalance(self, now: float) -> float:
+        w = self._trades
+        w.evict(now)
+        return w.value / w.weight if w.weight else 0.0
+
+    def snapshot(self) -> dict:
+        """All current signal values."""
+        return {
+            "ofi":             self.ofi(),
+            "normalized_ofi":  self.normalized_ofi(),
+            "ofi_total":       self.ofi_total,
+            "microprice":      self.microprice(),
+            "queue_imbalance": self.queue_imbalance(),
+            "trade_imbalance": self.trade_imbalance(),
+            "window_trades":   self._trades.count,
+        }
+
+    # ── History ───────────────────────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+    def columns(self):
+        """Column views of the signal history (no copy)."""
+        return self._ring.columns()
+
+    def to_df(self):
+        return self._ring.to_df()
+
+
+def _nan(x: float | None) -> float:
+    return math.nan if x is None else x
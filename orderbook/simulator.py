@@ -0,0 +1,490 @@
+"""
+simulator.py — Agent-based order-flow simulator for LimitOrderBook
+
+A population of agents submits orders to one book. Order flow is drawn
+in NumPy blocks of `block_seconds` of simulated time: each agent draws its
+Poisson arrivals for the block and all of their sides, prices, sizes and
+lifetimes at once, conditioned on the book state (best bid / ask, mid) at
+the start of the block. Every order schedules its own cancel at arrival +
+lifetime, i.e. resting orders — including the unfilled part of a
+marketable order — cancel at a constant per-order rate, so depth settles
+instead of growing. The merged,
+time-sorted block (new orders plus the cancels falling due) is then
+applied to the book — runs of adds through add_orders, cancels one by one
+— and the book state is sampled for the next block and for statistics.
+
+Agents (all rates are events per simulated second):
+  ZeroIntelligence  random side, limit price uniform within ±width ticks
+                    of the mid (so some cross), exponential lifetimes
+  PoissonFlow       Cont–Stoikov–Talreja style: limit orders at a
+                    geometric distance from the touch and marketable
+                    orders that sweep `sweep` ticks through the touch, each
+                    a Poisson stream; both cancel at a per-order rate
+                    (exponential lifetime) if they are still resting
+  Trend             momentum (kind="momentum") or mean-reversion
+                    (kind="mean_reversion") trader: follows or fades the
+                    mid's deviation from its EMA with marketable orders,
+                    more often the larger the deviation
+
+Order ids encode the agent: id = seq * n_agents + agent index, so fills
+(aggressor / resting ids) are attributed to agents without a lookup.
+A scheduled cancel whose order has already traded misses, as in real flow.
+Marketable orders are limit orders priced through the touch.
+
+Simulation steps one seed block by block; run_simulation() runs it to
+n_events, run_many() runs independent seeds in parallel processes, and
+aggregate() summarises spread, OFI, mid volatility and fill statistics
+across runs (mean, std, min, max per metric).
+
+  python simulator.py run -n 1000000 --seeds 8 --processes 4
+  python simulator.py run -n 200000 --events-out sim.bin   # replayable
+"""
+
+from __future__ import annotations
+import argparse
+import multiprocessing as mp
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from orderbook import LimitOrderBook
+from replay import ADD, CANCEL, EVENT_DTYPE, EventWriter
+
+
+# ── Agents ────────────────────────────────────────────────────────────────────
+#
+# block(rng, n, state) returns n orders as columns
+#   side    0 = BID, 1 = ASK
+#   price   limit price in ticks
+#   qty     size
+#   life    simulated seconds until the order's cancel (inf = never)
+# state: bid / ask ticks (the mid ± 1 when a side is empty), mid ticks and
+# the block length dt.
+
+@dataclass
+class ZeroIntelligence:
+    name:        str   = "zi"
+    rate:        float = 20_000.0
+    width:       int   = 10            # ticks either side of the mid
+    max_qty:     int   = 100
+    lifetime:    float = 0.2           # mean seconds before cancel
+
+    def block(self, rng, n: int, state: dict) -> tuple:
+        side   = rng.integers(0, 2, n)
+        price  = np.rint(state["mid"]).astype(np.int64) + rng.integers(-self.width,
+                                                                       self.width + 1, n)
+        qty    = rng.integers(1, self.max_qty + 1, n)
+        return side, price, qty, rng.exponential(self.lifetime, n)
+
+
+@dataclass
+class PoissonFlow:
+    name:        str   = "poisson"
+    limit_rate:  float = 30_000.0
+    market_rate: float = 3_000.0
+    depth_p:     float = 0.2           # geometric placement: mean 1/p ticks back
+    sweep:       int   = 3             # marketable orders cross this far
+    max_qty:     int   = 100
+    lifetime:    float = 0.5           # mean seconds a limit order rests
+
+    @property
+    def rate(self) -> float:
+        return self.limit_rate + self.market_rate
+
+    def block(self, rng, n: int, state: dict) -> tuple:
+        bid, ask = state["bid"], state["ask"]
+        market = rng.random(n) * self.rate >= self.limit_rate
+        side   = rng.integers(0, 2, n)
+        # d = 0 improves the touch by one tick (capped inside the spread)
+        d      = rng.geometric(self.depth_p, n) - 1
+        passive = np.where(side == 0, np.minimum(bid + 1 - d, ask - 1),
+                           np.maximum(ask - 1 + d, bid + 1))
+        through = np.where(side == 0, ask + self.sweep, bid - self.sweep)
+        price  = np.where(market, through, passive)
+        qty    = rng.integers(1, self.max_qty + 1, n)
+        return side, price, qty, rng.exponential(self.lifetime, n)
+
+
+@dataclass
+class Trend:
+    name:      str   = "momentum"
+    kind:      str   = "momentum"      # or "mean_reversion"
+    rate:      float = 2_000.0         # arrivals; acting ones are thinned
+    halflife:  float = 0.5             # EMA half-life, simulated seconds
+    scale:     float = 5.0             # |mid - ema| in ticks for full activity
+    slip:      int   = 2               # ticks through the touch
+    max_qty:   int   = 50
+    lifetime:  float = 0.5             # mean seconds an unfilled remainder rests
+    _ema:      float | None = field(default=None, repr=False)
+
+    def __post_init__(self):
+        if self.kind not in ("momentum", "mean_reversion"):
+            raise ValueError(f"Unknown trend kind {self.kind!r}")
+
+    def block(self, rng, n: int, state: dict) -> tuple:
+        mid = state["mid"]
+        if self._ema is None:
+            self._ema = mid
+        alpha = 1.0 - 0.5 ** (state["dt"] / self.halflife)
+        self._ema += alpha * (mid - self._ema)
+        dev = mid - self._ema
+        act = rng.random(n) < min(1.0, abs(dev) / self.scale)
+        m   = int(act.sum())
+        buy = (dev > 0) == (self.kind == "momentum")
+        side  = np.full(m, 0 if buy else 1)
+        price = np.full(m, state["ask"] + self.slip if buy else state["bid"] - self.slip,
+                        dtype=np.int64)
+        return (side, price, rng.integers(1, self.max_qty + 1, m),
+                rng.exponential(self.lifetime, m))
+
+
+def default_agents() -> list:
+    return [PoissonFlow(), ZeroIntelligence(),
+            Trend("momentum", "momentum"), Trend("meanrev", "mean_reversion")]
+
+
+# ── Simulation ────────────────────────────────────────────────────────────────
+
+@dataclass
+class SimConfig:
+    n_events:      int   = 1_000_000
+    agents:        list  = field(default_factory=default_agents)
+    tick:          float = 0.01
+    mid:           float = 100.0
+    block_seconds: float = 0.01        # agents see the book once per block
+    book_kwargs:   dict  = field(default_factory=dict)
+    keep_samples:  bool  = False       # return per-block sample arrays
+
+
+class _CancelSchedule:
+    """Cancels scheduled for future blocks, as parallel (due time, id) arrays."""
+
+    def __init__(self):
+        self.due = np.empty(0)
+        self.ids = np.empty(0, np.int64)
+
+    def push(self, due: np.ndarray, ids: np.ndarray):
+        keep = np.isfinite(due)
+        self.due = np.concatenate((self.due, due[keep]))
+        self.ids = np.concatenate((self.ids, ids[keep]))
+
+    def pop_before(self, t: float) -> tuple:
+        hit = self.due < t
+        out = self.due[hit], self.ids[hit]
+        self.due, self.ids = self.due[~hit], self.ids[~hit]
+        return out
+
+    def drop(self, ids: np.ndarray):
+        """Forget the cancels of orders that were never submitted."""
+        keep = ~np.isin(self.ids, ids)
+        self.due, self.ids = self.due[keep], self.ids[keep]
+
+
+def _block_events(agents: list, rng, t0: float, dt: float, state: dict,
+                  added: np.ndarray, pending: _CancelSchedule) -> dict:
+    """Draw one block from every agent, add the cancels falling due, merge in time order."""
+    n_agents = len(agents)
+    cols = {k: [] for k in ("ts", "side", "price", "qty", "order_id", "kind")}
+    for a, agent in enumerate(agents):
+        n = int(rng.poisson(agent.rate * dt))
+        if not n:
+            continue
+        side, price, qty, life = agent.block(rng, n, state)
+        n = len(side)
+        if not n:
+            continue
+        ts  = t0 + rng.random(n) * dt
+        ids = (added[a] + np.arange(1, n + 1)) * n_agents + a
+        added[a] += n
+        pending.push(ts + life, ids)
+        cols["ts"].append(ts)
+        cols["side"].append(side)
+        cols["price"].append(price)
+        cols["qty"].append(qty)
+        cols["order_id"].append(ids)
+        cols["kind"].append(np.full(n, ADD, np.uint8))
+    due, ids = pending.pop_before(t0 + dt)
+    if len(ids):
+        cols["ts"].append(due)
+        cols["side"].append(np.zeros(len(ids), np.int64))
+        cols["price"].append(np.zeros(len(ids), np.int64))
+        cols["qty"].append(np.zeros(len(ids), np.int64))
+        cols["order_id"].append(ids)
+        cols["kind"].append(np.full(len(ids), CANCEL, np.uint8))
+    if not cols["ts"]:
+        return {}
+    merged = {k: np.concatenate(v) for k, v in cols.items()}
+    order  = np.argsort(merged["ts"], kind="stable")
+    return {k: v[order] for k, v in merged.items()}
+
+
+class Simulation:
+    """
+    Step-wise driver for one seed: each step() draws one block from the
+    agents and applies it to self.book. run_simulation() runs it to
+    n_events; live.py runs it in a background thread for the dashboard.
+    Counters per agent are NumPy arrays indexed like config.agents.
+    """
+
+    def __init__(self, config: SimConfig, seed: int = 0,
+                 book: LimitOrderBook | None = None):
+        self.config   = config
+        self.rng      = np.random.default_rng(seed)
+        self.agents   = [type(a)(**{k: v for k, v in vars(a).items()
+                                    if not k.startswith("_")})
+                         for a in config.agents]     # fresh agent state per run
+        n_agents      = len(self.agents)
+        self.tick     = config.tick
+        self._dp      = max(0, -int(np.floor(np.log10(self.tick) + 1e-9)))
+        self.book     = book if book is not None else LimitOrderBook(
+            "SIM", tick_size=self.tick,
+            **{"trade_capacity": 100_000, **config.book_kwargs})
+        self.t        = 0.0
+        self.events   = 0
+        self.missed   = 0
+        self.rejected = 0
+        self.added_volume = 0
+        self.orders   = np.zeros(n_agents, np.int64)    # adds per agent
+        self.cancels  = np.zeros(n_agents, np.int64)
+        self.aggr_fills  = np.zeros(n_agents, np.int64)
+        self.aggr_volume = np.zeros(n_agents, np.int64)  # filled as aggressor
+        self.passive_volume = np.zeros(n_agents, np.int64)  # filled as resting
+        self._added   = np.zeros(n_agents, np.int64)
+        self._pending = _CancelSchedule()
+        self._mid     = config.mid / self.tick
+
+    def _state(self) -> dict:
+        book, tick = self.book, self.tick
+        bb, ba = book.best_bid(), book.best_ask()
+        bid = round(bb / tick) if bb is not None else None
+        ask = round(ba / tick) if ba is not None else None
+        if bid is not None and ask is not None:
+            self._mid = (bid + ask) / 2
+        return {"bid": bid if bid is not None else int(np.floor(self._mid)) - 1,
+                "ask": ask if ask is not None else int(np.ceil(self._mid)) + 1,
+                "mid": self._mid, "dt": self.config.block_seconds, "t": self.t}
+
+    def step(self, max_events: int | None = None) -> dict | None:
+        """
+        Simulate one block. Returns None if no event fell in it, else the
+        applied events (columns of _block_events plus "api_price") and the
+        block's fills as {"price", "quantity"} arrays.
+        """
+        dt, n_agents = self.config.block_seconds, len(self.agents)
+        ev = _block_events(self.agents, self.rng, self.t, dt, self._state(),
+                           self._added, self._pending)
+        self.t += dt
+        if not ev:
+            return None
+        if max_events is not None and len(ev["ts"]) > max_events:
+            # Trim the last block: the cut cancels go back on the schedule,
+            # then the cancels of the cut adds (which never happen) are dropped
+            cut = ev["kind"][max_events:] == ADD
+            self._pending.push(ev["ts"][max_events:][~cut],
+                               ev["order_id"][max_events:][~cut])
+            self._pending.drop(ev["order_id"][max_events:][cut])
+            ev = {k: v[:max_events] for k, v in ev.items()}
+        ev["price"] = np.maximum(ev["price"], 1)      # far-through sweeps stay positive
+        is_add = ev["kind"] == ADD
+
+        # Apply: runs of adds in one add_orders call, cancels one by one
+        book   = self.book
+        cancel = book.cancel_order
+        ids    = ev["order_id"].tolist()
+        sides  = ev["side"].tolist()
+        prices = np.round(ev["price"] * self.tick, self._dp)
+        pxs    = prices.tolist()
+        qtys   = ev["qty"].tolist()
+        fill_px, fill_qty = [], []
+        bounds = np.flatnonzero(np.diff(is_add.view(np.int8))) + 1
+        lo = 0
+        for hi in [*bounds.tolist(), len(ids)]:
+            if is_add[lo]:
+                fills = book.add_orders(ids[lo:hi], sides[lo:hi], pxs[lo:hi],
+                                        qtys[lo:hi], skip_invalid=True)
+                self.rejected += len(fills["rejected"])
+                if len(fills["quantity"]):
+                    q, agg = fills["quantity"], fills["aggressor_id"] % n_agents
+                    self.aggr_volume    += np.bincount(agg, q, n_agents).astype(np.int64)
+                    self.passive_volume += np.bincount(fills["resting_id"] % n_agents,
+                                                       q, n_agents).astype(np.int64)
+                    self.aggr_fills     += np.bincount(agg, minlength=n_agents)
+                    fill_px.append(fills["price"])
+                    fill_qty.append(q)
+            else:
+                for oid in ids[lo:hi]:
+                    if not cancel(oid):
+                        self.missed += 1
+            lo = hi
+
+        agent = ev["order_id"] % n_agents
+        self.orders  += np.bincount(agent[is_add],  minlength=n_agents)
+        self.cancels += np.bincount(agent[~is_add], minlength=n_agents)
+        self.added_volume += int(ev["qty"][is_add].sum())
+        self.events  += len(ids)
+        ev["api_price"] = np.where(is_add, prices, 0.0)
+        return {"events": ev,
+                "fills": {"price": np.concatenate(fill_px) if fill_px else np.empty(0),
+                          "quantity": (np.concatenate(fill_qty) if fill_qty
+                                       else np.empty(0, np.int64))}}
+
+
+def run_simulation(config: SimConfig, seed: int = 0,
+                   events_out: str | None = None) -> dict:
+    """Run one seed; returns the per-run statistics (see _summarise)."""
+    sim     = Simulation(config, seed)
+    book    = sim.book
+    writer  = EventWriter(events_out) if events_out else None
+    samples = {"spread": [], "mid": [], "ofi": [], "depth": []}
+
+    t_start = time.perf_counter()
+    while sim.events < config.n_events:
+        block = sim.step(config.n_events - sim.events)
+        if block is None:
+            continue
+
+        sp = book.spread()
+        if sp is not None:
+            samples["spread"].append(sp)
+            samples["mid"].append(book.mid_price())
+        samples["ofi"].append(book.order_flow_imbalance())
+        samples["depth"].append(book.total_bid_qty() + book.total_ask_qty())
+
+        if writer is not None:
+            ev    = block["events"]
+            chunk = np.zeros(len(ev["ts"]), EVENT_DTYPE)
+            chunk["ts"], chunk["kind"], chunk["side"] = ev["ts"], ev["kind"], ev["side"]
+            chunk["order_id"], chunk["qty"] = ev["order_id"], ev["qty"]
+            chunk["price"] = ev["api_price"]
+            writer.write(chunk)
+
+    wall = time.perf_counter() - t_start
+    if writer is not None:
+        writer.close()
+    counters = {"events": sim.events, "sim_seconds": round(sim.t, 3),
+                "wall_s": round(wall, 3), "missed": sim.missed,
+                "rejected": sim.rejected, "added_volume": sim.added_volume,
+                "orders": sim.orders, "cancels": sim.cancels,
+                "aggr_fills": sim.aggr_fills, "aggr_volume": sim.aggr_volume,
+                "passive_volume": sim.passive_volume}
+    return _summarise(book, seed, [a.name for a in sim.agents], counters,
+                      {k: np.asarray(v, dtype=np.float64) for k, v in samples.items()},
+                      config.keep_samples)
+
+
+def _summarise(book: LimitOrderBook, seed: int, names: list[str], c: dict,
+               samples: dict, keep: bool) -> dict:
+    spread, mid, ofi = samples["spread"], samples["mid"], samples["ofi"]
+    ret = np.diff(mid) / book.tick_size if len(mid) > 1 else np.zeros(1)
+    ts  = book.trade_summary()
+    out = {
+        "seed":           seed,
+        "events":         c["events"],
+        "events_per_sec": round(c["events"] / c["wall_s"]) if c["wall_s"] else 0,
+        "sim_seconds":    c["sim_seconds"],
+        "missed_cancels": c["missed"],
+        "rejected":       c["rejected"],
+        "n_trades":       ts.get("n_trades", 0),
+        "volume":         ts.get("total_volume", 0),
+        "vwap":           ts.get("vwap"),
+        "fill_ratio":     round(ts.get("total_volume", 0) / c["added_volume"], 4)
+                          if c["added_volume"] else 0.0,
+        "spread_mean":    float(spread.mean()) if len(spread) else None,
+        "spread_median":  float(np.median(spread)) if len(spread) else None,
+        "spread_p95":     float(np.percentile(spread, 95)) if len(spread) else None,
+        "ofi_mean":       float(ofi.mean()) if len(ofi) else None,
+        "ofi_std":        float(ofi.std()) if len(ofi) else None,
+        "ofi_autocorr":   (float(np.corrcoef(ofi[:-1], ofi[1:])[0, 1])
+                           if len(ofi) > 2 and ofi.std() > 0 else None),
+        "mid_vol_ticks":  float(ret.std()),        # per block
+        "mid_drift_ticks": round(float(ret.sum()), 6),
+        "depth_mean":     float(samples["depth"].mean()) if len(samples["depth"]) else 0.0,
+        "agents": {name: {"orders": int(c["orders"][i]),
+                          "cancels": int(c["cancels"][i]),
+                          "aggr_fills": int(c["aggr_fills"][i]),
+                          "aggr_volume": int(c["aggr_volume"][i]),
+                          "passive_volume": int(c["passive_volume"][i])}
+                   for i, name in enumerate(names)},
+    }
+    if keep:
+        out["samples"] = samples
+    return out
+
+
+# ── Parallel runs ─────────────────────────────────────────────────────────────
+
+def _run_seed(args: tuple) -> dict:
+    config, seed = args
+    return run_simulation(config, seed)
+
+
+def run_many(config: SimConfig, seeds, processes: int | None = None) -> list[dict]:
+    """Run one simulation per seed; processes=1 runs them in this process."""
+    seeds = list(seeds)
+    if processes == 1 or len(seeds) == 1:
+        return [run_simulation(config, s) for s in seeds]
+    with mp.Pool(processes or min(len(seeds), mp.cpu_count())) as pool:
+        return pool.map(_run_seed, [(config, s) for s in seeds])
+
+
+def aggregate(results: list[dict]) -> dict:
+    """mean / std / min / max across runs of every numeric per-run metric."""
+    out = {}
+    for key, v in results[0].items():
+        if key == "seed" or not isinstance(v, (int, float)) and v is not None:
+            continue
+        vals = np.array([r[key] for r in results if r[key] is not None], dtype=np.float64)
+        if len(vals):
+            out[key] = {"mean": float(vals.mean()), "std": float(vals.std()),
+                        "min": float(vals.min()), "max": float(vals.max())}
+    agents = {}
+    for name in results[0]["agents"]:
+        agents[name] = {m: float(np.mean([r["agents"][name][m] for r in results]))
+                        for m in results[0]["agents"][name]}
+    out["agents_mean"] = agents
+    return out
+
+
+def print_aggregate(agg: dict, n_runs: int):
+    print(f"{'metric':<18}{'mean':>14}{'std':>12}{'min':>12}{'max':>12}   ({n_runs} runs)")
+    for key, s in agg.items():
+        if key == "agents_mean":
+            continue
+        print(f"{key:<18}{s['mean']:>14,.4g}{s['std']:>12,.4g}{s['min']:>12,.4g}{s['max']:>12,.4g}")
+    print(f"\n{'agent (mean/run)':<18}" + "".join(
+        f"{m:>16}" for m in next(iter(agg["agents_mean"].values()))))
+    for name, m in agg["agents_mean"].items():
+        print(f"{name:<18}" + "".join(f"{v:>16,.0f}" for v in m.values()))
+
+
+# ── CLI ───────────────────────────────────────────────────────────────────────
+
+def main():
+    ap  = argparse.ArgumentParser(description="Agent-based order book simulator")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("run", help="simulate one or more seeds")
+    r.add_argument("-n", "--events", type=int, default=1_000_000, help="events per run")
+    r.add_argument("--seeds", type=int, default=1, help="independent runs (seeds 0..N-1)")
+    r.add_argument("--processes", type=int, default=None)
+    r.add_argument("--block", type=float, default=0.01, help="block length, simulated s")
+    r.add_argument("--events-out", default=None,
+                   help="write the realised event stream (single seed) for replay.py")
+    args = ap.parse_args()
+
+    config = SimConfig(n_events=args.events, block_seconds=args.block)
+    t0 = time.perf_counter()
+    if args.events_out:
+        results = [run_simulation(config, 0, args.events_out)]
+    else:
+        results = run_many(config, range(args.seeds), args.processes)
+    dt = time.perf_counter() - t0
+    total = sum(r["events"] for r in results)
+    print(f"{len(results)} run(s), {total:,} events in {dt:.1f}s "
+          f"({total / dt:,.0f} events/s overall)\n")
+    print_aggregate(aggregate(results), len(results))
+
+
+if __name__ == "__main__":
+    main()
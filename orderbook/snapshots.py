@@ -0,0 +1,160 @@
+"""
+snapshots.py — Copy-on-write read snapshots for concurrent book readers
+
+Single writer, many readers. The thread that matches orders publishes an
+immutable BookSnapshot after each mutation; reader threads (dashboard,
+analytics) take publisher.latest and never touch the live SortedDicts, so
+they need no lock and cannot stall the matcher.
+
+Publishing is one attribute store of a freshly built object, which is
+atomic for readers: a reader sees either the previous snapshot or the new
+one, never a half-updated book. Snapshots are plain tuples and are never
+modified after publication, so a reader can hold one as long as it likes.
+
+  pub  = book.publish_snapshots(levels=10)         # writer side, once
+  snap = pub.latest                                # any thread, any time
+  snap.version, snap.best_bid, snap.bids[:3], snap.depth_snapshot()
+
+Cost on the writer: building the top `levels` per side, O(levels), after
+a mutation that can change them. A passive add, cancel or in-place amend
+strictly behind the `levels`-th level only re-stamps the previous snapshot
+(version and side totals, the levels tuples are shared). An add_orders
+batch publishes once. min_interval throttles rebuilds to at most one per
+interval; the snapshot is then up to min_interval stale, and flush()
+publishes the current state on demand.
+full_every > 0 additionally publishes a full-depth snapshot (every level,
+O(book)) as publisher.latest_full every full_every-th snapshot.
+"""
+
+from __future__ import annotations
+from typing import NamedTuple
+import time
+
+
+# A NamedTuple rather than a frozen dataclass: it is built on every
+# mutation, and a frozen dataclass __init__ costs ~4x a tuple's.
+class BookSnapshot(NamedTuple):
+    """
+    Immutable top-of-book view. bids / asks are ((price, qty, orders), ...)
+    best first; version counts the book mutations it includes.
+    """
+    version:   int
+    timestamp: float
+    levels:    int | None          # None = full depth
+    bids:      tuple
+    asks:      tuple
+    best_bid:  float | None
+    best_ask:  float | None
+    spread:    float | None
+    mid:       float | None
+    bid_qty:   int                 # Σ resting quantity per side (all levels)
+    ask_qty:   int
+    n_trades:  int
+
+    def depth_snapshot(self, levels: int | None = None) -> dict:
+        """Same layout as LimitOrderBook.depth_snapshot()."""
+        n = len(self.bids) if levels is None else levels
+        m = len(self.asks) if levels is None else levels
+        return {
+            "bids": [{"price": p, "qty": q, "orders": c} for p, q, c in self.bids[:n]],
+            "asks": [{"price": p, "qty": q, "orders": c} for p, q, c in self.asks[:m]],
+            "best_bid": self.best_bid,
+            "best_ask": self.best_ask,
+            "spread":   self.spread,
+            "mid":      self.mid,
+        }
+
+
+_EMPTY = BookSnapshot(0, 0.0, 0, (), (), None, None, None, None, 0, 0, 0)
+
+
+class SnapshotPublisher:
+    """
+    Owned by the writer. Create through LimitOrderBook.publish_snapshots().
+
+    levels        top-N depth per side in each snapshot
+    min_interval  seconds between snapshots (0 = after every mutation)
+    full_every    also publish a full-depth snapshot every k-th snapshot
+                  (0 = never)
+    """
+
+    __slots__ = ("levels", "min_interval", "full_every", "latest",
+                 "latest_full", "version", "published", "_book", "_last",
+                 "_clock", "_prices", "_bbo", "_bid_floor", "_ask_ceil",
+                 "_current")
+
+    def __init__(self, book, levels: int = 10, min_interval: float = 0.0,
+                 full_every: int = 0):
+        if levels <= 0:
+            raise ValueError("levels must be positive")
+        self.levels       = levels
+        self.min_interval = min_interval
+        self.full_every   = full_every
+        self.version      = 0          # mutations seen
+        self.published    = 0          # snapshots built
+        self.latest       = _EMPTY
+        self.latest_full  = _EMPTY
+        self._book        = book
+        self._clock       = time.monotonic
+        self._last        = float("-inf")
+        self._prices: dict = {}        # level key → API price
+        self._bbo         = None       # book BBO keys of the last snapshot
+        # Deepest level key in the snapshot per side (None: fewer than
+        # `levels` levels, so any change shows) and whether latest is exact
+        self._bid_floor   = None
+        self._ask_ceil    = None
+        self._current     = False
+        self.flush()
+
+    def on_mutation(self, is_bid: bool | None = None, key=None):
+        """
+        Called by the book after every mutating call. (is_bid, key) name the
+        one level a passive add / cancel / amend touched; otherwise None.
+        """
+        self.version += 1
+        if key is not None and self._current:
+            edge = self._bid_floor if is_bid else self._ask_ceil
+            if edge is not None and (key < edge if is_bid else key > edge):
+                book = self._book
+                self.latest = self.latest._replace(
+                    version=self.version, timestamp=time.time(),
+                    bid_qty=book._bid_qty, ask_qty=book._ask_qty)
+                return
+        if self.min_interval:
+            now = self._clock()
+            if now - self._last < self.min_interval:
+                self._current = False
+                return
+            self._last = now
+        self._publish()
+
+    def flush(self):
+        """Publish the current state now, regardless of min_interval."""
+        self._last = self._clock()
+        self._publish()
+
+    def _publish(self):
+        book = self._book
+        self.published += 1
+        if len(self._prices) > 65_536:                 # bound the cache
+            self._prices.clear()
+        # BBO fields: reuse the previous snapshot's unless the touch moved
+        prev = self.latest
+        if book._bbo == self._bbo and prev is not _EMPTY:
+            top = prev.best_bid, prev.best_ask, prev.spread, prev.mid
+        else:
+            self._bbo = book._bbo
+            top = book.best_bid(), book.best_ask(), book.spread(), book.mid_price()
+        if self.full_every and self.published % self.full_every == 0:
+            self.latest_full = self._build(None, top)
+        self.latest = self._build(self.levels, top)
+        self._current = True
+
+    def _build(self, levels: int | None, top: tuple) -> BookSnapshot:
+        book = self._book
+        bids, asks, bk, ak = book._top_levels(levels, self._prices)
+        if levels is not None:
+            self._bid_floor = bk[-1] if len(bk) == levels else None
+            self._ask_ceil  = ak[-1] if len(ak) == levels else None
+        return BookSnapshot(self.version, time.time(), levels, bids, asks, *top,
+                            book._bid_qty, book._ask_qty, book._stats.count)
@@ -0,0 +1,201 @@
+"""
+tape.py — Columnar, bounded trade tape
+
+Stores fills as one NumPy array per field instead of a list of Trade
+objects:
+  - ColumnarRing: fixed-schema column store with optional ring capacity and
+    optional spill of evicted rows to an on-disk columnar directory
+  - TradeTape:    ColumnarRing with the trade schema used by LimitOrderBook
+  - load_spill:   memory-map a spill directory back as columns
+
+Layout: a bounded ring of capacity C allocates 2C rows per column and
+writes linearly. The live window is always the last ≤ C rows, so it is a
+contiguous slice and columns() can hand out views without copying. When the
+write cursor reaches 2C, the oldest C rows are spilled (if enabled) and the
+newest C rows are moved to the front — one memmove per C appends.
+"""
+
+from __future__ import annotations
+import json
+import os
+
+import numpy as np
+
+
+class ColumnarRing:
+    """
+    Append-only column store.
+
+    capacity=None   unbounded; arrays double when full.
+    capacity=C      keeps only the most recent C rows in memory.
+    spill_dir       if set (bounded mode), rows evicted from the window are
+                    appended to <spill_dir>/<column>.bin as raw arrays.
+    """
+
+    def __init__(self, schema: dict[str, str], capacity: int | None = None,
+                 spill_dir: str | None = None, initial_rows: int = 1024):
+        if capacity is not None and capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        if spill_dir is not None and capacity is None:
+            raise ValueError("spill_dir requires a bounded capacity")
+
+        self.schema    = {name: np.dtype(dt) for name, dt in schema.items()}
+        self.capacity  = capacity
+        self.spill_dir = spill_dir
+        self._alloc    = 2 * capacity if capacity is not None else initial_rows
+        self._cols     = {name: np.empty(self._alloc, dtype=dt)
+                          for name, dt in self.schema.items()}
+        self._arrays   = list(self._cols.values())   # append order = schema order
+        self._end      = 0      # next write position
+        self.total     = 0      # rows ever appended (including evicted)
+        self.spilled   = 0      # rows written to spill_dir
+        self._on_disk  = 0      # buffer rows [0, _on_disk) already spilled
+
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+            with open(os.path.join(spill_dir, "_schema.json"), "w") as f:
+                json.dump({n: dt.str for n, dt in self.schema.items()}, f)
+
+    # ── Writes ────────────────────────────────────────────────────────────────
+
+    def append(self, *row):
+        """Append one row, values in schema order."""
+        if self._end == self._alloc:
+            self._make_room()
+        i = self._end
+        for arr, v in zip(self._arrays, row):
+            arr[i] = v
+        self._end   = i + 1
+        self.total += 1
+
+    def update_last(self, *row):
+        """
+        Overwrite the most recent row in place (values in schema order).
+        A row that has already been spilled is not rewritten on disk.
+        """
+        i = self._end - 1
+        if i < self._start():
+            raise IndexError("update_last on an empty ring")
+        for arr, v in zip(self._arrays, row):
+            arr[i] = v
+
+    def extend(self, columns: dict[str, np.ndarray]):
+        """Append a batch of rows given as equal-length column arrays."""
+        n = len(next(iter(columns.values()))) if columns else 0
+        done = 0
+        while done < n:
+            if self._end == self._alloc:
+                self._make_room()
+            take = min(n - done, self._alloc - self._end)
+            for name, arr in self._cols.items():
+                arr[self._end:self._end + take] = columns[name][done:done + take]
+            self._end  += take
+            self.total += take
+            done       += take
+
+    def _make_room(self):
+        if self.capacity is None:
+            self._alloc *= 2
+            for name in self._cols:
+                grown = np.empty(self._alloc, dtype=self.schema[name])
+                grown[:self._end] = self._cols[name][:self._end]
+                self._cols[name] = grown
+            self._arrays = list(self._cols.values())
+            return
+
+        keep  = self.capacity
+        evict = self._end - keep
+        if self.spill_dir is not None:
+            self._spill(evict)
+        for arr in self._arrays:
+            arr[:keep] = arr[evict:self._end]
+        self._end     = keep
+        self._on_disk = max(0, self._on_disk - evict)
+
+    def _spill(self, hi: int):
+        lo = self._on_disk
+        if hi <= lo:
+            return
+        for name, arr in self._cols.items():
+            with open(os.path.join(self.spill_dir, f"{name}.bin"), "ab") as f:
+                arr[lo:hi].tofile(f)
+        self.spilled += hi - lo
+        self._on_disk = hi
+
+    def flush(self):
+        """Spill every row not yet on disk (end of session). Bounded mode only."""
+        if self.spill_dir is not None:
+            self._spill(self._end)
+
+    def clear(self):
+        """Drop every row, including the spill files (a new session starts empty)."""
+        self._end     = 0
+        self._on_disk = 0
+        self.total    = 0
+        self.spilled  = 0
+        if self.spill_dir is not None:
+            for name in self._cols:
+                path = os.path.join(self.spill_dir, f"{name}.bin")
+                if os.path.exists(path):
+                    open(path, "wb").close()       # truncate
+
+    # ── Reads ─────────────────────────────────────────────────────────────────
+
+    def _start(self) -> int:
+        if self.capacity is None:
+            return 0
+        return max(0, self._end - self.capacity)
+
+    def __len__(self) -> int:
+        return self._end - self._start()
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """
+        Views of the live window, oldest row first. No copy is made, so the
+        views see later overwrites — copy them to keep a stable result.
+        """
+        lo, hi = self._start(), self._end
+        return {name: arr[lo:hi] for name, arr in self._cols.items()}
+
+    def to_df(self):
+        """Live window as a DataFrame backed by the column views (zero-copy)."""
+        import pandas as pd
+        return pd.DataFrame(self.columns(), copy=False)
+
+
+def load_spill(spill_dir: str) -> dict[str, np.ndarray]:
+    """Memory-map the columns of a spill directory (read-only)."""
+    with open(os.path.join(spill_dir, "_schema.json")) as f:
+        schema = json.load(f)
+    cols = {}
+    for name, dt in schema.items():
+        path = os.path.join(spill_dir, f"{name}.bin")
+        cols[name] = (np.memmap(path, dtype=dt, mode="r")
+                      if os.path.exists(path) and os.path.getsize(path) > 0
+                      else np.empty(0, dtype=dt))
+    return cols
+
+
+TRADE_SCHEMA = {
+    "aggressor_id": "i8",
+    "resting_id":   "i8",
+    "price":        "f8",
+    "quantity":     "i8",
+    "timestamp":    "f8",
+}
+
+
+class TradeTape(ColumnarRing):
+    """
+    Trade history for LimitOrderBook: one column per Trade field.
+    ts_dtype is "f8" for wall-clock seconds, "i8" for ns or sequence clocks.
+    """
+
+    def __init__(self, capacity: int | None = None,
+                 spill_dir: str | None = None, ts_dtype: str = "f8"):
+        super().__init__({**TRADE_SCHEMA, "timestamp": ts_dtype},
+                         capacity, spill_dir)
+
+    def record(self, aggressor_id: int, resting_id: int,
+               price: float, quantity: int, timestamp: float):
+        self.append(aggressor_id, resting_id, price, quantity, timestamp)
@@ -0,0 +1,167 @@
+"""
+test_native.py — Parity tests: NativeOrderBook (C) vs. LimitOrderBook
+
+Every test drives both engines with the same requests and compares what
+they return (fills, errors), their depth, and their session stats.
+Skipped when the C library cannot be built.
+
+Run: python -m pytest test_native.py
+"""
+
+import math
+import random
+
+import numpy as np
+import pytest
+
+from orderbook import LimitOrderBook, Side
+
+try:
+    from native import NativeOrderBook, NativeUnavailable, load
+    load()
+except NativeUnavailable as e:                     # no C compiler
+    pytest.skip(str(e), allow_module_level=True)
+
+TICK = 0.01
+
+
+def books() -> tuple[LimitOrderBook, NativeOrderBook]:
+    return LimitOrderBook("PY", tick_size=TICK), NativeOrderBook("C", tick_size=TICK)
+
+
+def call(book, method: str, *args):
+    """Result of book.method(*args), with fills as tuples (no timestamps)."""
+    try:
+        out = getattr(book, method)(*args)
+    except ValueError as e:
+        return ("ValueError", str(e))
+    if isinstance(out, list):
+        return [(t.aggressor_id, t.resting_id, t.price, t.quantity) for t in out]
+    return out
+
+
+def assert_same_state(py: LimitOrderBook, c: NativeOrderBook):
+    assert py.depth_snapshot(1000) == c.depth_snapshot(1000)
+    assert py.total_bid_qty() == c.total_bid_qty()
+    assert py.total_ask_qty() == c.total_ask_qty()
+    assert py.order_flow_imbalance() == c.order_flow_imbalance()
+    assert py.trade_summary() == c.trade_summary()
+    assert py.vwap() == c.vwap()
+
+
+# ── Single requests ───────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_session(seed):
+    rng   = random.Random(seed)
+    py, c = books()
+    live, next_id = [], 1
+    for _ in range(5_000):
+        r = rng.random()
+        if r < 0.6 or not live:
+            side = rng.choice((Side.BID, Side.ASK))
+            px   = round(100 + rng.randint(-30, 30) * TICK, 2)
+            if rng.random() < 0.01:
+                px = round(px + 0.005, 3)            # off tick
+            oid  = next_id if rng.random() > 0.01 else rng.choice(live or [1])
+            args = ("add_order", oid, side, px, rng.randint(1, 100))
+            live.append(oid)
+            next_id += 1
+        elif r < 0.85:
+            args = ("cancel_order", live.pop(rng.randrange(len(live))))
+        else:
+            px   = None if rng.random() < 0.5 else round(100 + rng.randint(-30, 30) * TICK, 2)
+            qty  = None if rng.random() < 0.3 else rng.randint(1, 120)
+            args = ("modify_order", rng.choice(live), px, qty)
+        assert call(py, *args) == call(c, *args), (seed, args)
+    assert_same_state(py, c)
+
+
+@pytest.mark.parametrize("price, qty", [
+    (math.nan, 5), (math.inf, 5), (-math.inf, 5), (0.0, 5), (-1.0, 5),
+    (100.0, 0), (100.0, -3), (100.0, math.nan), (100.0, math.inf),
+])
+def test_add_order_rejects_non_finite(price, qty):
+    py, c = books()
+    assert call(py, "add_order", 1, Side.BID, price, qty) == \
+           call(c, "add_order", 1, Side.BID, price, qty)
+    assert_same_state(py, c)
+
+
+@pytest.mark.parametrize("price, qty", [
+    (math.nan, None), (math.inf, None), (None, math.nan), (None, math.inf),
+    (None, 0), (100.005, None),
+])
+def test_modify_order_rejects_keep_the_order(price, qty):
+    py, c = books()
+    for book in (py, c):
+        book.add_order(1, Side.BID, 99.0, 10)
+        book.add_order(2, Side.BID, 99.0, 10)
+    assert call(py, "modify_order", 1, price, qty) == call(c, "modify_order", 1, price, qty)
+    assert_same_state(py, c)
+
+
+def test_modify_order_out_of_int_range_keeps_the_order():
+    _, c = books()
+    c.add_order(1, Side.BID, 99.0, 10)
+    with pytest.raises(ValueError, match="int fields"):
+        c.modify_order(1, quantity=2**31)
+    assert c.total_bid_qty() == 10
+    assert c.modify_order(1, quantity=5) == []       # still resting
+
+
+# ── Batches ───────────────────────────────────────────────────────────────────
+
+def batch(n: int = 5_000, seed: int = 0):
+    rng   = np.random.default_rng(seed)
+    sides = rng.integers(0, 2, n)
+    off   = np.where(rng.random(n) < 0.3, -5, rng.integers(1, 50, n))
+    ticks = 10_000 + np.where(sides == 0, -1, 1) * off
+    return (np.arange(n, dtype=np.int64), sides, np.round(ticks * TICK, 2),
+            rng.integers(1, 100, n).astype(np.float64))
+
+
+POISON = {                                         # row → (column, bad value)
+    400:  (0, 300),                                  # duplicate id
+    500:  (2, 100.005),                              # off tick
+    600:  (2, math.nan),
+    700:  (2, math.inf),
+    800:  (3, math.nan),
+    900:  (3, math.inf),
+    1000: (3, 0),
+}
+
+
+def poisoned_batch(rows=POISON):
+    cols = batch()
+    for row in rows:
+        col, value = POISON[row]
+        cols[col][row] = value
+    return cols
+
+
+def test_add_orders_fills_and_rejects():
+    py, c = books()
+    cols  = poisoned_batch()
+    a = py.add_orders(*cols, skip_invalid=True)
+    b = c.add_orders(*cols, skip_invalid=True)
+    assert a.keys() == b.keys()
+    for k in a:
+        np.testing.assert_array_equal(a[k], b[k], err_msg=k)
+    assert list(a["rejected"]) == sorted(POISON)
+    assert len(a["price"])                           # the batch did trade
+    assert_same_state(py, c)
+
+
+@pytest.mark.parametrize("bad", sorted(POISON))
+def test_add_orders_raises_at_the_same_row(bad):
+    py, c  = books()
+    cols   = poisoned_batch([bad])
+    errors = []
+    for book in (py, c):
+        with pytest.raises(ValueError) as e:
+            book.add_orders(*cols)
+        errors.append((str(e.value), e.value.batch_index))
+    assert errors[0] == errors[1]
+    assert errors[0][1] == bad
+    assert_same_state(py, c)
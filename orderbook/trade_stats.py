@@ -0,0 +1,137 @@
+"""
+trade_stats.py — O(1) streaming trade statistics
+
+TradeStats is updated once per fill and answers VWAP / volume / range
+queries without touching the trade history:
+  - session accumulators: count, volume, notional, min, max
+  - optional rolling window over the last N seconds and/or the last N
+    trades: running window volume and notional, plus monotonic deques for
+    the window high and low (amortised O(1) per fill)
+"""
+
+from __future__ import annotations
+from collections import deque
+import time
+
+
+class TradeStats:
+    """
+    Running trade statistics.
+
+    window_seconds  keep fills with timestamp > now - window_seconds
+    window_trades   keep only the most recent window_trades fills
+    Either, both or neither may be set; with both, a fill leaves the window
+    as soon as either limit excludes it.
+    clock           time source used to age the window on reads; must match
+                    the timestamps passed to update().
+    """
+
+    def __init__(self, window_seconds: float | None = None,
+                 window_trades: int | None = None,
+                 clock=time.time):
+        if window_seconds is not None and window_seconds <= 0:
+            raise ValueError("window_seconds must be positive")
+        if window_trades is not None and window_trades <= 0:
+            raise ValueError("window_trades must be positive")
+        self.window_seconds = window_seconds
+        self.window_trades  = window_trades
+        self._clock         = clock
+        self._windowed      = window_seconds is not None or window_trades is not None
+        self.reset()
+
+    def reset(self):
+        # Session totals
+        self.count     = 0
+        self.volume    = 0
+        self.notional  = 0.0
+        self.min_price: float | None = None
+        self.max_price: float | None = None
+
+        # Rolling window
+        self._seq      = 0                 # fill sequence number
+        self._window   = deque()           # (seq, ts, price, qty)
+        self._w_volume = 0
+        self._w_notional = 0.0
+        self._w_max    = deque()           # (seq, price), prices decreasing
+        self._w_min    = deque()           # (seq, price), prices increasing
+
+    # ── Updates ───────────────────────────────────────────────────────────────
+
+    def update(self, price: float, qty: int, ts: float):
+        self.count    += 1
+        self.volume   += qty
+        self.notional += price * qty
+        if self.min_price is None or price < self.min_price:
+            self.min_price = price
+        if self.max_price is None or price > self.max_price:
+            self.max_price = price
+
+        if not self._windowed:
+            return
+
+        seq = self._seq
+        self._seq += 1
+        self._window.append((seq, ts, price, qty))
+        self._w_volume   += qty
+        self._w_notional += price * qty
+
+        while self._w_max and self._w_max[-1][1] <= price:
+            self._w_max.pop()
+        self._w_max.append((seq, price))
+        while self._w_min and self._w_min[-1][1] >= price:
+            self._w_min.pop()
+        self._w_min.append((seq, price))
+
+        self._evict(ts)
+
+    def _evict(self, now: float):
+        w = self._window
+        if self.window_trades is not None:
+            while len(w) > self.window_trades:
+                self._drop_oldest()
+        if self.window_seconds is not None:
+            cutoff = now - self.window_seconds
+            while w and w[0][1] <= cutoff:
+                self._drop_oldest()
+
+    def _drop_oldest(self):
+        seq, _, price, qty = self._window.popleft()
+        self._w_volume   -= qty
+        self._w_notional -= price * qty
+        if self._w_max and self._w_max[0][0] == seq:
+            self._w_max.popleft()
+        if self._w_min and self._w_min[0][0] == seq:
+            self._w_min.popleft()
+        if not self._window:
+            # Re-anchor so float drift from add/subtract cannot accumulate
+            self._w_notional = 0.0
+
+    # ── Reads ─────────────────────────────────────────────────────────────────
+
+    def vwap(self) -> float | None:
+        """Session VWAP."""
+        return self.notional / self.volume if self.volume else None
+
+    def _refresh(self):
+        if self.window_seconds is not None:
+            self._evict(self._clock())
+
+    def window_vwap(self) -> float | None:
+        """VWAP over the rolling window (None if no window configured/empty)."""
+        if not self._windowed:
+            return None
+        self._refresh()
+        return self._w_notional / self._w_volume if self._w_volume else None
+
+    def window_summary(self) -> dict:
+        if not self._windowed:
+            return {}
+        self._refresh()
+        return {
+            "n_trades": len(self._window),
+            "volume":   self._w_volume,
+            "vwap":     (self._w_notional / self._w_volume
+                         if self._w_volume else None),
+            "high":     self._w_max[0][1] if self._w_max else None,
+            "low":      self._w_min[0][1] if self._w_min else None,
+        }